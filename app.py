@@ -21,19 +21,53 @@ class MultiLoader(sgtk.platform.Application):
         """
         Called as the application is being initialized
         """
-        # We won't be able to do anything if there's no UI. The import
-        # of our tk-multi-loader module below required some Qt components,
-        # and will likely blow up.
-        if not self.engine.has_ui:
-            return
+        self._connection_pool = None
+        self._have_list_index = None
+        self._sync_queue = None
 
         tk_multi_loader = self.import_module("tk_multi_loader")
+        self._tk_multi_loader = tk_multi_loader
+
+        # the headless sync of the latest publishes is a command of the
+        # engines without a UI, e.g. on render nodes, and of tk-shell.
+        if not self.engine.has_ui or self.engine.name == "tk-shell":
+            self.engine.register_command(
+                "sync_latest_publishes",
+                lambda *args: tk_multi_loader.run_command(self, *args),
+                {
+                    "short_name": "sync_latest_publishes",
+                    "description": "Syncs the latest publishes of the current "
+                    "entity from Perforce and prints a JSON report.",
+                },
+            )
+
+        # everything else requires a UI
+        if not self.engine.has_ui:
+            return
 
         # the manager class provides the interface for loading. We store a
         # reference to it to enable the create_loader_action_manager method exposed on
         # the application itself
         self._manager_class = tk_multi_loader.LoaderManager
 
+        # Perforce connections are pooled at the app level, so that they
+        # outlive the loader dialog and can be shared by parallel workers.
+        self._connection_pool = tk_multi_loader.create_connection_pool(self)
+
+        # the status of the workspace files is cached between sessions, so
+        # that finding out of date files doesn't query the server every time.
+        self._have_list_index = None
+        if self.get_setting("have_index_ttl") > 0:
+            self._have_list_index = tk_multi_loader.sync.HaveListIndex(
+                os.path.join(self.cache_location, "have_list_index.db"),
+                ttl=self.get_setting("have_index_ttl"),
+                refresh_interval=self.get_setting("have_index_refresh_interval"),
+            )
+
+        # the sync queue is owned by the app so that syncs keep running
+        # when the loader dialog is closed.
+        self._sync_queue = tk_multi_loader.SyncQueue(self, self._connection_pool)
+
         # register command
         cb = lambda: tk_multi_loader.show_dialog(self)
         menu_caption = "%s..." % self.get_setting("menu_name")
@@ -52,6 +86,42 @@ class MultiLoader(sgtk.platform.Application):
         }
         self.engine.register_command(menu_caption, cb, menu_options)
 
+    def destroy_app(self):
+        """
+        Called when the app is being torn down.
+        """
+        sync_queue = getattr(self, "_sync_queue", None)
+        if sync_queue:
+            sync_queue.shut_down()
+        connection_pool = getattr(self, "_connection_pool", None)
+        if connection_pool:
+            connection_pool.close()
+
+    @property
+    def sync_queue(self):
+        """
+        The :class:`tk_multi_loader.SyncQueue` running the Perforce syncs of
+        the app, None without a UI.
+        """
+        return self._sync_queue
+
+    @property
+    def connection_pool(self):
+        """
+        The :class:`tk_multi_loader.sync.ConnectionPool` of Perforce connections
+        of the app, None without a UI.
+        """
+        return self._connection_pool
+
+    @property
+    def have_list_index(self):
+        """
+        The :class:`tk_multi_loader.sync.HaveListIndex` caching the revision
+        status of the workspace files, None if the index is disabled or
+        without a UI.
+        """
+        return self._have_list_index
+
     @property
     def context_change_allowed(self):
         """
@@ -78,6 +148,23 @@ class MultiLoader(sgtk.platform.Application):
         tk_multi_loader = self.import_module("tk_multi_loader")
         return tk_multi_loader.open_publish_browser(self, title, action, publish_types)
 
+    def sync_latest_publishes(self, entity=None, force=False):
+        """
+        Syncs the latest publishes of an entity from Perforce, without any UI.
+
+        The latest publishes are resolved with the same rules as the loader
+        publish view and synced to their head revision in a few batched
+        server calls, in the calling thread. This can be used from engines
+        without a UI, e.g. on render nodes.
+
+        :param entity: Shotgun entity dictionary with a type and an id.
+                       Defaults to the entity of the current context.
+        :param force: If True, files are force synced.
+        :returns: Report of the sync, a dictionary which can be serialized
+                  to JSON, with the entity, a result per file and a summary.
+        """
+        return self._tk_multi_loader.sync_latest_publishes(self, entity, force=force)
+
     def create_loader_manager(self):
         """
         Create and return a :class:`tk_multi_loader.LoaderManager` instance.
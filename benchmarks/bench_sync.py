@@ -0,0 +1,303 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Benchmarks of the loader sync code against the offline Perforce stand-in.
+
+Every scenario runs against a freshly generated depot and reports the number
+of server round trips, the wall time, the part of it spent in the fake server
+and the peak memory allocated by Python while it ran. Peak memory is measured
+in a second run, since tracing allocations slows everything down.
+
+The scenarios follow what the loader does when someone asks for the latest
+revisions:
+
+- status: revision status of every file, as read before a sync, and the
+  selection of the out of date files.
+- index-cold / index-warm: the same, through the have list index, first
+  empty and then warm.
+- plan: batching of the out of date files and query of their sizes.
+- preview: what a sync would transfer, without transferring anything.
+- sync: sync of the out of date files over a single connection.
+- parallel-sync: the same, spreading large files over worker connections.
+
+Usage::
+
+    python benchmarks/bench_sync.py --files 1000 10000 100000 --latency 0.005
+"""
+
+from __future__ import print_function
+
+import argparse
+import gc
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2, peak memory isn't reported
+    tracemalloc = None
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "python", "tk_multi_loader")
+)
+
+import fake_p4  # noqa: E402
+from sync import (  # noqa: E402
+    HaveListIndex,
+    ParallelSyncEngine,
+    RevisionStatusService,
+    SyncEngine,
+    TransferProgress,
+    format_size,
+    preview_sync,
+)
+from sync.sizes import query_sizes  # noqa: E402
+
+SCENARIOS = (
+    "status",
+    "index-cold",
+    "index-warm",
+    "plan",
+    "preview",
+    "sync",
+    "parallel-sync",
+)
+
+
+def needs_sync(have_rev, head_rev):
+    """
+    Same selection of out of date files as the loader dialog.
+    """
+    return head_rev > 0 and have_rev < head_rev
+
+
+def out_of_date_specs(p4, paths):
+    statuses = RevisionStatusService(p4).get_status(paths)
+    return [
+        path + "#head"
+        for path in paths
+        if needs_sync(statuses[path].have_rev, statuses[path].head_rev)
+    ]
+
+
+def run_status(p4, paths, options):
+    return len(out_of_date_specs(p4, paths))
+
+
+def run_index(p4, paths, options, warm=False):
+    folder = tempfile.mkdtemp()
+    try:
+        index = HaveListIndex(os.path.join(folder, "index.db"))
+        if warm:
+            _untimed(options, index.get_status, p4, paths)
+        statuses = index.get_status(p4, paths)
+        return sum(
+            1 for s in statuses.values() if needs_sync(s.have_rev, s.head_rev)
+        )
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def run_plan(p4, paths, options):
+    file_specs = _untimed(options, out_of_date_specs, p4, paths)
+    batches = SyncEngine(p4).plan(file_specs)
+    sizes = query_sizes(p4, file_specs)
+    return "%d batches, %s" % (len(batches), format_size(sum(sizes.values())))
+
+
+def run_preview(p4, paths, options):
+    file_specs = _untimed(options, out_of_date_specs, p4, paths)
+    preview = preview_sync(p4, file_specs)
+    return "%d files, %s" % (preview.file_count, format_size(preview.total_bytes))
+
+
+def run_sync(p4, paths, options, parallel=False):
+    file_specs = _untimed(options, out_of_date_specs, p4, paths)
+    if parallel:
+        engine = ParallelSyncEngine(
+            p4, threads=options.threads, min_size=options.min_size
+        )
+    else:
+        engine = SyncEngine(p4)
+    results = engine.sync(file_specs, progress=TransferProgress())
+    return "%d files, %s" % (
+        len(results),
+        format_size(sum(r.size for r in results)),
+    )
+
+
+RUNNERS = {
+    "status": run_status,
+    "index-cold": run_index,
+    "index-warm": lambda p4, paths, options: run_index(p4, paths, options, warm=True),
+    "plan": run_plan,
+    "preview": run_preview,
+    "sync": run_sync,
+    "parallel-sync": lambda p4, paths, options: run_sync(
+        p4, paths, options, parallel=True
+    ),
+}
+
+
+def benchmark(scenario, file_count, options):
+    """
+    Runs a scenario against a freshly generated depot, once to time it and
+    once more to measure its peak memory.
+
+    :returns: Dictionary with the measurements.
+    """
+    (server, outcome, wall_time) = _run_scenario(scenario, file_count, options)
+    peak_memory = None
+    if tracemalloc and not options.no_memory:
+        tracemalloc.start()
+        try:
+            _run_scenario(scenario, file_count, options, traced=True)
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    return {
+        "scenario": scenario,
+        "files": file_count,
+        "round_trips": sum(server.calls.values()),
+        "calls": dict(server.calls),
+        "wall_time": wall_time,
+        "server_time": server.busy_time,
+        "peak_memory": peak_memory,
+        "bytes_transferred": server.bytes_transferred,
+        "outcome": str(outcome),
+    }
+
+
+def _run_scenario(scenario, file_count, options, traced=False):
+    """
+    :returns: Tuple with the fake server, the outcome of the scenario and
+              its wall time.
+    """
+    if traced:
+        # the depot itself isn't part of the measured memory
+        tracemalloc.stop()
+    server = fake_p4.FakeServer.populate(
+        file_count, latency=options.latency, throughput=options.throughput
+    )
+    paths = server.client_paths()
+    p4 = fake_p4.FakeP4().connect()
+    gc.collect()
+    if traced:
+        tracemalloc.start()
+
+    server.reset_counters()
+    options.untimed = 0.0
+    start = time.time()
+    outcome = RUNNERS[scenario](p4, paths, options)
+    wall_time = time.time() - start - options.untimed
+    return server, outcome, wall_time
+
+
+def _untimed(options, function, *args):
+    """
+    Runs the set up part of a scenario, leaving its round trips and time out
+    of the measurements.
+    """
+    server = fake_p4._SERVERS[fake_p4.PORT]
+    calls = server.calls.copy()
+    busy_time = server.busy_time
+    start = time.time()
+    result = function(*args)
+    options.untimed += time.time() - start
+    server.calls = calls
+    server.busy_time = busy_time
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--files",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Numbers of files to benchmark with.",
+    )
+    parser.add_argument(
+        "--scenarios",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+        help="Scenarios to run.",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.005,
+        help="Round trip time of a server call, in seconds.",
+    )
+    parser.add_argument(
+        "--throughput",
+        type=int,
+        default=0,
+        help="Transfer rate of a connection in bytes per second, 0 for instant transfers.",
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=4,
+        help="Number of worker connections of the parallel sync.",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        default=1024 * 1024,
+        help="Small file threshold of the parallel sync, in bytes.",
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip the peak memory measurement."
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the results as JSON lines."
+    )
+    options = parser.parse_args(argv)
+
+    if not options.json:
+        print(
+            "%-14s %8s %8s %10s %10s %12s  %s"
+            % ("scenario", "files", "trips", "time (s)", "server (s)", "peak mem", "outcome")
+        )
+    for file_count in options.files:
+        for scenario in options.scenarios:
+            result = benchmark(scenario, file_count, options)
+            if options.json:
+                print(json.dumps(result, sort_keys=True))
+            else:
+                print(
+                    "%-14s %8d %8d %10.3f %10.3f %12s  %s"
+                    % (
+                        scenario,
+                        file_count,
+                        result["round_trips"],
+                        result["wall_time"],
+                        result["server_time"],
+                        format_size(result["peak_memory"])
+                        if result["peak_memory"] is not None
+                        else "n/a",
+                        result["outcome"],
+                    )
+                )
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,634 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Offline stand-in for a Perforce server and a P4Python connection.
+
+:class:`FakeServer` holds a depot and a single workspace in memory and
+answers the subset of commands the loader sync code runs: ``sync``,
+``fstat``, ``have``, ``opened``, ``sizes``, ``where``, ``changes``,
+``files`` and ``login -s``. Every call costs a configurable round trip latency, and synced
+bytes are transferred at a configurable per connection throughput, so that
+the cost of round trips and transfers can be measured without a server.
+
+:class:`FakeP4` mimics the parts of the P4Python ``P4`` class the sync code
+relies on: ``run``, ``warnings``, ``errors``, ``exception_level``, the
+``handler`` and ``progress`` hooks, and the connection attributes. Like
+P4Python, this module provides the ``OutputHandler`` and ``Progress`` base
+classes, which the sync code finds through the module of the connection.
+"""
+
+import random
+import re
+import threading
+import time
+from collections import Counter
+
+DEPOT_ROOT = "//depot/"
+CLIENT_ROOT = "/ws/"
+CLIENT_NAME = "bench"
+PORT = "fake:1666"
+
+# units of the positions given to progress indicators
+KBYTES = 3
+
+# servers by port, so that connections cloned from a connection reach the
+# same server
+_SERVERS = {}
+
+_REVISION_REGEX = re.compile(r"^(.*?)(#(?:\d+|head|have|none)|@\d+(?:,@?\d+)?)?$")
+
+# options followed by a value, e.g. "-T clientFile,headRev"
+_VALUE_OPTIONS = ("-T", "-m", "-s", "-e")
+
+
+class P4Exception(Exception):
+    """
+    Raised by :meth:`FakeP4.run` depending on the exception level, like
+    P4Python does.
+    """
+
+
+class OutputHandler(object):
+    """
+    Base class of P4Python output handlers.
+    """
+
+    (REPORT, HANDLED, CANCEL) = (0, 1, 2)
+
+    def outputStat(self, stat):
+        return self.REPORT
+
+
+class Progress(object):
+    """
+    Base class of P4Python progress indicators.
+    """
+
+    def init(self, type):
+        pass
+
+    def setDescription(self, description, units):
+        pass
+
+    def setTotal(self, total):
+        pass
+
+    def update(self, position):
+        pass
+
+    def done(self, fail):
+        pass
+
+
+class FakeFile(object):
+    """
+    A file of the depot, with the revision synced in the workspace.
+    """
+
+    __slots__ = ("depot_file", "client_file", "revisions", "have_rev", "opened_rev")
+
+    def __init__(self, depot_file, client_file, revisions, have_rev=0):
+        """
+        :param depot_file: Depot path of the file.
+        :param client_file: Local path of the file.
+        :param revisions: List of tuples with the changelist and the size in
+                          bytes of every revision, oldest first.
+        :param have_rev: Revision synced in the workspace, 0 if not synced.
+        """
+        self.depot_file = depot_file
+        self.client_file = client_file
+        self.revisions = revisions
+        self.have_rev = have_rev
+        # revision the file was opened for edit at, 0 if not opened
+        self.opened_rev = 0
+
+    @property
+    def head_rev(self):
+        return len(self.revisions)
+
+    def size(self, rev):
+        return self.revisions[rev - 1][1] if rev > 0 else 0
+
+    def change(self, rev):
+        return self.revisions[rev - 1][0] if rev > 0 else 0
+
+
+class FakeServer(object):
+    """
+    In memory depot and workspace, shared by all the connections to a port.
+    """
+
+    def __init__(self, latency=0.0, throughput=0, port=PORT):
+        """
+        :param latency: Number of seconds every command waits for, standing
+                        for the round trip to the server.
+        :param throughput: Transfer rate of a connection, in bytes per second,
+                           0 for instant transfers.
+        :param port: Port connections reach the server on.
+        """
+        self.latency = latency
+        self.throughput = throughput
+        self.port = port
+        self.files = {}
+        self._files_by_client = {}
+        self._lock = threading.Lock()
+        self.calls = Counter()
+        self.bytes_transferred = 0
+        # seconds spent answering commands, latency and transfers included
+        self.busy_time = 0.0
+        _SERVERS[port] = self
+
+    @classmethod
+    def populate(
+        cls,
+        count,
+        out_of_date=0.3,
+        not_synced=0.2,
+        seed=0,
+        files_per_folder=100,
+        **kwargs
+    ):
+        """
+        Creates a server with a depot of generated files.
+
+        Sizes follow a production like mix: mostly small files, a few medium
+        ones and the odd large cache.
+
+        :param count: Number of files in the depot.
+        :param out_of_date: Fraction of the files synced to an older revision.
+        :param not_synced: Fraction of the files not synced at all.
+        :param seed: Seed of the generated sizes and revisions.
+        :param files_per_folder: Number of files in each folder of the depot.
+        :param kwargs: Arguments passed to :class:`FakeServer`.
+        :returns: :class:`FakeServer`
+        """
+        server = cls(**kwargs)
+        generator = random.Random(seed)
+        change = 0
+        for index in range(count):
+            relative_path = "assets/folder%04d/file%07d.ma" % (
+                index // files_per_folder,
+                index,
+            )
+            revisions = []
+            for _ in range(generator.randint(1, 3)):
+                change += 1
+                revisions.append((change, _random_size(generator)))
+            draw = generator.random()
+            if draw < not_synced:
+                have_rev = 0
+            elif draw < not_synced + out_of_date and len(revisions) > 1:
+                have_rev = len(revisions) - 1
+            else:
+                have_rev = len(revisions)
+            server.add_file(relative_path, revisions, have_rev)
+        return server
+
+    def add_file(self, relative_path, revisions, have_rev=0):
+        """
+        Adds a file to the depot.
+
+        :param relative_path: Path of the file relative to the depot and
+                              workspace roots, e.g. "assets/file.ma"
+        :param revisions: List of tuples with the changelist and the size in
+                          bytes of every revision, oldest first.
+        :param have_rev: Revision synced in the workspace.
+        """
+        fake_file = FakeFile(
+            DEPOT_ROOT + relative_path, CLIENT_ROOT + relative_path, revisions, have_rev
+        )
+        self.files[fake_file.depot_file] = fake_file
+        self._files_by_client[fake_file.client_file] = fake_file
+
+    def submit(self, relative_path, size):
+        """
+        Submits a new revision of a file.
+
+        :returns: The number of the submitted changelist.
+        """
+        with self._lock:
+            change = self.latest_change() + 1
+            depot_file = DEPOT_ROOT + relative_path
+            if depot_file in self.files:
+                self.files[depot_file].revisions.append((change, size))
+            else:
+                self.add_file(relative_path, [(change, size)])
+            return change
+
+    def open_for_edit(self, client_paths):
+        """
+        Opens files for edit in the workspace, at the revision synced.
+
+        :param client_paths: List of local paths of the files.
+        """
+        for client_path in client_paths:
+            fake_file = self._files_by_client[client_path]
+            fake_file.opened_rev = fake_file.have_rev
+
+    def client_paths(self):
+        """
+        :returns: Sorted list of the local paths of all the files.
+        """
+        return sorted(self._files_by_client)
+
+    def latest_change(self):
+        return max([f.revisions[-1][0] for f in self.files.values()] or [0])
+
+    def reset_counters(self):
+        """
+        Clears the number of calls and transferred bytes.
+        """
+        with self._lock:
+            self.calls = Counter()
+            self.bytes_transferred = 0
+            self.busy_time = 0.0
+
+    ############################################################################################
+    # commands
+
+    def run(self, connection, command, args):
+        """
+        Runs a command for a connection.
+
+        :returns: Tuple with the list of records, warnings and errors.
+        """
+        start = time.time()
+        with self._lock:
+            self.calls[command] += 1
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            (options, paths) = _parse_args(args)
+            method = getattr(self, "_run_%s" % command, None)
+            if method is None:
+                return [], [], ["Unknown command '%s'." % command]
+            return method(connection, options, paths)
+        finally:
+            with self._lock:
+                self.busy_time += time.time() - start
+
+    def _run_login(self, connection, options, paths):
+        return [{"User": connection.user}], [], []
+
+    def _run_sync(self, connection, options, paths):
+        records = []
+        warnings = []
+        preview = "-n" in options
+        force = "-f" in options
+        handler = connection.handler
+        for arg in paths:
+            (files, revision) = self._resolve(arg)
+            if not files:
+                warnings.append("%s - no such file(s)." % arg)
+                continue
+            up_to_date = True
+            for fake_file in files:
+                rev = self._target_revision(fake_file, revision)
+                if rev == fake_file.have_rev and not force:
+                    continue
+                up_to_date = False
+                if rev == 0:
+                    action = "deleted"
+                elif fake_file.have_rev == 0:
+                    action = "added"
+                else:
+                    action = "updated"
+                size = fake_file.size(rev)
+                record = {
+                    "depotFile": fake_file.depot_file,
+                    "clientFile": fake_file.client_file,
+                    "rev": str(rev),
+                    "action": action,
+                    "fileSize": str(size),
+                    "change": str(fake_file.change(rev)),
+                }
+                if not preview:
+                    if action != "deleted":
+                        self._transfer(connection, size)
+                    fake_file.have_rev = rev
+                records.append(record)
+                if handler is not None and handler.outputStat(record) == OutputHandler.CANCEL:
+                    return records, warnings, []
+            if up_to_date:
+                # like the real server, reported once for the argument as given
+                warnings.append("%s - file(s) up-to-date." % arg)
+        return records, warnings, []
+
+    def _run_fstat(self, connection, options, paths):
+        fields = None
+        if "-T" in options:
+            fields = set(options["-T"].split(","))
+        with_size = "-Ol" in options
+        records = []
+        warnings = []
+        for arg in paths:
+            (files, revision) = self._resolve(arg)
+            if not files:
+                warnings.append("%s - no such file(s)." % arg)
+                continue
+            for fake_file in files:
+                rev = self._target_revision(fake_file, revision or "#head")
+                # with a revision, the server reports the file at that revision
+                record = {
+                    "depotFile": fake_file.depot_file,
+                    "clientFile": fake_file.client_file,
+                    "headRev": str(rev),
+                    "headAction": "edit" if fake_file.head_rev > 1 else "add",
+                    "headChange": str(fake_file.change(fake_file.head_rev)),
+                }
+                if fake_file.have_rev:
+                    record["haveRev"] = str(fake_file.have_rev)
+                if with_size:
+                    record["fileSize"] = str(fake_file.size(rev))
+                if fields:
+                    record = dict((k, v) for (k, v) in record.items() if k in fields)
+                records.append(record)
+        return records, warnings, []
+
+    def _run_have(self, connection, options, paths):
+        records = []
+        warnings = []
+        for arg in paths or [CLIENT_ROOT + "..."]:
+            (files, _) = self._resolve(arg)
+            files = [f for f in files if f.have_rev]
+            if not files:
+                warnings.append("%s - file(s) not on client." % arg)
+            for fake_file in files:
+                records.append(
+                    {
+                        "depotFile": fake_file.depot_file,
+                        "clientFile": fake_file.client_file,
+                        "path": fake_file.client_file,
+                        "haveRev": str(fake_file.have_rev),
+                    }
+                )
+        return records, warnings, []
+
+    def _run_opened(self, connection, options, paths):
+        records = [
+            {
+                "depotFile": f.depot_file,
+                "clientFile": "//%s/%s" % (CLIENT_NAME, f.client_file[len(CLIENT_ROOT) :]),
+                "rev": str(f.opened_rev),
+                "action": "edit",
+                "change": "default",
+                "user": connection.user,
+                "client": CLIENT_NAME,
+            }
+            for f in sorted(self.files.values(), key=lambda f: f.depot_file)
+            if f.opened_rev
+        ]
+        if not records:
+            return [], ["File(s) not opened on this client."], []
+        return records, [], []
+
+    def _run_sizes(self, connection, options, paths):
+        records = []
+        warnings = []
+        for arg in paths:
+            (files, revision) = self._resolve(arg)
+            if not files:
+                warnings.append("%s - no such file(s)." % arg)
+            for fake_file in files:
+                rev = self._target_revision(fake_file, revision or "#head")
+                records.append(
+                    {
+                        "depotFile": fake_file.depot_file,
+                        "rev": str(rev),
+                        "fileSize": str(fake_file.size(rev)),
+                    }
+                )
+        return records, warnings, []
+
+    def _run_where(self, connection, options, paths):
+        records = []
+        warnings = []
+        for arg in paths:
+            (files, _) = self._resolve(arg)
+            if not files:
+                warnings.append("%s - file(s) not in client view." % arg)
+            for fake_file in files:
+                records.append(
+                    {
+                        "depotFile": fake_file.depot_file,
+                        "clientFile": fake_file.client_file,
+                        "path": fake_file.client_file,
+                    }
+                )
+        return records, warnings, []
+
+    def _run_changes(self, connection, options, paths):
+        max_count = int(options["-m"]) if "-m" in options else None
+        changes = set()
+        for arg in paths or [DEPOT_ROOT + "..."]:
+            (files, _) = self._resolve(arg)
+            for fake_file in files:
+                changes.update(change for (change, _) in fake_file.revisions)
+        changes = sorted(changes, reverse=True)[:max_count]
+        return [{"change": str(c), "status": "submitted"} for c in changes], [], []
+
+    def _run_files(self, connection, options, paths):
+        records = []
+        for arg in paths:
+            (files, revision) = self._resolve(arg)
+            (first, last) = _change_range(revision)
+            for fake_file in files:
+                revs = [
+                    rev
+                    for rev in range(1, fake_file.head_rev + 1)
+                    if first <= fake_file.change(rev) <= last
+                ]
+                if revs:
+                    records.append(
+                        {
+                            "depotFile": fake_file.depot_file,
+                            "rev": str(revs[-1]),
+                            "change": str(fake_file.change(revs[-1])),
+                            "action": "edit" if revs[-1] > 1 else "add",
+                        }
+                    )
+        return records, [], []
+
+    ############################################################################################
+    # helpers
+
+    def _resolve(self, arg):
+        """
+        Resolves a command argument to the files it refers to.
+
+        :returns: Tuple with the list of :class:`FakeFile` and the revision
+                  specifier of the argument, None if it has none.
+        """
+        (path, revision) = _REVISION_REGEX.match(arg).groups()
+        if path.startswith("//%s/" % CLIENT_NAME):
+            path = CLIENT_ROOT + path[len(CLIENT_NAME) + 3 :]
+
+        if "*" not in path and "..." not in path:
+            fake_file = self.files.get(path) or self._files_by_client.get(path)
+            return ([fake_file] if fake_file else []), revision
+
+        if path.endswith("/...") and "*" not in path and path.count("...") == 1:
+            prefix = path[:-3]
+            files = [
+                f
+                for f in self.files.values()
+                if f.depot_file.startswith(prefix) or f.client_file.startswith(prefix)
+            ]
+            return files, revision
+
+        regex = re.compile(
+            "^%s$"
+            % ".*".join(
+                "[^/]*".join(re.escape(p) for p in part.split("*"))
+                for part in path.split("...")
+            )
+        )
+        files = [
+            f
+            for f in self.files.values()
+            if regex.match(f.depot_file) or regex.match(f.client_file)
+        ]
+        return files, revision
+
+    def _target_revision(self, fake_file, revision):
+        """
+        :returns: The revision of a file a revision specifier refers to.
+        """
+        if revision in (None, "#head"):
+            return fake_file.head_rev
+        if revision == "#have":
+            return fake_file.have_rev
+        if revision == "#none":
+            return 0
+        if revision.startswith("#"):
+            return min(int(revision[1:]), fake_file.head_rev)
+        (_, last) = _change_range(revision)
+        revs = [r for r in range(1, fake_file.head_rev + 1) if fake_file.change(r) <= last]
+        return revs[-1] if revs else 0
+
+    def _transfer(self, connection, size):
+        """
+        Transfers the bytes of a file over a connection, reporting them to
+        the progress indicator of the connection.
+        """
+        progress = connection.progress
+        if progress is not None:
+            # the server reports transfers in kilobytes
+            progress.init(0)
+            progress.setDescription("sync", KBYTES)
+            progress.setTotal(size // 1024)
+        if self.throughput:
+            connection.transfer_debt += size / float(self.throughput)
+            # sleeping for every tiny file would only measure the timer
+            if connection.transfer_debt >= 0.01:
+                time.sleep(connection.transfer_debt)
+                connection.transfer_debt = 0.0
+        if progress is not None:
+            progress.update(size // 1024)
+            progress.done(False)
+        with self._lock:
+            self.bytes_transferred += size
+
+
+class FakeP4(object):
+    """
+    Connection to a :class:`FakeServer`, with the interface of a P4Python
+    ``P4`` instance.
+    """
+
+    def __init__(self):
+        self.port = PORT
+        self.user = "bench"
+        self.client = CLIENT_NAME
+        self.host = None
+        self.charset = None
+        self.ticket_file = None
+        self.password = None
+        self.exception_level = 2
+        self.handler = None
+        self.progress = None
+        self.warnings = []
+        self.errors = []
+        self.transfer_debt = 0.0
+        self._connected = False
+
+    def connect(self):
+        if self.port not in _SERVERS:
+            raise P4Exception("[P4#connect] Connect to server failed; check $P4PORT.")
+        self._connected = True
+        return self
+
+    def disconnect(self):
+        self._connected = False
+
+    def connected(self):
+        return self._connected
+
+    def run(self, command, *args):
+        """
+        Runs a command, raising depending on the exception level like P4Python.
+        """
+        if not self._connected:
+            raise P4Exception("[P4#run] Not connected to a Perforce Server.")
+        args = [a for arg in args for a in (arg if isinstance(arg, list) else [arg])]
+        (records, warnings, errors) = _SERVERS[self.port].run(self, command, args)
+        self.warnings = warnings
+        self.errors = errors
+        if errors and self.exception_level >= 1:
+            raise P4Exception(errors[0])
+        if warnings and self.exception_level >= 2:
+            raise P4Exception(warnings[0])
+        return records
+
+
+def _parse_args(args):
+    """
+    :returns: Tuple with a dictionary of the options, keyed by option, and
+              the list of paths of a command.
+    """
+    options = {}
+    paths = []
+    args = iter(args)
+    for arg in args:
+        if arg in _VALUE_OPTIONS:
+            options[arg] = next(args, "")
+        elif arg.startswith("-m") and arg[2:].isdigit():
+            options["-m"] = arg[2:]
+        elif arg.startswith("-"):
+            options[arg] = True
+        else:
+            paths.append(arg)
+    return options, paths
+
+
+def _change_range(revision):
+    """
+    :returns: Tuple with the first and last changelist of a revision
+              specifier such as ``@12,@34`` or ``@34``.
+    """
+    if not revision or not revision.startswith("@"):
+        return 0, float("inf")
+    bounds = revision[1:].split(",")
+    if len(bounds) == 1:
+        return 0, int(bounds[0])
+    return int(bounds[0]), int(bounds[1].lstrip("@"))
+
+
+def _random_size(generator):
+    """
+    :returns: A random file size, mostly small files with a few large ones.
+    """
+    draw = generator.random()
+    if draw < 0.8:
+        return generator.randint(1, 64) * 1024
+    if draw < 0.98:
+        return generator.randint(1, 32) * 1024 * 1024
+    return generator.randint(256, 1024) * 1024 * 1024
@@ -9,14 +9,23 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 from .api import LoaderManager
-from .open_publish_form import open_publish_browser
+from .headless import sync_latest_publishes, run_command
 
 import sgtk
 from sgtk.platform.qt import QtCore, QtGui
 
-from .ui import resources_rc
+# the UI requires Qt, which engines without a UI, e.g. tk-shell on a render
+# node, may not have. Only the headless sync can be used there.
+if sgtk.platform.current_engine().has_ui:
+    from .open_publish_form import open_publish_browser
+    from .sync_queue import SyncQueue
+    from .connection_pool import create_connection_pool
 
-help_screen = sgtk.platform.import_framework("tk-framework-qtwidgets", "help_screen")
+    from .ui import resources_rc
+
+    help_screen = sgtk.platform.import_framework(
+        "tk-framework-qtwidgets", "help_screen"
+    )
 
 
 def show_dialog(app):
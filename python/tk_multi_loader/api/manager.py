@@ -14,6 +14,14 @@ import sgtk
 from sgtk import TankError
 from tank_vendor import shotgun_api3
 
+from ..connection_pool import perforce_connection
+from ..sync import (
+    SyncEngine,
+    get_engine_settings,
+    get_latest_changelist,
+    snapshot_file_specs,
+)
+
 
 logger = sgtk.platform.get_logger(__name__)
 
@@ -299,6 +307,58 @@ class LoaderManager(object):
 
         return len(my_mappings) > 0
 
+    def get_latest_changelist(self):
+        """
+        Returns the latest changelist submitted to the Perforce server.
+
+        The returned changelist can be given to :meth:`sync_to_changelist`,
+        e.g. to sync the same snapshot of the depot on several machines.
+
+        :returns: The changelist number, None if nothing was ever submitted.
+        """
+        with perforce_connection(self._bundle) as p4:
+            try:
+                return get_latest_changelist(p4)
+            except RuntimeError as e:
+                raise TankError("Could not get the latest changelist: {}".format(e))
+
+    def sync_to_changelist(self, paths, changelist=None, force=False):
+        """
+        Syncs files to a changelist, giving a consistent snapshot of the depot.
+
+        All the files are synced to the same changelist in a few batched
+        server calls, so that submits made while the sync is running don't
+        leave the workspace with a mix of old and new files. Passing the
+        changelist returned by a previous call syncs the same snapshot again.
+
+        The sync runs in the calling thread.
+
+        :param paths: List of local or depot paths to sync.
+        :param changelist: Changelist number to sync to. Defaults to the
+            latest submitted changelist, read once before syncing.
+        :param force: If True, files are force synced, rewriting files which
+            are already up to date in the workspace.
+        :returns: Tuple with the changelist the files were synced to and a
+            list of :class:`tk_multi_loader.sync.SyncResult`, one per file.
+        """
+        with perforce_connection(self._bundle) as p4:
+            if changelist is None:
+                try:
+                    changelist = get_latest_changelist(p4)
+                except RuntimeError as e:
+                    raise TankError(
+                        "Could not get the latest changelist: {}".format(e)
+                    )
+                if changelist is None:
+                    raise TankError("Nothing was submitted to the Perforce server yet.")
+
+            self._logger.debug(
+                "Syncing {} files to changelist {}".format(len(paths), changelist)
+            )
+            engine = SyncEngine(p4, **get_engine_settings(self._bundle))
+            results = engine.sync(snapshot_file_specs(paths, changelist), force=force)
+        return changelist, results
+
     @staticmethod
     def _fix_timestamp(sg_data):
         """
@@ -0,0 +1,83 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import contextlib
+
+import sgtk
+from sgtk import TankError
+from sgtk.platform.qt import QtCore
+
+from . import constants
+from .sync import ConnectionPool
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+def create_connection_pool(app):
+    """
+    Creates the pool of Perforce connections shared by the app.
+
+    :param app: The loader app.
+    :returns: :class:`~tk_multi_loader.sync.ConnectionPool`
+    """
+    return ConnectionPool(
+        _connect,
+        max_size=app.get_setting("perforce_max_connections"),
+        check_interval=app.get_setting("perforce_check_interval"),
+    )
+
+
+@contextlib.contextmanager
+def perforce_connection(bundle):
+    """
+    Context manager providing a Perforce connection of the pool of a bundle.
+
+    Engines without a UI have no pool, nor do the engines and frameworks a
+    loader manager can be created for. A new connection which never prompts
+    for connection details is opened for them instead, and closed on exit.
+
+    :param bundle: The app, engine or framework instance.
+    :raises TankError: If no connection could be opened.
+    :raises RuntimeError: If no pooled connection was available in time.
+    """
+    connection_pool = getattr(bundle, "connection_pool", None)
+    if connection_pool is not None:
+        with connection_pool.connection(constants.PERFORCE_CONNECTION_TIMEOUT) as p4:
+            yield p4
+        return
+
+    fw = sgtk.platform.get_framework("tk-framework-perforce")
+    try:
+        p4 = fw.connection.connect(allow_ui=False)
+    except Exception as e:
+        raise TankError("Failed to connect to Perforce: {}".format(e))
+    if not p4:
+        raise TankError("Failed to connect to Perforce.")
+    try:
+        yield p4
+    finally:
+        p4.disconnect()
+
+
+def _connect():
+    """
+    Opens a new Perforce connection with the Perforce framework.
+
+    The framework prompts for the connection details or a password when
+    needed, which can only be done from the main thread. Connections opened
+    from a background thread, or without a Qt application, e.g. in tk-shell,
+    fail instead.
+    """
+    logger.debug("Connecting to perforce ...")
+    fw = sgtk.platform.get_framework("tk-framework-perforce")
+    qt_app = QtCore.QCoreApplication.instance()
+    if qt_app is not None and QtCore.QThread.currentThread() == qt_app.thread():
+        return fw.connection.connect()
+    return fw.connection.connect(allow_ui=False)
@@ -37,3 +37,30 @@ PUBLISHED_FILES_FIELDS = [
 # left hand side tree view search only kicks in
 # after a certain number have been typed in.
 TREE_SEARCH_TRIGGER_LENGTH = 2
+
+# transfer rate, in bytes per second, assumed when estimating the duration
+# of a sync before any sync has been measured.
+DEFAULT_SYNC_THROUGHPUT = 10 * 1024 * 1024
+
+# syncs transferring less than this number of bytes are too short to give a
+# meaningful measure of the transfer rate.
+MIN_THROUGHPUT_SAMPLE_SIZE = 10 * 1024 * 1024
+
+# number of files listed when previewing the largest files of a sync
+PREVIEW_LARGEST_FILE_COUNT = 5
+
+# maximum number of seconds to wait for a free connection of the app
+# connection pool, which is shared with the syncs running in the background
+PERFORCE_CONNECTION_TIMEOUT = 30
+
+# interval, in milliseconds, between two updates of the sync progress bar
+SYNC_PROGRESS_INTERVAL = 250
+
+# maximum number of messages kept in the log window, older ones are dropped
+LOG_MAX_LINES = 2000
+
+# interval, in milliseconds, messages are buffered for before being logged
+LOG_FLUSH_INTERVAL = 250
+
+# name of the file, in the app cache location, the full sync log goes to
+LOG_FILE_NAME = "sync.log"
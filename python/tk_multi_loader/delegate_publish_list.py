@@ -230,6 +230,17 @@ class SgPublishListDelegate(PublishDelegate):
                 revision
             )
 
+        # live revision status, when it has been polled from the server
+        revision_status = model_index.data(SgLatestPublishModel.REVISION_STATUS_ROLE)
+        if revision_status is not None and revision_status.head_rev > 0:
+            if revision_status.have_rev < revision_status.head_rev:
+                main_text += (
+                    "<span style='color:#E2A72C'>  Out of date (#%d of #%d)</span>"
+                    % (revision_status.have_rev, revision_status.head_rev)
+                )
+            else:
+                main_text += "<span style='color:#2C93E2'>  Up to date</span>"
+
         # Quicktime by John Smith at 2014-02-23 10:34
         pub_type_str = shotgun_model.get_sanitized_data(
             model_index, SgLatestPublishModel.PUBLISH_TYPE_NAME_ROLE
@@ -237,6 +237,14 @@ class SgPublishThumbDelegate(PublishDelegate):
                 model_index, SgLatestPublishModel.PUBLISH_TYPE_NAME_ROLE
             )
 
+        # flag files with newer revisions submitted, when it has been polled
+        revision_status = model_index.data(SgLatestPublishModel.REVISION_STATUS_ROLE)
+        if (
+            revision_status is not None
+            and revision_status.have_rev < revision_status.head_rev
+        ):
+            details_text += "<br><span style='color:#E2A72C'>Out of date</span>"
+
         widget.set_text(header_text, details_text)
 
     def sizeHint(self, style_options, model_index):
@@ -9,6 +9,9 @@
 # not expressly granted therein are reserved by Shotgun Software Inc.
 
 
+import datetime
+import os
+
 import sgtk
 from sgtk import TankError
 from sgtk.platform.qt import QtCore, QtGui
@@ -29,10 +32,29 @@ from .delegate_publish_history import SgPublishHistoryDelegate
 from .search_widget import SearchWidget
 from .banner import Banner
 from .loader_action_manager import LoaderActionManager
+from .log_sink import LogSink
+from .revision_watcher import RevisionWatcher
 from .utils import resolve_filters
+from .sync import (
+    SyncJob,
+    SyncResult,
+    RevisionStatusService,
+    format_size,
+    format_duration,
+    preview_sync,
+    get_latest_changelist,
+    snapshot_file_specs,
+    manifest_file_specs,
+    query_manifest,
+    read_manifest,
+    write_manifest,
+    resolve_files,
+    split_file_spec,
+)
 
 from . import constants
 from . import model_item_data
+from . import utils
 
 from .ui.dialog import Ui_Dialog
 
@@ -112,9 +134,51 @@ class AppDialog(QtGui.QWidget):
         # set up the UI
         self.ui = Ui_Dialog()
         self.ui.setupUi(self)
+        # messages are buffered and flushed to the log window and log file
+        self._log_path = os.path.join(
+            sgtk.platform.current_bundle().cache_location, constants.LOG_FILE_NAME
+        )
+        self._log_sink = LogSink(
+            self.ui.log_window,
+            log_path=self._log_path,
+            max_lines=constants.LOG_MAX_LINES,
+            flush_interval=constants.LOG_FLUSH_INTERVAL,
+            parent=self,
+        )
+        self._log_sink.verbose = self._settings_manager.retrieve(
+            "verbose_sync_log", False
+        )
         #################################################
         # Perforce
         self._p4 = None
+        # connections are pooled on the app, get one ready in the background
+        # so that the first Perforce query doesn't pay for connecting.
+        self._connection_pool = sgtk.platform.current_bundle().connection_pool
+        self._connection_pool.warm_up()
+        # syncs are queued on the app so that they survive the dialog
+        self._sync_queue = sgtk.platform.current_bundle().sync_queue
+        # paths synced since the queue was last idle, to refresh once it is
+        self._synced_paths = set()
+        # revision status of the workspace files, cached between sessions
+        self._have_list_index = sgtk.platform.current_bundle().have_list_index
+        # out of date publishes are flagged as revisions get submitted
+        self._revision_watcher = None
+        watch_interval = sgtk.platform.current_bundle().get_setting(
+            "revision_watch_interval"
+        )
+        if watch_interval > 0:
+            self._revision_watcher = RevisionWatcher(
+                self._connection_pool,
+                have_list_index=self._have_list_index,
+                interval=watch_interval,
+                max_interval=sgtk.platform.current_bundle().get_setting(
+                    "revision_watch_max_interval"
+                ),
+                parent=self,
+            )
+            self._revision_watcher.statuses_changed.connect(
+                self._on_revision_statuses_changed
+            )
         #################################################
         # maintain a list where we keep a reference to
         # all the dynamic UI we create. This is to make
@@ -192,6 +256,18 @@ class AppDialog(QtGui.QWidget):
             self._publish_history_model.async_refresh
         )
         self.ui.history_view.addAction(self._refresh_history_action)
+        self._sync_selection_action = QtGui.QAction(
+            "Get Latest Revision (Selection)", self
+        )
+        self._sync_selection_action.triggered.connect(self._on_sync_selection)
+        self.ui.history_view.addAction(self._sync_selection_action)
+        self._sync_revision_action = QtGui.QAction("Sync This Revision", self)
+        self._sync_revision_action.setToolTip(
+            "Sync the selected publishes to the Perforce revision they were "
+            "published at, rolling back newer revisions in the workspace."
+        )
+        self._sync_revision_action.triggered.connect(self._on_sync_revision)
+        self.ui.history_view.addAction(self._sync_revision_action)
         self.ui.history_view.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
 
         # if an item in the list is double clicked the default action is run
@@ -296,6 +372,68 @@ class AppDialog(QtGui.QWidget):
         #################################################
         # checkboxes, buttons etc
         self.ui.get_latest_revision.clicked.connect(self._on_get_latest_revision)
+
+        # additional sync modes are available from the button menu
+        self._sync_menu = QtGui.QMenu(self.ui.get_latest_revision)
+        self._force_sync_action = QtGui.QAction("Force Resync (Repair)", self)
+        self._force_sync_action.setToolTip(
+            "Rewrite every visible file from the server, even files the workspace "
+            "already has. Use this to repair a damaged workspace."
+        )
+        self._force_sync_action.triggered.connect(self._on_force_resync)
+        self._sync_menu.addAction(self._force_sync_action)
+        self._preview_sync_action = QtGui.QAction("Preview Sync", self)
+        self._preview_sync_action.setToolTip(
+            "Show how many files and bytes a sync would transfer, without "
+            "transferring anything."
+        )
+        self._preview_sync_action.triggered.connect(self._on_preview_sync)
+        self._sync_menu.addAction(self._preview_sync_action)
+        self._sync_menu.addSeparator()
+        self._snapshot_sync_action = QtGui.QAction(
+            "Snapshot Sync (Latest Changelist)", self
+        )
+        self._snapshot_sync_action.setToolTip(
+            "Sync every visible file to the latest submitted changelist, so that "
+            "submits made during the sync don't leave a mix of old and new files."
+        )
+        self._snapshot_sync_action.triggered.connect(self._on_snapshot_sync)
+        self._sync_menu.addAction(self._snapshot_sync_action)
+        self._last_snapshot_sync_action = QtGui.QAction("Sync to Last Snapshot", self)
+        self._last_snapshot_sync_action.setToolTip(
+            "Sync every visible file to the changelist of the last snapshot sync."
+        )
+        self._last_snapshot_sync_action.triggered.connect(
+            self._on_last_snapshot_sync
+        )
+        self._sync_menu.addAction(self._last_snapshot_sync_action)
+        self._sync_menu.addSeparator()
+        self._export_manifest_action = QtGui.QAction("Export Manifest...", self)
+        self._export_manifest_action.setToolTip(
+            "Save the depot path and the workspace revision of every visible file "
+            "to a JSON or CSV manifest."
+        )
+        self._export_manifest_action.triggered.connect(self._on_export_manifest)
+        self._sync_menu.addAction(self._export_manifest_action)
+        self._apply_manifest_action = QtGui.QAction("Apply Manifest...", self)
+        self._apply_manifest_action.setToolTip(
+            "Sync the workspace to exactly the revisions listed in a manifest."
+        )
+        self._apply_manifest_action.triggered.connect(self._on_apply_manifest)
+        self._sync_menu.addAction(self._apply_manifest_action)
+        self._sync_menu.aboutToShow.connect(self._update_snapshot_sync_action)
+        self.ui.get_latest_revision.setMenu(self._sync_menu)
+        self.ui.get_latest_revision.setPopupMode(QtGui.QToolButton.MenuButtonPopup)
+        self.ui.cancel_sync.clicked.connect(self._on_cancel_sync)
+        # the sync progress is polled rather than pushed for every file
+        self._sync_progress_timer = QtCore.QTimer(self)
+        self._sync_progress_timer.setInterval(constants.SYNC_PROGRESS_INTERVAL)
+        self._sync_progress_timer.timeout.connect(self._on_sync_progress_timer)
+        self._sync_queue.job_added.connect(self._on_sync_job_added)
+        self._sync_queue.job_started.connect(self._on_sync_job_started)
+        self._sync_queue.results_available.connect(self._on_sync_results)
+        self._sync_queue.job_finished.connect(self._on_sync_job_finished)
+        self._show_sync_queue_state()
         # self.ui.show_sub_items.toggled.connect(self._on_show_subitems_toggled)
 
         self.ui.check_all.clicked.connect(self._publish_type_model.select_all)
@@ -337,6 +475,24 @@ class AppDialog(QtGui.QWidget):
         self._reload_action.triggered.connect(self._on_reload_action)
         self.ui.cog_button.addAction(self._reload_action)
 
+        self._verbose_log_action = QtGui.QAction("Verbose Sync Log", self)
+        self._verbose_log_action.setCheckable(True)
+        self._verbose_log_action.setChecked(self._log_sink.verbose)
+        self._verbose_log_action.setToolTip(
+            "Show the status of every single synced file in the log."
+        )
+        self._verbose_log_action.toggled.connect(self._on_verbose_log_toggled)
+        self.ui.cog_button.addAction(self._verbose_log_action)
+
+        self._open_log_action = QtGui.QAction("Open Sync Log File", self)
+        self._open_log_action.triggered.connect(self._on_open_log_action)
+        self.ui.cog_button.addAction(self._open_log_action)
+
+        if self._have_list_index:
+            self._rebuild_index_action = QtGui.QAction("Rebuild Perforce Index", self)
+            self._rebuild_index_action.triggered.connect(self._on_rebuild_index_action)
+            self.ui.cog_button.addAction(self._rebuild_index_action)
+
         #################################################
         # set up preset tabs and load and init tree views
         self._entity_presets = {}
@@ -365,6 +521,19 @@ class AppDialog(QtGui.QWidget):
         )
         menu.addActions(actions)
 
+        menu.addSeparator()
+        if self.selected_publishes:
+            menu.addAction(self._sync_selection_action)
+            menu.addAction(self._sync_revision_action)
+
+        # folders get a recursive sync of everything below them
+        folder_items = self._selected_folder_tree_items()
+        if folder_items:
+            sync_action = menu.addAction("Get Latest Revision (Recursive)")
+            sync_action.triggered.connect(
+                lambda: self._on_get_latest_revision_recursive(folder_items)
+            )
+
         # Qt is our friend here. If there are no actions available, the separator won't be added, yay!
         menu.addSeparator()
         menu.addAction(self._refresh_action)
@@ -422,6 +591,39 @@ class AppDialog(QtGui.QWidget):
 
         return sg_data_list
 
+    def _selected_folder_tree_items(self):
+        """
+        Get the entity tree view items associated with the folders selected
+        in the main publish view.
+        """
+        tree_items = []
+        selection_model = self.ui.publish_view.selectionModel()
+        if selection_model.hasSelection():
+            for proxy_index in selection_model.selection().indexes():
+                source_index = proxy_index.model().mapToSource(proxy_index)
+                item = source_index.model().itemFromIndex(source_index)
+                if item.data(SgLatestPublishModel.IS_FOLDER_ROLE):
+                    tree_item = self._publish_model.get_associated_tree_view_item(item)
+                    if tree_item:
+                        tree_items.append(tree_item)
+        return tree_items
+
+    def showEvent(self, event):
+        """
+        Executed when the dialog is shown, resumes watching for submitted revisions.
+        """
+        if self._revision_watcher:
+            self._revision_watcher.start_watching()
+        return QtGui.QWidget.showEvent(self, event)
+
+    def hideEvent(self, event):
+        """
+        Executed when the dialog is hidden, stops watching for submitted revisions.
+        """
+        if self._revision_watcher:
+            self._revision_watcher.stop_watching()
+        return QtGui.QWidget.hideEvent(self, event)
+
     def closeEvent(self, event):
         """
         Executed when the main dialog is closed.
@@ -455,6 +657,25 @@ class AppDialog(QtGui.QWidget):
                     self._on_treeview_item_selected
                 )
 
+            if self._revision_watcher:
+                self._revision_watcher.statuses_changed.disconnect(
+                    self._on_revision_statuses_changed
+                )
+                self._revision_watcher.stop_watching()
+                self._revision_watcher.wait()
+
+            self._log_sink.flush()
+
+            # queued syncs carry on without the dialog
+            self._sync_progress_timer.stop()
+            if self._p4:
+                self._connection_pool.release(self._p4)
+                self._p4 = None
+            self._sync_queue.job_added.disconnect(self._on_sync_job_added)
+            self._sync_queue.job_started.disconnect(self._on_sync_job_started)
+            self._sync_queue.results_available.disconnect(self._on_sync_results)
+            self._sync_queue.job_finished.disconnect(self._on_sync_job_finished)
+
             # gracefully close all connections
             shotgun_globals.unregister_bg_task_manager(self._task_manager)
             self._task_manager.shut_down()
@@ -998,6 +1219,19 @@ class AppDialog(QtGui.QWidget):
         else:
             self._publish_main_overlay.hide()
 
+        if self._revision_watcher:
+            self._revision_watcher.set_paths(self._publish_model.get_publish_paths())
+
+    def _on_revision_statuses_changed(self, statuses):
+        """
+        Called by the revision watcher with the live revision status of the
+        publishes, flags the out of date ones in place.
+
+        :param statuses: Dictionary of :class:`~tk_multi_loader.sync.RevisionStatus`
+                         keyed by local path.
+        """
+        self._publish_model.update_revision_status(statuses)
+
 
 
     def _on_show_subitems_toggled(self):
@@ -1102,23 +1336,625 @@ class AppDialog(QtGui.QWidget):
         elif files_to_sync_count > 0:
             msg = "\n <span style='color:#2C93E2'>Syncing {} files ... </span> \n".format(files_to_sync_count)
             self._add_log(msg, 2)
-            self._get_latest_revision(files_to_sync)
-            msg = "\n <span style='color:#2C93E2'>Syncing files is complete</span> \n"
+            self._get_latest_revision(
+                files_to_sync, self._get_sync_job_name(self._get_selected_entity())
+            )
+
+    def _on_force_resync(self):
+        """
+        When someone picks "Force Resync" from the "Get Latest Revision" menu
+        """
+        self._connect()
+        files_to_sync, total_file_count = self._get_peforce_data(force=True)
+        files_to_sync_count = len(files_to_sync)
+        if files_to_sync_count == 0:
+            msg = "\n <span style='color:#2C93E2'>No files to resync</span> \n"
+            self._add_log(msg, 2)
+            return
+
+        answer = QtGui.QMessageBox.question(
+            self,
+            "Force Resync",
+            "Force resync rewrites all {} visible files from the server, including "
+            "the ones which are already up to date.\n\nContinue?".format(
+                files_to_sync_count
+            ),
+            QtGui.QMessageBox.Yes | QtGui.QMessageBox.No,
+        )
+        if answer != QtGui.QMessageBox.Yes:
+            return
+
+        msg = "\n <span style='color:#2C93E2'>Force resyncing {} files ... </span> \n".format(files_to_sync_count)
+        self._add_log(msg, 2)
+        self._get_latest_revision(
+            files_to_sync,
+            self._get_sync_job_name(self._get_selected_entity()),
+            force=True,
+        )
+
+    def _on_snapshot_sync(self):
+        """
+        When someone picks "Snapshot Sync" from the "Get Latest Revision" menu.
+
+        The latest changelist is read once and every visible file is synced
+        to it, giving a consistent view of the depot. The changelist is
+        remembered so that the same snapshot can be synced again later.
+        """
+        self._connect()
+        try:
+            changelist = get_latest_changelist(self._p4)
+        except RuntimeError as e:
+            msg = "\n <span style='color:#CC3333'>Failed to get the latest changelist: {}</span> \n".format(e)
+            self._add_log(msg, 3)
+            return
+        if changelist is None:
+            msg = "\n <span style='color:#2C93E2'>Nothing was submitted to the server yet</span> \n"
             self._add_log(msg, 2)
-            msg = "\n <span style='color:#2C93E2'>Reloading data ...</span> \n"
+            return
+
+        self._settings_manager.store("last_snapshot_changelist", changelist)
+        self._snapshot_sync(changelist)
+
+    def _on_last_snapshot_sync(self):
+        """
+        When someone picks "Sync to Last Snapshot" from the "Get Latest Revision" menu
+        """
+        changelist = self._settings_manager.retrieve("last_snapshot_changelist", None)
+        if changelist is None:
+            msg = "\n <span style='color:#2C93E2'>No snapshot sync was done yet</span> \n"
             self._add_log(msg, 2)
-            self._status_model.hard_refresh()
-            self._publish_history_model.hard_refresh()
-            # self._publish_type_model.hard_refresh()
-            self._publish_model.hard_refresh()
-            for p in self._entity_presets:
-                self._entity_presets[p].model.hard_refresh()
-            self._setup_details_panel([])
-            self._get_perforce_summary()
+            return
+
+        self._connect()
+        self._snapshot_sync(changelist)
+
+    def _update_snapshot_sync_action(self):
+        """
+        Shows the changelist of the last snapshot in the "Get Latest Revision" menu.
+        """
+        changelist = self._settings_manager.retrieve("last_snapshot_changelist", None)
+        if changelist is None:
+            self._last_snapshot_sync_action.setText("Sync to Last Snapshot")
+            self._last_snapshot_sync_action.setEnabled(False)
+        else:
+            self._last_snapshot_sync_action.setText(
+                "Sync to Last Snapshot (@{})".format(changelist)
+            )
+            self._last_snapshot_sync_action.setEnabled(True)
+
+    def _snapshot_sync(self, changelist):
+        """
+        Queues a sync of every visible file to the given changelist.
+
+        :param changelist: Changelist number.
+        """
+        files_to_sync, total_file_count = self._get_peforce_data(force=True)
+        if not files_to_sync:
+            msg = "\n <span style='color:#2C93E2'>No files to sync</span> \n"
+            self._add_log(msg, 2)
+            return
+
+        msg = "\n <span style='color:#2C93E2'>Syncing {} files to changelist {} ... </span> \n".format(
+            len(files_to_sync), changelist
+        )
+        self._add_log(msg, 2)
+        name = "{} @{}".format(
+            self._get_sync_job_name(self._get_selected_entity()), changelist
+        )
+        self._queue_sync(snapshot_file_specs(files_to_sync, changelist), name)
+
+    def _on_export_manifest(self):
+        """
+        When someone picks "Export Manifest" from the "Get Latest Revision" menu
+        """
+        publish_paths, _ = self._get_peforce_data(force=True)
+        self._export_manifest(
+            publish_paths, self._get_sync_job_name(self._get_selected_entity())
+        )
+
+    def _on_tree_export_manifest(self):
+        """
+        When someone picks "Export Manifest (Recursive)" in the entity tree view
+        """
+        selected_item = self._get_selected_entity()
+        if not selected_item:
+            return
+
+        QtGui.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            publish_paths = []
+            for sg_item in self._get_descendant_publishes(selected_item):
+                local_path = (sg_item.get("path") or {}).get("local_path")
+                if local_path and local_path not in publish_paths:
+                    publish_paths.append(local_path)
+        finally:
+            QtGui.QApplication.restoreOverrideCursor()
+        self._export_manifest(publish_paths, self._get_sync_job_name(selected_item))
+
+    def _export_manifest(self, publish_paths, name):
+        """
+        Asks for a file and writes the manifest of the given publishes to it,
+        with the workspace revision of every file read in batched queries.
+
+        :param publish_paths: List of local paths.
+        :param name: Name the file name proposed to save the manifest to is
+                     derived from.
+        """
+        if not publish_paths:
+            msg = "\n <span style='color:#2C93E2'>No files to export</span> \n"
+            self._add_log(msg, 2)
+            return
+
+        file_name = "{}.json".format(
+            "".join(c if c.isalnum() or c in "-_." else "_" for c in name) or "manifest"
+        )
+        manifest_path = self._get_file_name(
+            QtGui.QFileDialog.getSaveFileName,
+            "Export Manifest",
+            os.path.join(self._get_manifest_folder(), file_name),
+        )
+        if not manifest_path:
+            return
+
+        self._connect()
+        QtGui.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            entries = query_manifest(self._p4, publish_paths)
+            write_manifest(manifest_path, entries)
+        except (IOError, OSError) as e:
+            msg = "\n <span style='color:#CC3333'>Failed to export the manifest: {}</span> \n".format(e)
+            self._add_log(msg, 3)
+            return
+        finally:
+            QtGui.QApplication.restoreOverrideCursor()
+
+        self._settings_manager.store(
+            "manifest_folder", os.path.dirname(manifest_path)
+        )
+        msg = "\n <span style='color:#2C93E2'>Exported the revisions of {} files to {}</span> \n".format(
+            len(entries), manifest_path
+        )
+        self._add_log(msg, 2)
+
+    def _on_apply_manifest(self):
+        """
+        When someone picks "Apply Manifest" from the "Get Latest Revision" menu.
+
+        Every file of the manifest is synced to its revision in a single
+        queued sync, files the manifest lists without a revision are removed
+        from the workspace.
+        """
+        manifest_path = self._get_file_name(
+            QtGui.QFileDialog.getOpenFileName,
+            "Apply Manifest",
+            self._get_manifest_folder(),
+        )
+        if not manifest_path:
+            return
+
+        try:
+            entries = read_manifest(manifest_path)
+        except (IOError, OSError, ValueError) as e:
+            msg = "\n <span style='color:#CC3333'>Failed to read the manifest: {}</span> \n".format(e)
+            self._add_log(msg, 3)
+            return
+        if not entries:
+            msg = "\n <span style='color:#2C93E2'>The manifest doesn't list any files</span> \n"
+            self._add_log(msg, 2)
+            return
+
+        self._settings_manager.store(
+            "manifest_folder", os.path.dirname(manifest_path)
+        )
+        msg = "\n <span style='color:#2C93E2'>Syncing {} files to the revisions of {} ... </span> \n".format(
+            len(entries), manifest_path
+        )
+        self._add_log(msg, 2)
+        self._queue_sync(
+            manifest_file_specs(entries), os.path.basename(manifest_path)
+        )
+
+    def _get_manifest_folder(self):
+        """
+        :returns: The folder manifests were last exported to or applied from.
+        """
+        return self._settings_manager.retrieve("manifest_folder", "") or os.path.expanduser("~")
+
+    def _get_file_name(self, file_dialog, caption, path):
+        """
+        Asks for the path of a manifest file.
+
+        :param file_dialog: ``QFileDialog.getSaveFileName`` or ``QFileDialog.getOpenFileName``
+        :param caption: Caption of the file dialog.
+        :param path: Path the file dialog opens at.
+        :returns: The picked path, None if the dialog was cancelled.
+        """
+        result = file_dialog(
+            self, caption, path, "Manifests (*.json *.csv);;JSON (*.json);;CSV (*.csv)"
+        )
+        # PySide returns the picked filter along with the path
+        if isinstance(result, tuple):
+            result = result[0]
+        return result or None
+
+    def _on_sync_selection(self):
+        """
+        When someone picks "Get Latest Revision (Selection)" in the publish
+        or history view context menu
+        """
+        publish_paths = []
+        for sg_item in self.selected_publishes:
+            local_path = (sg_item.get("path") or {}).get("local_path")
+            if local_path and local_path not in publish_paths:
+                publish_paths.append(local_path)
+        if not publish_paths:
+            return
+
+        self._connect()
+        files_to_sync = self._get_out_of_date_files(publish_paths)
+        if not files_to_sync:
+            msg = "\n <span style='color:#2C93E2'>The selected files are up to date</span> \n"
+            self._add_log(msg, 2)
+            return
+
+        msg = "\n <span style='color:#2C93E2'>Syncing {} of {} selected files ... </span> \n".format(
+            len(files_to_sync), len(publish_paths)
+        )
+        self._add_log(msg, 2)
+        # what the user is looking at goes ahead of any background sync
+        self._get_latest_revision(
+            files_to_sync, "selection", priority=SyncJob.PRIORITY_SELECTION
+        )
+
+    def _on_sync_revision(self):
+        """
+        When someone picks "Sync This Revision" in the publish or history view
+        context menu. Every selected publish is synced to the revision stored
+        with its ShotGrid data, all in the same batched sync.
+        """
+        file_specs = []
+        skipped = []
+        for sg_item in self.selected_publishes:
+            local_path = (sg_item.get("path") or {}).get("local_path")
+            revision = utils.get_publish_revision(sg_item)
+            if not local_path:
+                continue
+            if revision is None:
+                skipped.append(local_path)
+                continue
+            file_specs.append("{}#{}".format(local_path, revision))
+
+        for local_path in skipped:
+            msg = "<span style='color:#E2552C'>No revision known for {}, skipping it</span>".format(
+                local_path
+            )
+            self._add_log(msg, 3)
+        if not file_specs:
+            return
+
+        msg = "\n <span style='color:#2C93E2'>Syncing {} files to their published revision ... </span> \n".format(
+            len(file_specs)
+        )
+        self._add_log(msg, 2)
+        if len(file_specs) == 1:
+            name = os.path.basename(file_specs[0])
+        else:
+            name = "selected revisions"
+        self._queue_sync(file_specs, name, priority=SyncJob.PRIORITY_SELECTION)
+
+    def _on_tree_get_latest_revision(self):
+        """
+        When someone picks "Get Latest Revision (Recursive)" in the entity tree view
+        """
+        selected_item = self._get_selected_entity()
+        if selected_item:
+            self._on_get_latest_revision_recursive([selected_item])
+
+    def _on_get_latest_revision_recursive(self, tree_items):
+        """
+        Syncs the latest revision of every publish below the given entity
+        tree view items, the way "Get Latest Revision" does for the publishes
+        currently displayed.
+
+        :param tree_items: List of items from the entity tree view.
+        """
+        self._connect()
+        QtGui.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            publish_paths = []
+            seen_paths = set()
+            for tree_item in tree_items:
+                for sg_item in self._get_descendant_publishes(tree_item):
+                    local_path = (sg_item.get("path") or {}).get("local_path")
+                    if local_path and local_path not in seen_paths:
+                        seen_paths.add(local_path)
+                        publish_paths.append(local_path)
+            files_to_sync = self._get_out_of_date_files(publish_paths)
+        finally:
+            QtGui.QApplication.restoreOverrideCursor()
+
+        if not files_to_sync:
+            msg = "\n <span style='color:#2C93E2'>No Need to sync</span> \n"
+            self._add_log(msg, 2)
+            return
+
+        msg = "\n <span style='color:#2C93E2'>Syncing {} of {} files ... </span> \n".format(
+            len(files_to_sync), len(publish_paths)
+        )
+        self._add_log(msg, 2)
+
+        # a sync from the top of a tree is a project wide background sync
+        if any(tree_item.parent() is None for tree_item in tree_items):
+            priority = SyncJob.PRIORITY_PROJECT
+        else:
+            priority = SyncJob.PRIORITY_ENTITY
+        self._get_latest_revision(
+            files_to_sync,
+            ", ".join(self._get_sync_job_name(tree_item) for tree_item in tree_items),
+            priority=priority,
+        )
+
+    def _get_descendant_publishes(self, tree_item):
+        """
+        Retrieves the latest publishes associated with an entity tree view
+        item and with all the items below it, loaded or not, using a single
+        batched publish query.
+
+        :param tree_item: Item from the entity tree view.
+        :returns: List of shotgun published file dictionaries.
+        """
+        app = sgtk.platform.current_bundle()
+
+        # note! Because of nasty bug https://bugreports.qt-project.org/browse/PYSIDE-158,
+        # we cannot pull the model directly from the item but have to pull it from
+        # the model index instead.
+        model = tree_item.index().model()
+        preset = self._entity_presets[self._current_entity_preset]
+        publish_filters = list(preset.publish_filters)
+
+        if isinstance(model, SgHierarchyModel):
+            # hierarchy items carry the navigation filter presets matching
+            # every publish below them in the ShotGrid hierarchy.
+            sg_data = shotgun_model.get_sg_data(tree_item) or {}
+            filter_presets = (sg_data.get("target_entities") or {}).get(
+                "additional_filter_presets"
+            )
+            if not filter_presets:
+                return []
+            return utils.find_latest_publishes(
+                app, publish_filters, additional_filter_presets=filter_presets
+            )
+
+        # for a query tab, resolve all the entities below the item first,
+        # the same way the "Show items in subfolders" mode does.
+        entity_type = model.get_entity_type()
+        entities = app.shotgun.find(entity_type, model.get_filters(tree_item))
+
+        link_filters = []
+        if entities:
+            if entity_type == "Task":
+                link_filters.append(["task", "in", entities])
+            elif entity_type == "Version":
+                link_filters.append(["version", "in", entities])
+            else:
+                link_filters.append(["entity", "in", entities])
+
+        # intermediate nodes like a sequence can have publishes of their own
+        (_, field_value) = model_item_data.get_item_data(tree_item)
+        if isinstance(field_value, dict) and "type" in field_value and "id" in field_value:
+            link_filters.append(
+                ["entity", "is", {"type": field_value["type"], "id": field_value["id"]}]
+            )
+
+        if not link_filters:
+            return []
+
+        sg_filters = [{"filter_operator": "any", "filters": link_filters}]
+        return utils.find_latest_publishes(app, sg_filters + publish_filters)
+
+    def _on_sync_job_added(self, job):
+        """
+        Called when a sync job has been queued.
+
+        :param job: The queued :class:`~tk_multi_loader.sync.SyncJob`
+        """
+        if job.start_after:
+            msg = "\n <span style='color:#2C93E2'>Deferred {} files of {} to the off-peak hours, starting at {}</span> \n".format(
+                len(job.file_specs),
+                job.name,
+                datetime.datetime.fromtimestamp(job.start_after).strftime("%H:%M"),
+            )
+            self._add_log(msg, 2)
+        elif self._sync_queue.current_job:
+            # another sync is running, this one has to wait
+            msg = "\n <span style='color:#2C93E2'>Queued sync of {}: {} files</span> \n".format(
+                job.name, len(job.file_specs)
+            )
+            self._add_log(msg, 2)
+        self.ui.cancel_sync.setVisible(True)
+        self.ui.cancel_sync.setEnabled(True)
+
+    def _on_sync_job_started(self, job):
+        """
+        Called when a queued sync job starts running.
+
+        :param job: The running :class:`~tk_multi_loader.sync.SyncJob`
+        """
+        msg = "\n <span style='color:#2C93E2'>Started sync of {}: {} files</span> \n".format(
+            job.name, len(job.file_specs)
+        )
+        self._add_log(msg, 2)
+        self.ui.cancel_sync.setVisible(True)
+        self._sync_progress_timer.start()
 
-            msg = "\n <span style='color:#2C93E2'>Reloading data is complete</span> \n"
+    def _on_sync_job_finished(self, job):
+        """
+        Called once a sync job is over, either because all the files were
+        synced, because it was cancelled or because it failed.
+
+        :param job: The finished :class:`~tk_multi_loader.sync.SyncJob`
+        """
+        stats = job.stats
+        if job.state == SyncJob.FAILED:
+            msg = "\n <span style='color:#E2552C'>Sync of {} failed: {}</span> \n".format(
+                job.name, job.error
+            )
+        elif job.state == SyncJob.CANCELLED:
+            msg = "\n <span style='color:#2C93E2'>Sync of {} was cancelled</span> \n".format(
+                job.name
+            )
+        else:
+            msg = "\n <span style='color:#2C93E2'>Sync of {} is complete</span> \n".format(
+                job.name
+            )
+        self._add_log(msg, 2)
+
+        if stats:
+            msg = "\n <span style='color:#2C93E2'>{}</span> \n".format(stats.summary())
+            self._add_log(msg, 2)
+            if (
+                stats.files_failed
+                or stats.files_retried
+                or stats.files_deferred
+                or stats.files_skipped
+            ):
+                self._add_log(self._format_summary_table(stats), 4)
+            if stats.bytes_transferred >= constants.MIN_THROUGHPUT_SAMPLE_SIZE:
+                # remember the measured transfer rate for sync time estimates
+                self._settings_manager.store("sync_throughput", stats.throughput())
+            if job.state == SyncJob.DONE and stats.needs_resolve:
+                self._offer_resolve(job)
+
+        if self._sync_queue.is_busy():
+            # wait for the queue to drain before reloading
+            return
+
+        self._sync_progress_timer.stop()
+        self._update_progress(0)
+        self.ui.cancel_sync.setVisible(False)
+        self.ui.cancel_sync.setEnabled(True)
+
+        # a sync doesn't change anything in Shotgun, only the revision
+        # status of the synced files needs updating. The Shotgun data, tree
+        # views and thumbnails are kept as they are.
+        synced_paths = list(self._synced_paths)
+        self._synced_paths = set()
+        if synced_paths:
+            msg = "\n <span style='color:#2C93E2'>Updating the status of {} synced files ...</span> \n".format(
+                len(synced_paths)
+            )
+            self._add_log(msg, 2)
+            self._connect()
+            self._publish_model.update_revision_status(
+                self._get_revision_status(synced_paths)
+            )
+
+    def _offer_resolve(self, job):
+        """
+        Offers to sync the opened files a job left out which have newer
+        revisions, and to resolve the opened files it synced to newer revisions.
+        Files which don't need a resolve are never offered.
+
+        :param job: The finished :class:`~tk_multi_loader.sync.SyncJob`
+        """
+        skipped_paths = set(
+            r.path for r in job.stats.needs_resolve if r.status == SyncResult.SKIPPED
+        )
+        synced_paths = sorted(
+            r.path for r in job.stats.needs_resolve if r.status == SyncResult.SYNCED
+        )
+
+        if skipped_paths:
+            answer = QtGui.QMessageBox.question(
+                self,
+                "Opened Files",
+                "{} files opened in your workspace have newer revisions and were "
+                "left out of the sync.\n\nSync them now? You will have to resolve "
+                "them before submitting.".format(len(skipped_paths)),
+                QtGui.QMessageBox.Yes | QtGui.QMessageBox.No,
+            )
+            if answer == QtGui.QMessageBox.Yes:
+                file_specs = [
+                    s for s in job.file_specs if split_file_spec(s)[0] in skipped_paths
+                ]
+                self._queue_sync(
+                    file_specs,
+                    "{} (opened files)".format(job.name),
+                    priority=SyncJob.PRIORITY_SELECTION,
+                    include_opened=True,
+                )
+
+        if synced_paths:
+            answer = QtGui.QMessageBox.question(
+                self,
+                "Resolve",
+                "{} files opened in your workspace were synced to newer revisions "
+                "and need resolving.\n\nResolve the ones without conflicting "
+                "changes now?".format(len(synced_paths)),
+                QtGui.QMessageBox.Yes | QtGui.QMessageBox.No,
+            )
+            if answer != QtGui.QMessageBox.Yes:
+                return
+            self._connect()
+            try:
+                unresolved = resolve_files(self._p4, synced_paths)
+            except Exception as e:
+                msg = "\n <span style='color:#CC3333'>Failed to resolve files: {}</span> \n".format(e)
+                self._add_log(msg, 3)
+                return
+            msg = "\n <span style='color:#2C93E2'>Resolved {} files</span> \n".format(
+                len(synced_paths) - len(unresolved)
+            )
+            self._add_log(msg, 2)
+            for path in unresolved:
+                msg = "<span style='color:#E2A32C'>Conflicting changes, resolve in P4V: {}</span>".format(
+                    path
+                )
+                self._add_log(msg, 4)
+
+    def _on_cancel_sync(self):
+        """
+        When someone clicks on the "Cancel" button while syncs are queued or running
+        """
+        if self._sync_queue.is_busy() or self._sync_queue.pending_jobs():
+            msg = "\n <span style='color:#2C93E2'>Cancelling syncs ...</span> \n"
+            self._add_log(msg, 2)
+            self.ui.cancel_sync.setEnabled(False)
+            self._sync_queue.cancel_all()
+
+    def _show_sync_queue_state(self):
+        """
+        Shows the syncs which kept running on the app sync queue while the
+        dialog was closed.
+        """
+        job = self._sync_queue.current_job
+        pending_jobs = self._sync_queue.pending_jobs()
+        if not job and not pending_jobs:
+            return
+
+        self.ui.cancel_sync.setVisible(True)
+        if job and job.stats:
+            msg = "\n <span style='color:#2C93E2'>Syncing {}: {} of {} files done</span> \n".format(
+                job.name, job.stats.done, job.stats.total
+            )
+            self._add_log(msg, 2)
+            self._sync_progress_timer.start()
+        for pending_job in pending_jobs:
+            msg = "\n <span style='color:#2C93E2'>Queued sync of {}: {} files</span> \n".format(
+                pending_job.name, len(pending_job.file_specs)
+            )
             self._add_log(msg, 2)
 
+    def _get_sync_job_name(self, tree_item):
+        """
+        Get a display name for a sync of the publishes of an entity tree view item.
+
+        :param tree_item: Item from the entity tree view, None for the
+                          top level of the current tab.
+        """
+        if tree_item is None:
+            return self._current_entity_preset
+        return tree_item.text()
 
     def _get_perforce_summary(self):
         """
@@ -1132,19 +1968,65 @@ class AppDialog(QtGui.QWidget):
             self._add_log(msg, 2)
 
         elif files_to_sync_count > 0:
-            msg = "\n <span style='color:#2C93E2'>Need to sync {} files</span> \n".format(files_to_sync_count)
+            msg = "\n <span style='color:#2C93E2'>Need to sync {} of {} files</span> \n".format(
+                files_to_sync_count, total_file_count
+            )
+            self._add_log(msg, 2)
+
+    def _on_preview_sync(self):
+        """
+        When someone picks "Preview Sync" from the "Get Latest Revision" menu
+        """
+        self._connect()
+        files_to_sync, total_file_count = self._get_peforce_data()
+        if not files_to_sync:
+            msg = "\n <span style='color:#2C93E2'>No Need to sync</span> \n"
             self._add_log(msg, 2)
+            return
+
+        QtGui.QApplication.setOverrideCursor(QtCore.Qt.WaitCursor)
+        try:
+            file_specs = [file_path + "#head" for file_path in files_to_sync]
+            preview = preview_sync(self._p4, file_specs)
+        except Exception as e:
+            msg = "\n <span style='color:#CC3333'>Failed to preview the sync: {}</span> \n".format(e)
+            self._add_log(msg, 3)
+            return
+        finally:
+            QtGui.QApplication.restoreOverrideCursor()
+
+        throughput = self._settings_manager.retrieve(
+            "sync_throughput", constants.DEFAULT_SYNC_THROUGHPUT
+        )
+        msg = (
+            "\n <span style='color:#2C93E2'>Sync preview: {} files, {}, "
+            "about {} at {}/s</span> \n".format(
+                preview.file_count,
+                format_size(preview.total_bytes),
+                format_duration(preview.estimate_seconds(throughput)),
+                format_size(throughput),
+            )
+        )
+        self._add_log(msg, 2)
+        for preview_file in preview.largest(constants.PREVIEW_LARGEST_FILE_COUNT):
+            msg = "  {}  {}#{}".format(
+                format_size(preview_file.size), preview_file.depot_file, preview_file.rev
+            )
+            self._add_log(msg, 3)
 
     ########################################################################################
 
     # Perforce connection, Sync, and related GUI items
-    def _get_peforce_data(self):
+    def _get_peforce_data(self, force=False):
         """
         Get lastest revision
+
+        :param force: If True, every visible file is returned, including the
+                      ones which are already up to date.
         :return:
         """
         total_file_count = 0
-        files_to_sync = []
+        publish_paths = []
 
         model = self.ui.publish_view.model()
         for row in range(model.rowCount()):
@@ -1161,30 +2043,185 @@ class AppDialog(QtGui.QWidget):
                 total_file_count += 1
                 sg_item = shotgun_model.get_sg_data(model_index)
                 # logger.info("--------->>>>>>  sg_item is: {}".format(sg_item))
-                have_rev = sg_item.get('haveRev', "0")
-                head_rev = sg_item.get('headRev', "0")
-                if self._to_sync(have_rev, head_rev):
-                    if 'path' in sg_item:
-                        local_path = sg_item['path'].get('local_path', None)
-                        if local_path:
-                            files_to_sync.append(local_path)
+                local_path = (sg_item.get("path") or {}).get("local_path")
+                if local_path:
+                    publish_paths.append(local_path)
+
+        if force:
+            files_to_sync = publish_paths
+        else:
+            files_to_sync = self._get_out_of_date_files(publish_paths)
 
         return files_to_sync, total_file_count
 
-    def _get_latest_revision(self, files_to_sync):
+    def _get_out_of_date_files(self, publish_paths):
+        """
+        Get the files which are not synced to their latest revision.
+
+        The revisions stored with the ShotGrid data go stale as soon as
+        someone submits or syncs, so the live status of the files is used
+        instead. It comes from the have list index when it is enabled, which
+        only queries the server for what changed, and from a single batched
+        server query otherwise.
+
+        :param publish_paths: List of local paths.
+        :returns: List of the local paths to sync.
+        """
+        statuses = self._get_revision_status(publish_paths)
+        return [
+            local_path
+            for local_path in publish_paths
+            if self._to_sync(statuses[local_path].have_rev, statuses[local_path].head_rev)
+        ]
+
+    def _format_summary_table(self, stats):
+        """
+        Formats the summary of a sync as an HTML table for the log window,
+        with a row per outcome and per failure reason.
+
+        :param stats: :class:`~tk_multi_loader.sync.SyncStats` of the sync.
+        :returns: HTML formatted table.
+        """
+        rows = []
+        for (label, count, details) in stats.summary_rows():
+            if not count:
+                continue
+            color = "#E2552C" if label.startswith("Failed") else "#2C93E2"
+            rows.append(
+                "<tr><td style='color:{}'>{}</td><td align='right'>{}</td>"
+                "<td>&nbsp;&nbsp;{}</td></tr>".format(
+                    color,
+                    label,
+                    count,
+                    details.replace("&", "&amp;").replace("<", "&lt;"),
+                )
+            )
+        return "<table cellspacing='2'>{}</table>".format("".join(rows))
+
+    def _get_revision_status(self, paths):
+        """
+        Get the live revision status of files, from the have list index when
+        it is enabled, otherwise from a single batched server query.
+
+        :param paths: List of local paths.
+        :returns: Dictionary of :class:`~tk_multi_loader.sync.RevisionStatus`
+                  keyed by path.
+        """
+        if self._have_list_index:
+            return self._have_list_index.get_status(self._p4, paths)
+        return RevisionStatusService(self._p4).get_status(paths)
+
+    def _get_latest_revision(
+        self, files_to_sync, name, force=False, priority=SyncJob.PRIORITY_ENTITY
+    ):
         """
         Get latest revision
+
+        The files are queued as a single job on the app sync queue, which
+        syncs them in a few batched server calls on a background worker.
+        Results for every single file are reported back to
+        :meth:`_on_sync_results` in batches.
+
+        :param files_to_sync: List of local paths to sync.
+        :param name: Display name of the sync.
+        :param force: If True, files are force synced, rewriting files which
+                      are already up to date in the workspace.
+        :param priority: One of the ``SyncJob.PRIORITY_*`` values.
+        """
+        if files_to_sync:
+            file_specs = [file_path + "#head" for file_path in files_to_sync]
+            self._queue_sync(file_specs, name, force=force, priority=priority)
+
+    def _queue_sync(
+        self,
+        file_specs,
+        name,
+        force=False,
+        priority=SyncJob.PRIORITY_ENTITY,
+        include_opened=False,
+    ):
+        """
+        Queues a sync job on the app sync queue.
+
+        :param file_specs: List of file specs to sync, e.g. ``["/path/file.ma#3"]``
+        :param name: Display name of the sync.
+        :param force: If True, files are force synced.
+        :param priority: One of the ``SyncJob.PRIORITY_*`` values.
+        :param include_opened: If True, files opened in the workspace are synced.
+        """
+        job = self._sync_queue.submit(
+            name,
+            file_specs,
+            priority=priority,
+            force=force,
+            include_opened=include_opened,
+        )
+        if not job:
+            msg = "\n <span style='color:#2C93E2'>All {} files are already queued</span> \n".format(
+                len(file_specs)
+            )
+            self._add_log(msg, 2)
+
+    def _on_sync_results(self, job, results):
         """
-        progress_sum = 0
-        total = len(files_to_sync)
-        if total > 0:
-            for i, file_path in enumerate(files_to_sync):
-                progress_sum = ((i + 1) / total) * 100
-                p4_result = self._p4.run("sync", "-f", file_path + "#head")
-                logger.debug("Syncing file: {}".format(file_path))
-                msg = "({}/{})  Syncing file: {}".format(i+1, total, file_path)
-                self._add_log(msg, 3)
-                self._update_progress(progress_sum)
+        Called with a batch of sync results from the app sync queue.
+
+        :param job: The running :class:`~tk_multi_loader.sync.SyncJob`
+        :param results: List of :class:`~tk_multi_loader.sync.SyncResult`
+        """
+        stats = job.stats
+        total = stats.total
+        # the job stats already include this batch
+        i = stats.done - len(results)
+        for result in results:
+            i += 1
+            logger.debug("Synced file: {} ({})".format(result.path, result.status))
+            if result.status == SyncResult.FAILED:
+                msg = "({}/{})  <span style='color:#E2552C'>Failed to sync file: {} ({})</span>".format(
+                    i, total, result.path, result.message
+                )
+                self._add_log(msg, 4)
+            elif result.status == SyncResult.UP_TO_DATE:
+                msg = "({}/{})  Already up to date: {}".format(i, total, result.path)
+                self._add_log(msg, 4, verbose=True)
+            elif result.status == SyncResult.SKIPPED:
+                msg = "({}/{})  <span style='color:#E2A32C'>Skipped file: {} ({})</span>".format(
+                    i, total, result.path, result.message
+                )
+                self._add_log(msg, 4)
+            elif result.needs_resolve:
+                msg = "({}/{})  <span style='color:#E2A32C'>Synced file: {} ({})</span>".format(
+                    i, total, result.path, result.message
+                )
+                self._add_log(msg, 4)
+                self._synced_paths.add(result.path)
+            else:
+                msg = "({}/{})  Syncing file: {} ({})".format(
+                    i, total, result.path, format_size(result.size)
+                )
+                self._add_log(msg, 4, verbose=True)
+                self._synced_paths.add(result.path)
+
+    def _on_sync_progress_timer(self):
+        """
+        Polls the byte level progress of the running sync job, at a fixed
+        rate whatever the number and size of the files being transferred.
+        """
+        job = self._sync_queue.current_job
+        if not job or not job.progress:
+            return
+
+        snapshot = job.progress.snapshot()
+        text = "%p%  {} of {}".format(
+            format_size(snapshot.bytes_done), format_size(snapshot.total_bytes)
+        )
+        if snapshot.rate > 0:
+            text += ", {}/s, {} left".format(
+                format_size(snapshot.rate),
+                format_duration(snapshot.seconds_remaining),
+            )
+        self.ui.progress.setFormat(text)
+        self._update_progress(int(snapshot.fraction * 100))
 
     def _update_progress(self, value):
         if 100 > value > 0:
@@ -1192,16 +2229,23 @@ class AppDialog(QtGui.QWidget):
             self.ui.progress.setVisible(True)
         else:
             self.ui.progress.setVisible(False)
-        QtCore.QCoreApplication.processEvents()
 
-    def _add_log(self, msg, flag):
+    def _add_log(self, msg, flag, verbose=False):
+        """
+        Log a message. Messages are buffered and show up in the log window
+        with the next flush of the log sink.
+
+        :param msg: HTML formatted message.
+        :param flag: Messages with a flag up to 2 are padded with new lines,
+                     messages with a flag below 4 also go to the app logger.
+        :param verbose: If True, the message is only shown in the log window
+                        in verbose mode. It always goes to the log file.
+        """
         if flag <= 2:
             msg = "\n {} \n".format(msg)
-        self.ui.log_window.append(msg)
+        self._log_sink.write(msg, verbose=verbose)
         if flag < 4:
             logger.debug(msg)
-        self.ui.log_window.verticalScrollBar().setValue(self.ui.log_window.verticalScrollBar().maximum())
-        QtCore.QCoreApplication.processEvents()
 
     def _to_sync (self, have_rev, head_rev):
         """
@@ -1219,10 +2263,20 @@ class AppDialog(QtGui.QWidget):
         the current settings then the connection UI will be shown.
         """
         try:
-            if not self._p4:
-                logger.debug("Connecting to perforce ...")
-                self._fw = sgtk.platform.get_framework("tk-framework-perforce")
-                self._p4 = self._fw.connection.connect()
+            # hand the connection back and get one again, the pool checks
+            # connections which have been idle for a while and replaces
+            # the ones which were dropped.
+            if self._p4:
+                self._connection_pool.release(self._p4)
+                self._p4 = None
+            self._p4 = self._connection_pool.acquire(
+                constants.PERFORCE_CONNECTION_TIMEOUT
+            )
+        except RuntimeError as e:
+            # every connection of the pool is in use, e.g. by running syncs
+            msg = "\n <span style='color:#CC3333'>Failed to connect to Perforce: {}</span> \n".format(e)
+            self._add_log(msg, 3)
+            raise
         except:
             #Todo add error message
             logger.debug("Failed to connect!")
@@ -1295,6 +2349,40 @@ class AppDialog(QtGui.QWidget):
             self._entity_presets[p].model.hard_refresh()
         self._get_perforce_summary()
 
+    def _on_verbose_log_toggled(self, checked):
+        """
+        Show or hide the status of every single synced file in the log.
+        """
+        self._log_sink.verbose = checked
+        self._settings_manager.store("verbose_sync_log", checked)
+
+    def _on_open_log_action(self):
+        """
+        Open the file the full sync log is written to.
+        """
+        self._log_sink.flush()
+        if os.path.exists(self._log_path):
+            QtGui.QDesktopServices.openUrl(QtCore.QUrl.fromLocalFile(self._log_path))
+        else:
+            msg = "\n <span style='color:#2C93E2'>Nothing was logged yet</span> \n"
+            self._add_log(msg, 2)
+
+    def _on_rebuild_index_action(self):
+        """
+        Drop the cached revision status of the workspace files and query
+        the status of the visible files again.
+        """
+        self._connect()
+        try:
+            self._have_list_index.rebuild(self._p4)
+        except RuntimeError as e:
+            msg = "\n <span style='color:#CC3333'>Failed to rebuild the Perforce index: {}</span> \n".format(e)
+            self._add_log(msg, 3)
+            return
+        msg = "\n <span style='color:#2C93E2'>Perforce index rebuilt</span> \n"
+        self._add_log(msg, 2)
+        self._get_perforce_summary()
+
     ########################################################################################
     # entity listing tree view and presets toolbar
 
@@ -1661,6 +2749,32 @@ class AppDialog(QtGui.QWidget):
                 view.addAction(action_refresh)
                 self._dynamic_widgets.append(action_refresh)
 
+            action_sync = QtGui.QAction("Get Latest Revision (Recursive)", view)
+            action_sync.setToolTip(
+                "<nobr>Sync the latest revision of every publish below the selected node.</nobr><br><br>"
+                "All the publishes are retrieved from ShotGrid in a single query "
+                "and synced from Perforce as a single planned sync."
+            )
+            action_sync.hovered.connect(
+                lambda action=action_sync: action_hovered(action)
+            )
+            action_sync.triggered.connect(self._on_tree_get_latest_revision)
+            view.addAction(action_sync)
+            self._dynamic_widgets.append(action_sync)
+
+            action_manifest = QtGui.QAction("Export Manifest (Recursive)...", view)
+            action_manifest.setToolTip(
+                "<nobr>Save the workspace revision of every publish below the selected node.</nobr><br><br>"
+                "The manifest can be applied on another machine to sync its "
+                "workspace to exactly the same revisions."
+            )
+            action_manifest.hovered.connect(
+                lambda action=action_manifest: action_hovered(action)
+            )
+            action_manifest.triggered.connect(self._on_tree_export_manifest)
+            view.addAction(action_manifest)
+            self._dynamic_widgets.append(action_manifest)
+
             view.setContextMenuPolicy(QtCore.Qt.ActionsContextMenu)
 
             # Set up an on-select callback.
@@ -0,0 +1,197 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Headless "get latest" of the publishes of an entity, for render nodes and
+batch jobs. This module doesn't depend on Qt.
+
+The latest publishes are resolved with the same rules as the loader publish
+view and synced to their head revision with the batched sync engine. From
+the tk-shell engine::
+
+    tank Shot ABC123 sync_latest_publishes --force
+
+From plain Python, once an engine has been bootstrapped::
+
+    app = engine.apps["tk-multi-loader2"]
+    report = app.sync_latest_publishes({"type": "Shot", "id": 1234})
+"""
+
+import argparse
+import json
+import sys
+
+import sgtk
+from sgtk import TankError
+
+from . import publishes
+from .connection_pool import perforce_connection
+from .sync import SyncEngine, SyncStats, get_engine_settings
+
+logger = sgtk.platform.get_logger(__name__)
+
+# shotgun field linking publishes to entities of a given type, the
+# entity field for all the other types
+_LINK_FIELDS = {"Task": "task", "Version": "version", "Project": "project"}
+
+
+def sync_latest_publishes(app, entity=None, force=False, p4=None):
+    """
+    Syncs the latest publishes of an entity to their head revision.
+
+    :param app: The loader app.
+    :param entity: Shotgun entity dictionary with a type and an id. Defaults
+                   to the entity of the app context, or its project.
+    :param force: If True, files are force synced, rewriting files which
+                  are already up to date in the workspace.
+    :param p4: Optional connected P4Python ``P4`` instance. A connection of
+               the app pool is used if the app has one, a new connection
+               otherwise.
+    :returns: Report of the sync, a dictionary which can be serialized to JSON.
+    :raises TankError: If there is no entity to sync, no connection could
+                       be opened or the sync failed as a whole.
+    """
+    entity = entity or app.context.entity or app.context.project
+    if not entity:
+        raise TankError("No entity to sync the latest publishes of.")
+
+    link_field = _LINK_FIELDS.get(entity["type"], "entity")
+    sg_data_list = publishes.find_latest_publishes(
+        app,
+        [[link_field, "is", {"type": entity["type"], "id": entity["id"]}]],
+    )
+    paths = []
+    for sg_data in sg_data_list:
+        local_path = (sg_data.get("path") or {}).get("local_path")
+        if local_path and local_path not in paths:
+            paths.append(local_path)
+    logger.debug(
+        "Syncing %d files of %d latest publishes of %s %s"
+        % (len(paths), len(sg_data_list), entity["type"], entity["id"])
+    )
+
+    results = []
+    if paths:
+        try:
+            if p4 is not None:
+                results = _sync(app, p4, paths, force)
+            else:
+                with perforce_connection(app) as p4:
+                    results = _sync(app, p4, paths, force)
+        except RuntimeError as e:
+            # no pooled connection was available in time, or a query the
+            # sync runs first failed
+            raise TankError("Failed to sync the latest publishes: {}".format(e))
+
+    stats = SyncStats(len(paths))
+    for result in results:
+        stats.add(result)
+    return {
+        "entity": {
+            "type": entity["type"],
+            "id": entity["id"],
+            "name": entity.get("name") or entity.get("code"),
+        },
+        "publishes": len(sg_data_list),
+        "files": [_to_dict(result) for result in results],
+        "summary": {
+            "files": len(paths),
+            "transferred": stats.files_transferred,
+            "bytes_transferred": stats.bytes_transferred,
+            "up_to_date": stats.files_up_to_date,
+            "deleted": stats.files_deleted,
+            "failed": stats.files_failed,
+            "retried": stats.files_retried,
+            "skipped": stats.files_skipped,
+            "needs_resolve": len(stats.needs_resolve),
+            "seconds": round(stats.elapsed(), 3),
+        },
+    }
+
+
+def run_command(app, *args):
+    """
+    Command line entry point, registered as an app command for engines
+    without a UI. Prints the report of the sync as JSON on stdout.
+
+    :param app: The loader app.
+    :param args: Command line arguments.
+    :returns: 0 if all the files were synced, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        prog="sync_latest_publishes",
+        description="Syncs the latest publishes of an entity, by default "
+        "the entity of the current context.",
+    )
+    parser.add_argument(
+        "--entity",
+        metavar="TYPE:ID",
+        help="Entity to sync the latest publishes of, e.g. Shot:1234",
+    )
+    parser.add_argument("--force", action="store_true", help="Force sync the files.")
+    parser.add_argument(
+        "--indent", type=int, default=None, help="Indentation of the JSON report."
+    )
+    options = parser.parse_args(list(args))
+
+    entity = None
+    if options.entity:
+        (entity_type, _, entity_id) = options.entity.partition(":")
+        if not entity_id.isdigit():
+            parser.error("--entity must be formatted as TYPE:ID, e.g. Shot:1234")
+        entity = {"type": entity_type, "id": int(entity_id)}
+
+    try:
+        report = sync_latest_publishes(app, entity, force=options.force)
+    except TankError as e:
+        report = {"error": str(e)}
+    json.dump(report, sys.stdout, indent=options.indent, sort_keys=True)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+    if report.get("error") or report["summary"]["failed"]:
+        return 1
+    return 0
+
+
+def _sync(app, p4, paths, force):
+    """
+    Syncs paths to their head revision with the sync settings of the app.
+
+    :returns: List of :class:`~tk_multi_loader.sync.SyncResult`
+    """
+    engine = SyncEngine(p4, **get_engine_settings(app))
+    results = engine.sync([path + "#head" for path in paths], force=force)
+
+    have_list_index = getattr(app, "have_list_index", None)
+    if have_list_index:
+        try:
+            have_list_index.record_sync(p4, results)
+        except Exception:
+            logger.exception("Failed to record synced files in the have list index")
+    return results
+
+
+def _to_dict(result):
+    """
+    :param result: :class:`~tk_multi_loader.sync.SyncResult`
+    :returns: Dictionary of the result, for the JSON report.
+    """
+    return {
+        "path": result.path,
+        "status": result.status,
+        "depot_file": result.depot_file,
+        "rev": int(result.rev) if result.rev else None,
+        "action": result.action,
+        "size": result.size,
+        "message": result.message,
+        "reason": result.reason,
+        "attempts": result.attempts,
+        "needs_resolve": result.needs_resolve,
+    }
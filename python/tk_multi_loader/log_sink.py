@@ -0,0 +1,158 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import collections
+import datetime
+import io
+import os
+import re
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+logger = sgtk.platform.get_logger(__name__)
+
+_TAG_REGEX = re.compile(r"<[^>]+>")
+_BREAK_REGEX = re.compile(r"<br\s*/?>", re.IGNORECASE)
+_ENTITIES = (("&nbsp;", " "), ("&lt;", "<"), ("&gt;", ">"), ("&amp;", "&"))
+
+
+class LogSink(QtCore.QObject):
+    """
+    Buffered log of the loader dialog.
+
+    Messages are not appended to the log window as they come but buffered
+    and flushed on a timer, so that a sync reporting thousands of files
+    doesn't spend its time laying out text. The log window only keeps the
+    most recent messages, the full log goes to a file.
+
+    Messages can be flagged as verbose, e.g. the status of every single file
+    of a sync. They always go to the log file, but only show up in the log
+    window when verbose mode is on.
+    """
+
+    def __init__(
+        self,
+        log_window,
+        log_path=None,
+        max_lines=2000,
+        flush_interval=250,
+        max_file_size=10 * 1024 * 1024,
+        parent=None,
+    ):
+        """
+        :param log_window: QTextEdit or QTextBrowser to show the messages in.
+        :param log_path: Optional path of the file the full log is written to.
+        :param max_lines: Maximum number of messages kept in the log window.
+        :param flush_interval: Number of milliseconds messages are buffered for.
+        :param max_file_size: Size in bytes at which the log file is rotated.
+        :param parent: The parent QObject.
+        """
+        QtCore.QObject.__init__(self, parent)
+        self._log_window = log_window
+        self._log_window.document().setMaximumBlockCount(max_lines)
+        self._log_path = log_path
+        self._max_file_size = max_file_size
+        self._verbose = False
+        # messages older than the ones the window can hold are dropped
+        self._pending = collections.deque(maxlen=max_lines)
+        self._pending_file_lines = []
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(flush_interval)
+        self._timer.timeout.connect(self.flush)
+
+    @property
+    def verbose(self):
+        """
+        True if verbose messages are shown in the log window.
+        """
+        return self._verbose
+
+    @verbose.setter
+    def verbose(self, value):
+        self._verbose = value
+
+    def write(self, msg, verbose=False):
+        """
+        Adds a message to the log. It shows up with the next flush.
+
+        :param msg: HTML formatted message.
+        :param verbose: If True, the message is only shown in the log window
+                        in verbose mode.
+        """
+        if not verbose or self._verbose:
+            self._pending.append(msg)
+        if self._log_path:
+            self._pending_file_lines.append((datetime.datetime.now(), msg))
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self):
+        """
+        Writes the buffered messages to the log window and the log file.
+        """
+        self._timer.stop()
+        if self._pending:
+            self._log_window.setUpdatesEnabled(False)
+            try:
+                for msg in self._pending:
+                    self._log_window.append(msg)
+            finally:
+                self._log_window.setUpdatesEnabled(True)
+            self._pending.clear()
+            scroll_bar = self._log_window.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum())
+
+        if self._pending_file_lines:
+            lines = self._pending_file_lines
+            self._pending_file_lines = []
+            try:
+                self._write_file(lines)
+            except (IOError, OSError) as e:
+                logger.warning("Failed to write the sync log file: %s" % e)
+
+    def _write_file(self, lines):
+        """
+        Appends lines to the log file, rotating it once it gets too large.
+
+        :param lines: List of tuples with the time a message was logged at
+                      and the HTML formatted message.
+        """
+        folder = os.path.dirname(self._log_path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        if (
+            os.path.exists(self._log_path)
+            and os.path.getsize(self._log_path) > self._max_file_size
+        ):
+            rotated_path = self._log_path + ".1"
+            if os.path.exists(rotated_path):
+                os.remove(rotated_path)
+            os.rename(self._log_path, rotated_path)
+
+        with io.open(self._log_path, "a", encoding="utf-8", errors="replace") as f:
+            for (logged_at, msg) in lines:
+                timestamp = logged_at.strftime("%Y-%m-%d %H:%M:%S")
+                for line in _to_plain_text(msg):
+                    f.write(u"%s %s\n" % (timestamp, line))
+
+
+def _to_plain_text(msg):
+    """
+    Converts an HTML formatted log message to a list of plain text lines.
+    """
+    if isinstance(msg, bytes):
+        msg = msg.decode("utf-8", "replace")
+    msg = _TAG_REGEX.sub("", _BREAK_REGEX.sub("\n", msg))
+    for (entity, character) in _ENTITIES:
+        msg = msg.replace(entity, character)
+    return [line.strip() for line in msg.splitlines() if line.strip()]
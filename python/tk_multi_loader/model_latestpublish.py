@@ -37,6 +37,7 @@ class SgLatestPublishModel(ShotgunModel):
     ASSOCIATED_TREE_VIEW_ITEM_ROLE = QtCore.Qt.UserRole + 103
     PUBLISH_TYPE_NAME_ROLE = QtCore.Qt.UserRole + 104
     SEARCHABLE_NAME = QtCore.Qt.UserRole + 105
+    REVISION_STATUS_ROLE = QtCore.Qt.UserRole + 106
 
     def __init__(self, parent, publish_type_model, bg_task_manager):
         """
@@ -62,6 +63,38 @@ class SgLatestPublishModel(ShotgunModel):
     ############################################################################################
     # public interface
 
+    def get_publish_paths(self):
+        """
+        Returns the local paths of all the publishes in the model.
+
+        :returns: List of local paths.
+        """
+        paths = []
+        for item in self._iter_publish_items():
+            local_path = (item.get_sg_data().get("path") or {}).get("local_path")
+            if local_path:
+                paths.append(local_path)
+        return paths
+
+    def update_revision_status(self, statuses):
+        """
+        Updates the revision status of publishes in place, without reloading
+        anything from Shotgun.
+
+        :param statuses: Dictionary of :class:`~tk_multi_loader.sync.RevisionStatus`
+                         keyed by local path. Publishes whose path isn't in
+                         the dictionary are left untouched.
+        :returns: Number of publishes updated.
+        """
+        updated = 0
+        for item in self._iter_publish_items():
+            local_path = (item.get_sg_data().get("path") or {}).get("local_path")
+            status = statuses.get(local_path)
+            if status is not None:
+                item.setData(status, SgLatestPublishModel.REVISION_STATUS_ROLE)
+                updated += 1
+        return updated
+
     def get_associated_tree_view_item(self, item):
         """
         Returns the entity tree view item associated with a publish folder item.
@@ -263,6 +296,16 @@ class SgLatestPublishModel(ShotgunModel):
     ############################################################################################
     # private methods
 
+    def _iter_publish_items(self):
+        """
+        Iterates over the publish items of the model, skipping folders.
+        """
+        root = self.invisibleRootItem()
+        for row in range(root.rowCount()):
+            item = root.child(row)
+            if not item.data(SgLatestPublishModel.IS_FOLDER_ROLE):
+                yield item
+
     def _do_load_data(self, sg_filters, treeview_folder_items):
         """
         Load and refresh data.
@@ -528,30 +571,13 @@ class SgLatestPublishModel(ShotgunModel):
         # also, if there are cases where there are two items with the same name and the same type,
         # but with different tasks, indicate this with a special boolean flag
 
-        unique_data = {}
-        name_type_aggregates = defaultdict(int)
+        latest_data = utils.get_latest_publishes(sg_data_list, self._publish_type_field)
 
+        # count how many items of each name and type we have
+        name_type_aggregates = defaultdict(int)
         for sg_item in sg_data_list:
-
-            # get the associated type
-            type_id = None
             type_link = sg_item[self._publish_type_field]
-            if type_link:
-                type_id = type_link["id"]
-
-            # also get the associated task
-            task_id = None
-            task_link = sg_item["task"]
-            if task_link:
-                task_id = task_link["id"]
-
-            # key publishes in dict by type and name
-            unique_data[(sg_item["name"], type_id, task_id)] = {
-                "sg_item": sg_item,
-                "type_id": type_id,
-            }
-
-            # count how many items of this type we have
+            type_id = type_link["id"] if type_link else None
             name_type_aggregates[(sg_item["name"], type_id)] += 1
 
         # SECOND PASS
@@ -559,15 +585,17 @@ class SgLatestPublishModel(ShotgunModel):
         # Go ahead count types for the aggregate
         # and assemble filtered sg data set
         new_sg_data = []
-        for second_pass_data in unique_data.values():
+        for sg_item in latest_data:
 
-            # get the shotgun data for this guy
-            sg_item = second_pass_data["sg_item"]
+            type_id = None
+            type_link = sg_item[self._publish_type_field]
+            if type_link:
+                type_id = type_link["id"]
 
             # now add a flag to indicate if this item is "task unique" or not
             # e.g. if there are other items in the listing with the same name
             # and same type but with a different task
-            if name_type_aggregates[(sg_item["name"], second_pass_data["type_id"])] > 1:
+            if name_type_aggregates[(sg_item["name"], type_id)] > 1:
                 # there are more than one item with this same name/type combo!
                 sg_item["task_uniqueness"] = False
             else:
@@ -578,7 +606,6 @@ class SgLatestPublishModel(ShotgunModel):
             new_sg_data.append(sg_item)
 
             # update our aggregate counts for the publish type view
-            type_id = second_pass_data["type_id"]
             type_id_aggregates[type_id] += 1
 
         # tell the type model to reshuffle and reformat itself
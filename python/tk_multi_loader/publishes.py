@@ -0,0 +1,150 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Retrieval of the latest publishes, shared by the loader UI and the headless
+sync. This module doesn't depend on Qt.
+"""
+
+import re
+
+import sgtk
+
+from . import constants
+
+
+def filter_publishes(app, sg_data_list):
+    """
+    Filters a list of shotgun published files based on the filter_publishes
+    hook.
+
+    :param app:           app that has the hook.
+    :param sg_data_list:  list of shotgun dictionaries, as returned by the
+                          find() call.
+    :returns:             list of filtered shotgun dictionaries, same form as
+                          the input.
+    """
+    try:
+        # Constructing a wrapper dictionary so that it's future proof to
+        # support returning additional information from the hook
+        hook_publish_list = [{"sg_publish": sg_data} for sg_data in sg_data_list]
+
+        hook_publish_list = app.execute_hook(
+            "filter_publishes_hook", publishes=hook_publish_list
+        )
+        if not isinstance(hook_publish_list, list):
+            app.log_error(
+                "hook_filter_publishes returned an unexpected result type \
+                '%s' - ignoring!"
+                % type(hook_publish_list).__name__
+            )
+            hook_publish_list = []
+
+        # split back out publishes:
+        sg_data_list = []
+        for item in hook_publish_list:
+            sg_data = item.get("sg_publish")
+            if sg_data:
+                sg_data_list.append(sg_data)
+
+    except:
+        app.log_exception("Failed to execute 'filter_publishes_hook'!")
+        sg_data_list = []
+
+    return sg_data_list
+
+
+def get_latest_publishes(sg_data_list, publish_type_field):
+    """
+    Reduces a list of shotgun published files to the latest publish of each
+    file, a file being identified by its name, publish type and task.
+
+    Relies on the list being sorted by ascending creation date, so that the
+    last publish seen for a file is its latest one.
+
+    :param sg_data_list:       list of shotgun dictionaries, as returned by the
+                               find() call.
+    :param publish_type_field: name of the publish type field, e.g.
+                               "published_file_type".
+    :returns:                  list of the latest shotgun dictionaries.
+    """
+    unique_data = {}
+    for sg_item in sg_data_list:
+
+        # get the associated type
+        type_id = None
+        type_link = sg_item[publish_type_field]
+        if type_link:
+            type_id = type_link["id"]
+
+        # also get the associated task
+        task_id = None
+        task_link = sg_item["task"]
+        if task_link:
+            task_id = task_link["id"]
+
+        # key publishes in dict by type and name
+        unique_data[(sg_item["name"], type_id, task_id)] = sg_item
+
+    return list(unique_data.values())
+
+
+def find_latest_publishes(app, sg_filters, additional_filter_presets=None):
+    """
+    Retrieves the latest publishes matching the given filters, with the
+    same rules as the main publish view: the app publish filters and the
+    filter_publishes hook are applied and only the latest publish of each
+    file is kept.
+
+    All the publishes are retrieved with a single shotgun query.
+
+    :param app:                       app that has the hook.
+    :param sg_filters:                list of shotgun filters.
+    :param additional_filter_presets: optional list of shotgun filter presets,
+                                      e.g. the navigation presets of a hierarchy
+                                      model item.
+    :returns:                         list of the latest shotgun dictionaries.
+    """
+    publish_entity_type = sgtk.util.get_published_file_entity_type(app.tank)
+    if publish_entity_type == "PublishedFile":
+        publish_type_field = "published_file_type"
+    else:
+        publish_type_field = "tank_type"
+
+    sg_filters = list(sg_filters) + app.get_setting("publish_filters", [])
+
+    sg_data_list = app.shotgun.find(
+        publish_entity_type,
+        sg_filters,
+        [publish_type_field] + constants.PUBLISHED_FILES_FIELDS,
+        order=[{"field_name": "created_at", "direction": "asc"}],
+        additional_filter_presets=additional_filter_presets,
+    )
+    sg_data_list = filter_publishes(app, sg_data_list)
+    return get_latest_publishes(sg_data_list, publish_type_field)
+
+
+def get_publish_revision(sg_data):
+    """
+    Returns the Perforce revision a publish was made at, from the revision
+    data held with its shotgun data.
+
+    :param sg_data: shotgun dictionary of a published file.
+    :returns:       the revision number, None if the publish doesn't hold one.
+    """
+    revision = sg_data.get("revision")
+    if revision is None:
+        return None
+    # the revision can be held as a number or as a string such as "#3"
+    match = re.search(r"\d+", str(revision))
+    if not match:
+        return None
+    # revision 0 would remove the file from the workspace
+    return int(match.group(0)) or None
@@ -0,0 +1,166 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+from .sync import (
+    PollSchedule,
+    RevisionStatusService,
+    get_latest_changelist,
+    watch_patterns,
+)
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class RevisionWatcher(QtCore.QThread):
+    """
+    Polls the server in the background for revisions submitted to the
+    watched files, so that out of date files show up without anyone having
+    to ask for a sync.
+
+    Each poll is a single ``p4 changes -m1`` over the folders of the watched
+    files. The status of the files is only queried again when the latest
+    changelist moves. The polls get further apart while nothing changes.
+
+    :signal statuses_changed(dict): Emitted with the
+        :class:`~tk_multi_loader.sync.RevisionStatus` of every watched file,
+        keyed by path, when the files are first watched and every time one
+        of them may have changed.
+    """
+
+    statuses_changed = QtCore.Signal(object)
+
+    # maximum number of seconds to wait for a free connection for a poll
+    CONNECTION_TIMEOUT = 10
+
+    def __init__(
+        self,
+        connection_pool,
+        have_list_index=None,
+        interval=15,
+        max_interval=300,
+        parent=None,
+    ):
+        """
+        :param connection_pool: :class:`~tk_multi_loader.sync.ConnectionPool`
+                                providing the connections to poll with.
+        :param have_list_index: Optional :class:`~tk_multi_loader.sync.HaveListIndex`
+                                the status of the files is read from.
+        :param interval: Shortest number of seconds between two polls.
+        :param max_interval: Longest number of seconds between two polls.
+        :param parent: The parent QObject.
+        """
+        QtCore.QThread.__init__(self, parent)
+        self._connection_pool = connection_pool
+        self._have_list_index = have_list_index
+        self._schedule = PollSchedule(interval, max_interval)
+        self._lock = threading.Lock()
+        self._paths = []
+        # latest changelist of the watched files, None until first polled
+        self._changelist = None
+        self._wake_up = threading.Event()
+        self._stopped = threading.Event()
+        # True while the polling loop runs, guarded by the lock
+        self._polling = False
+
+    def set_paths(self, paths):
+        """
+        Sets the files to watch. Their status is reported by the next poll,
+        which happens straight away if the files changed.
+
+        :param paths: List of local paths.
+        """
+        paths = list(paths)
+        with self._lock:
+            if paths == self._paths:
+                return
+            self._paths = paths
+            self._changelist = None
+        self._schedule.reset()
+        self._wake_up.set()
+
+    def start_watching(self):
+        """
+        Starts polling, unless already polling. Polling asked to stop is
+        resumed, with a poll straight away.
+        """
+        with self._lock:
+            self._stopped.clear()
+            self._wake_up.set()
+            if self._polling:
+                return
+            self._polling = True
+        # the thread may still be returning from a previous run
+        self.wait()
+        self.start()
+
+    def stop_watching(self):
+        """
+        Asks the polling to stop. The current poll, if any, is completed.
+        """
+        self._stopped.set()
+        self._wake_up.set()
+
+    def run(self):
+        """
+        Thread entry point.
+        """
+        while True:
+            with self._lock:
+                if self._stopped.is_set():
+                    self._polling = False
+                    return
+            self._wake_up.clear()
+            changed = False
+            try:
+                changed = self._poll()
+            except Exception as e:
+                logger.debug("Failed to poll for submitted revisions: %s" % e)
+            self._wake_up.wait(self._schedule.next_interval(changed))
+
+    def _poll(self):
+        """
+        Checks the latest changelist of the watched files and reports their
+        status if it moved.
+
+        :returns: True if a change was found.
+        """
+        with self._lock:
+            paths = self._paths
+            known_changelist = self._changelist
+        if not paths:
+            return False
+
+        with self._connection_pool.connection(self.CONNECTION_TIMEOUT) as p4:
+            changelist = get_latest_changelist(p4, watch_patterns(paths)) or 0
+            if changelist == known_changelist:
+                return False
+            if self._have_list_index:
+                if known_changelist is not None:
+                    # the index would otherwise wait for its next scheduled
+                    # refresh to pick up the new changelist
+                    self._have_list_index.refresh(p4, force=True)
+                statuses = self._have_list_index.get_status(p4, paths)
+            else:
+                statuses = RevisionStatusService(p4).get_status(paths)
+
+        with self._lock:
+            if self._paths is not paths:
+                # the watched files changed while polling, the status of
+                # the new ones is reported by the next poll.
+                return True
+            self._changelist = changelist
+        if not self._stopped.is_set():
+            self.statuses_changed.emit(statuses)
+        return known_changelist is not None
@@ -0,0 +1,41 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Perforce sync helpers used by the loader.
+
+The modules in this package only talk to a P4Python style connection object
+and deliberately do not depend on sgtk or Qt, so that they can be driven from
+the dialog, from background workers and from batch processes alike.
+"""
+
+from .engine import SyncEngine, SyncResult, SyncStats, get_engine_settings
+from .parallel import ParallelSyncEngine, clone_connection
+from .sizes import format_size
+from .status import RevisionStatus, RevisionStatusService
+from .preview import SyncPreview, preview_sync, format_duration
+from .jobs import SyncJob, SyncJobQueue
+from .progress import TransferProgress, ProgressSnapshot
+from .pool import ConnectionPool
+from .snapshot import get_latest_changelist, snapshot_file_specs
+from .index import HaveListIndex
+from .watch import PollSchedule, watch_patterns
+from .commands import split_file_spec
+from .paths import is_sequence_path, sequence_wildcard, to_server_spec
+from .errors import classify_error
+from .schedule import BandwidthLimiter, SyncScheduler, TimeWindows
+from .manifest import manifest_file_specs, query_manifest, read_manifest, write_manifest
+from .space import DiskSpaceCheck, create_space_check, get_free_space
+from .opened import (
+    OpenedFilesCheck,
+    create_opened_check,
+    query_opened,
+    resolve_files,
+)
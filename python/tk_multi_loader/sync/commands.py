@@ -0,0 +1,127 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Low level helpers shared by the sync modules to run Perforce commands and
+to deal with file specs.
+"""
+
+import os
+import re
+
+# splits a file spec such as "/path/file.ma#head" or "//depot/file.ma@1234"
+# into its path and its revision specifier.
+# a revision specifier is either #<number>, #head, #have or #none, or an @
+# followed by a changelist, label, client or date. Runs of # or @ in a path
+# are frame tokens, e.g. shot.####.exr or shot.@@@@.exr, not revisions.
+_REVISION_REGEX = re.compile(r"^(.*?)(#(?:\d+|head|have|none)|(?<!@)@[^#@/\\]+)?$")
+
+
+def run_command(p4, command, args, handler=None, progress=None):
+    """
+    Runs a Perforce command without raising on warnings or errors.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param command: Perforce command to run, e.g. "sync"
+    :param args: List of arguments for the command.
+    :param handler: Optional P4Python output handler, called with every
+                    record while the command runs.
+    :param progress: Optional P4Python progress indicator, called while
+                     files are transferred.
+    :returns: Tuple with the list of tagged records, the list of warnings and
+              the list of errors produced by the command.
+    """
+    exception_level = p4.exception_level
+    # we want the output for the files that went through even if others
+    # in the same command failed, so collect errors rather than raising.
+    p4.exception_level = 0
+    if handler is not None:
+        p4.handler = handler
+    if progress is not None:
+        p4.progress = progress
+    try:
+        output = p4.run(command, *args)
+        warnings = list(p4.warnings)
+        errors = list(p4.errors)
+    finally:
+        p4.exception_level = exception_level
+        if handler is not None:
+            p4.handler = None
+        if progress is not None:
+            p4.progress = None
+
+    records = [record for record in output if isinstance(record, dict)]
+    return records, warnings, errors
+
+
+def run_chunked(p4, command, options, paths, chunk_size):
+    """
+    Runs a Perforce command over a potentially large list of paths, splitting
+    the paths into chunks so that a single request never grows unbounded.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param command: Perforce command to run, e.g. "fstat"
+    :param options: List of options passed before the paths on every call.
+    :param paths: List of paths or file specs.
+    :param chunk_size: Maximum number of paths per call.
+    :returns: Tuple with the list of tagged records, the list of warnings and
+              the list of errors produced by all the calls.
+    """
+    records = []
+    warnings = []
+    errors = []
+    for start in range(0, len(paths), chunk_size):
+        (chunk_records, chunk_warnings, chunk_errors) = run_command(
+            p4, command, options + paths[start : start + chunk_size]
+        )
+        records.extend(chunk_records)
+        warnings.extend(chunk_warnings)
+        errors.extend(chunk_errors)
+    return records, warnings, errors
+
+
+def split_file_spec(file_spec):
+    """
+    Splits a file spec into its path and its revision specifier.
+
+    :param file_spec: File spec, e.g. "/path/file.ma#head"
+    :returns: Tuple (path, revision), e.g. ("/path/file.ma", "#head"). The
+              revision is an empty string if the file spec doesn't have one.
+    """
+    match = _REVISION_REGEX.match(file_spec)
+    return match.group(1), match.group(2) or ""
+
+
+def normalize_path(path):
+    """
+    Normalizes a local or depot path so that it can be used as a lookup key.
+
+    :param path: Local or depot path.
+    :returns: Normalized path.
+    """
+    if path.startswith("//"):
+        # depot syntax, leave untouched
+        return path
+    return os.path.normcase(os.path.normpath(path))
+
+
+def find_message(path, messages):
+    """
+    Returns the first message which refers to the given path.
+
+    :param path: Local or depot path.
+    :param messages: List of warning or error messages.
+    :returns: The matching message, None if no message refers to the path.
+    """
+    normalized_path = normalize_path(path)
+    for message in messages:
+        if path in message or normalized_path in os.path.normcase(message):
+            return message.strip()
+    return None
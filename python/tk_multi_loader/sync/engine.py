@@ -0,0 +1,827 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+import threading
+import time
+
+from . import errors
+from .commands import run_command, split_file_spec, find_message
+from .paths import (
+    find_sequence_messages,
+    group_records,
+    is_sequence_path,
+    to_server_path,
+    to_server_spec,
+)
+from .opened import create_opened_check, query_opened
+from .sizes import format_size, query_size_records, query_sizes, total_sizes
+from .progress import create_output_handler, create_progress_indicator
+from .schedule import BandwidthLimiter
+from .space import create_space_check
+
+logger = logging.getLogger(__name__)
+
+
+class SyncResult(object):
+    """
+    Outcome of syncing a single file.
+    """
+
+    # status values
+    (SYNCED, UP_TO_DATE, FAILED, DEFERRED, SKIPPED) = (
+        "synced",
+        "up-to-date",
+        "failed",
+        "deferred",
+        "skipped",
+    )
+
+    def __init__(
+        self,
+        path,
+        status,
+        depot_file=None,
+        client_file=None,
+        rev=None,
+        action=None,
+        size=0,
+        message=None,
+        reason=None,
+        attempts=1,
+        needs_resolve=False,
+    ):
+        """
+        :param path: The path that was requested, without its revision specifier.
+        :param status: One of SYNCED, UP_TO_DATE, FAILED, DEFERRED or SKIPPED.
+        :param depot_file: Depot path of the file, if reported by the server.
+        :param client_file: Local path of the file, if reported by the server.
+        :param rev: Revision the file is now at, if reported by the server.
+        :param action: Sync action reported by the server (added, updated, ...)
+        :param size: Size in bytes of the file revision, if reported by the server.
+        :param message: Warning or error message associated with the file.
+        :param reason: For failed files, one of the reasons of the
+                       :mod:`~errors` module, classified from the message
+                       if not given.
+        :param attempts: Number of times the file was sent to the server.
+        :param needs_resolve: True for a file opened in the workspace at an
+                              older revision than the one synced, or skipped.
+        """
+        self.path = path
+        self.status = status
+        self.depot_file = depot_file
+        self.client_file = client_file
+        self.rev = rev
+        self.action = action
+        self.size = size
+        self.message = message
+        if reason is None and status == self.FAILED:
+            reason = errors.classify_error(message)
+        self.reason = reason
+        self.attempts = attempts
+        self.needs_resolve = needs_resolve
+
+    def __repr__(self):
+        return "<SyncResult %s %s>" % (self.status, self.path)
+
+
+class SyncStats(object):
+    """
+    Running totals of a sync, used to report what was actually transferred.
+    """
+
+    # sync actions which don't involve a file transfer
+    NO_TRANSFER_ACTIONS = ("deleted",)
+
+    def __init__(self, total=0):
+        """
+        :param total: Number of files planned for the sync.
+        """
+        self.total = total
+        self.done = 0
+        self.files_transferred = 0
+        self.bytes_transferred = 0
+        self.files_deleted = 0
+        self.files_up_to_date = 0
+        self.files_failed = 0
+        self.files_retried = 0
+        self.files_deferred = 0
+        self.bytes_deferred = 0
+        self.files_skipped = 0
+        # results of the failed files, by failure reason
+        self.failures = {}
+        # results of the opened files which need a resolve
+        self.needs_resolve = []
+        self.start_time = time.time()
+
+    def add(self, result):
+        """
+        Accounts for the result of a file.
+
+        :param result: :class:`SyncResult`
+        """
+        self.done += 1
+        if result.attempts > 1:
+            self.files_retried += 1
+        if result.needs_resolve:
+            self.needs_resolve.append(result)
+        if result.status == SyncResult.FAILED:
+            self.files_failed += 1
+            self.failures.setdefault(result.reason, []).append(result)
+        elif result.status == SyncResult.UP_TO_DATE:
+            self.files_up_to_date += 1
+        elif result.status == SyncResult.DEFERRED:
+            self.files_deferred += 1
+            self.bytes_deferred += result.size
+        elif result.status == SyncResult.SKIPPED:
+            self.files_skipped += 1
+        elif result.action in self.NO_TRANSFER_ACTIONS:
+            self.files_deleted += 1
+        else:
+            self.files_transferred += 1
+            self.bytes_transferred += result.size
+
+    def elapsed(self):
+        """
+        :returns: Number of seconds since the sync started.
+        """
+        return time.time() - self.start_time
+
+    def throughput(self):
+        """
+        :returns: Average transfer rate of the sync so far, in bytes per second.
+        """
+        elapsed = self.elapsed()
+        if elapsed <= 0:
+            return 0
+        return self.bytes_transferred / elapsed
+
+    def summary(self):
+        """
+        :returns: A one line, human readable, summary of the sync.
+        """
+        return "Transferred %d files (%s), %d already up to date, %d deleted, %d failed" % (
+            self.files_transferred,
+            format_size(self.bytes_transferred),
+            self.files_up_to_date,
+            self.files_deleted,
+            self.files_failed,
+        )
+
+    def summary_rows(self):
+        """
+        :returns: Rows of a summary table of the sync, as a list of tuples with
+                  a label, a number of files and details, e.g. a size or the
+                  first few files which failed for a given reason.
+        """
+        rows = [
+            ("Transferred", self.files_transferred, format_size(self.bytes_transferred)),
+            ("Already up to date", self.files_up_to_date, ""),
+            ("Deleted", self.files_deleted, ""),
+            ("Retried", self.files_retried, ""),
+            (
+                "Deferred to off-peak hours",
+                self.files_deferred,
+                format_size(self.bytes_deferred),
+            ),
+            ("Skipped: opened in workspace", self.files_skipped, ""),
+            (
+                "Needs resolve",
+                len(self.needs_resolve),
+                _format_paths(self.needs_resolve),
+            ),
+        ]
+        for reason in sorted(self.failures):
+            results = self.failures[reason]
+            rows.append(
+                (
+                    "Failed: %s" % errors.REASON_LABELS.get(reason, reason),
+                    len(results),
+                    _format_paths(results),
+                )
+            )
+        return rows
+
+
+def _format_paths(results, count=3):
+    """
+    :param results: List of :class:`SyncResult`
+    :param count: Number of paths to list.
+    :returns: The first few paths of the results, for display.
+    """
+    details = ", ".join(result.path for result in results[:count])
+    if len(results) > count:
+        details += ", ..."
+    return details
+
+
+def get_engine_settings(app, include_opened=False):
+    """
+    Reads the settings of an app shared by all of its syncs, the retries,
+    the bandwidth limit, the disk space and the opened files checks.
+
+    :param app: Object with a ``get_setting`` method, e.g. the loader app.
+    :param include_opened: If True, opened files are synced and flagged
+                           whatever the opened files setting.
+    :returns: Dictionary of :class:`SyncEngine` keyword arguments.
+    """
+    bandwidth_limit = app.get_setting("sync_bandwidth_limit", 0)
+    return {
+        "max_retries": app.get_setting("sync_max_retries"),
+        "bandwidth_limiter": (
+            BandwidthLimiter(bandwidth_limit) if bandwidth_limit > 0 else None
+        ),
+        "space_check": create_space_check(app),
+        "opened_check": create_opened_check(app, include_opened=include_opened),
+    }
+
+
+class SyncEngine(object):
+    """
+    Syncs a list of file specs with as few server round trips as possible.
+
+    Rather than issuing one ``p4 sync`` per file, file specs are grouped into
+    batches bounded both by the number of files and by the total length of the
+    arguments, and every batch is sent to the server as a single command. The
+    tagged output, warnings and errors returned for a batch are then mapped
+    back onto the individual files so that callers still get a result for
+    every file they asked for.
+
+    Files which failed for a reason which may go away by itself, e.g. a
+    dropped connection, are retried after the other batches, with an
+    exponential backoff and in smaller batches on every attempt.
+    """
+
+    # default upper bounds for a single batch
+    DEFAULT_MAX_BATCH_FILES = 500
+    DEFAULT_MAX_BATCH_BYTES = 64 * 1024
+
+    # default number of retries of the files which failed transiently
+    DEFAULT_MAX_RETRIES = 3
+
+    # default number of seconds before the first retry, doubled every retry
+    DEFAULT_RETRY_DELAY = 2.0
+
+    # factor the batch size is divided by on every retry
+    RETRY_BATCH_DIVISOR = 4
+
+    def __init__(
+        self,
+        p4,
+        max_batch_files=None,
+        max_batch_bytes=None,
+        parallel_threads=0,
+        parallel_min_size=0,
+        cancel_event=None,
+        max_retries=None,
+        retry_delay=None,
+        scheduler=None,
+        bandwidth_limiter=None,
+        space_check=None,
+        opened_check=None,
+    ):
+        """
+        :param p4: Connected P4Python ``P4`` instance.
+        :param max_batch_files: Maximum number of file specs per batch.
+        :param max_batch_bytes: Maximum total length, in characters, of the
+                                file spec arguments of a batch.
+        :param parallel_threads: If greater than 1, ask the server to transfer
+                                 the files of a batch over that many threads
+                                 (``p4 sync --parallel``). This requires the
+                                 server to be configured with ``net.parallel.max``.
+        :param parallel_min_size: Minimum number of bytes a batch must hold for
+                                  the server to use a parallel transfer.
+        :param cancel_event: Optional ``threading.Event`` used to cancel the
+                             sync, allowing several engines to be cancelled
+                             together.
+        :param max_retries: Number of times files which failed transiently
+                            are retried, 0 to never retry.
+        :param retry_delay: Number of seconds before the first retry, doubled
+                            on every further retry.
+        :param scheduler: Optional :class:`~schedule.SyncScheduler` deciding
+                          in which order files are synced and which ones
+                          are deferred to the off-peak hours.
+        :param bandwidth_limiter: Optional :class:`~schedule.BandwidthLimiter`
+                                  capping the transfer rate, which can be
+                                  shared by several engines.
+        :param space_check: Optional :class:`~space.DiskSpaceCheck` run
+                            before anything is transferred, refusing or
+                            trimming syncs which don't fit on disk.
+        :param opened_check: Optional :class:`~opened.OpenedFilesCheck`
+                             deciding what to do with the files opened in
+                             the workspace.
+        """
+        self._p4 = p4
+        self._max_batch_files = max_batch_files or self.DEFAULT_MAX_BATCH_FILES
+        self._max_batch_bytes = max_batch_bytes or self.DEFAULT_MAX_BATCH_BYTES
+        self._parallel_threads = parallel_threads
+        self._parallel_min_size = parallel_min_size
+        self._cancel_event = cancel_event or threading.Event()
+        self._max_retries = (
+            self.DEFAULT_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self._retry_delay = (
+            self.DEFAULT_RETRY_DELAY if retry_delay is None else retry_delay
+        )
+        self._scheduler = scheduler
+        self._bandwidth_limiter = bandwidth_limiter
+        self._space_check = space_check
+        self._opened_check = opened_check
+
+    ############################################################################################
+    # public interface
+
+    def plan(self, file_specs, max_batch_files=None):
+        """
+        Splits a list of file specs into batches.
+
+        :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+        :param max_batch_files: Maximum number of file specs per batch,
+                                overriding the one of the engine.
+        :returns: List of batches, each batch being a list of file specs.
+        """
+        max_batch_files = max_batch_files or self._max_batch_files
+        batches = []
+        batch = []
+        batch_bytes = 0
+
+        for file_spec in file_specs:
+            # account for the separator between arguments
+            spec_bytes = len(file_spec) + 1
+            if batch and (
+                len(batch) >= max_batch_files
+                or batch_bytes + spec_bytes > self._max_batch_bytes
+            ):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+
+            batch.append(file_spec)
+            batch_bytes += spec_bytes
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def dedupe(self, file_specs):
+        """
+        Removes the file specs referring to the same path as a later one,
+        results being reported by path. The last file spec of a path is kept,
+        at the position of the first one.
+
+        :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+        :returns: List of file specs with a single file spec per path.
+        """
+        specs_by_path = {}
+        paths = []
+        for file_spec in file_specs:
+            path = split_file_spec(file_spec)[0]
+            if path not in specs_by_path:
+                paths.append(path)
+            elif specs_by_path[path] != file_spec:
+                logger.warning(
+                    "%s is synced more than once, syncing %s instead of %s."
+                    % (path, file_spec, specs_by_path[path])
+                )
+            specs_by_path[path] = file_spec
+        if len(paths) == len(file_specs):
+            return list(file_specs)
+        return [specs_by_path[path] for path in paths]
+
+    def cancel(self):
+        """
+        Requests the running sync to stop. The batch being transferred is
+        completed, no further batch is sent to the server.
+        """
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        """
+        :returns: True if the sync has been cancelled.
+        """
+        return self._cancel_event.is_set()
+
+    def sync(self, file_specs, force=False, progress=None):
+        """
+        Syncs the given file specs and returns a result for every file.
+
+        :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+        :param force: If True, files are force synced (``p4 sync -f``), rewriting
+                      files the workspace already has. Use this to repair a
+                      workspace, a regular sync only transfers what changed.
+        :param progress: Optional :class:`~progress.TransferProgress` updated
+                         with the bytes transferred while the sync runs.
+        :returns: List of :class:`SyncResult`
+        """
+        return list(self.iter_sync(file_specs, force=force, progress=progress))
+
+    def iter_sync(self, file_specs, force=False, progress=None):
+        """
+        Generator version of :meth:`sync`. Results are yielded as soon as the
+        batch they belong to has been processed by the server, which allows
+        callers to report progress while the sync is running.
+
+        :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+        :param force: If True, files are force synced (``p4 sync -f``), rewriting
+                      files the workspace already has. Use this to repair a
+                      workspace, a regular sync only transfers what changed.
+        :param progress: Optional :class:`~progress.TransferProgress` updated
+                         with the bytes transferred while the sync runs. Its
+                         planned sizes are queried first if they aren't set.
+        :returns: Generator of :class:`SyncResult`
+        """
+        options = self._get_sync_options(force)
+        file_specs = self.dedupe(file_specs)
+
+        sizes = None
+        size_records = None
+        if self._space_check is not None or self._opened_check is not None:
+            # the checks need the local and depot paths of the files
+            size_records = query_size_records(self._p4, file_specs)
+            sizes = total_sizes(size_records)
+        elif self._scheduler is not None or (
+            progress is not None and not progress.is_planned()
+        ):
+            sizes = query_sizes(self._p4, file_specs)
+        handler = None
+        indicator = None
+        if progress is not None:
+            if not progress.is_planned():
+                progress.plan(sizes)
+            handler = create_output_handler(self._p4, progress, self._cancel_event)
+            indicator = create_progress_indicator(
+                self._p4, progress, self._bandwidth_limiter, self._cancel_event
+            )
+
+        (file_specs, deferred_results) = self.schedule(file_specs, sizes, progress)
+        for result in deferred_results:
+            yield result
+        (file_specs, skipped_results, resolve_paths) = self.check_opened(
+            file_specs, size_records, progress
+        )
+        for result in skipped_results:
+            yield result
+        (file_specs, left_out_results) = self.check_space(
+            file_specs, size_records, progress
+        )
+        for result in left_out_results:
+            yield result
+
+        pending = list(file_specs)
+        attempt = 0
+        while pending:
+            to_retry = []
+            max_batch_files = max(
+                self._max_batch_files // (self.RETRY_BATCH_DIVISOR ** attempt), 1
+            )
+            for batch in self.plan(pending, max_batch_files):
+                if self.is_cancelled():
+                    return
+                specs_by_path = dict((split_file_spec(s)[0], s) for s in batch)
+                for result in self._sync_batch(batch, options, handler, indicator):
+                    result.attempts = attempt + 1
+                    file_spec = specs_by_path[result.path]
+                    if (
+                        result.status == SyncResult.FAILED
+                        and errors.is_retryable(result.reason)
+                        and attempt < self._max_retries
+                    ):
+                        to_retry.append(file_spec)
+                        continue
+                    if progress is not None and result.status != SyncResult.SYNCED:
+                        progress.skip(file_spec)
+                    self._flag_resolve(result, resolve_paths)
+                    yield result
+
+            pending = to_retry
+            if pending:
+                delay = self._retry_delay * (2 ** attempt)
+                attempt += 1
+                logger.debug(
+                    "Retrying %d files in %s seconds (attempt %d of %d)."
+                    % (len(pending), delay, attempt, self._max_retries)
+                )
+                # cancelling interrupts the wait
+                if self._cancel_event.wait(delay):
+                    return
+                self._reconnect()
+
+    ############################################################################################
+    # private methods
+
+    def _get_sync_options(self, force):
+        """
+        Returns the list of options to pass to every ``p4 sync`` call.
+
+        :param force: If True, files are force synced.
+        """
+        options = []
+        if force:
+            options.append("-f")
+        if self._parallel_threads > 1:
+            parallel = "--parallel=threads=%d" % self._parallel_threads
+            if self._parallel_min_size:
+                parallel += ",minsize=%d" % self._parallel_min_size
+            options.append(parallel)
+        return options
+
+    def schedule(self, file_specs, sizes, progress=None):
+        """
+        Orders file specs and defers the large ones to the off-peak hours,
+        according to the scheduler of the engine.
+
+        :param file_specs: List of file specs.
+        :param sizes: Dictionary of planned file sizes keyed by file spec,
+                      only needed with a scheduler.
+        :param progress: Optional :class:`~progress.TransferProgress` the
+                         deferred files are removed from.
+        :returns: Tuple with the list of file specs to sync now, in the order
+                  to sync them in, and a list of :class:`SyncResult` for the
+                  deferred files.
+        """
+        if self._scheduler is None:
+            return file_specs, []
+
+        (file_specs, deferred) = self._scheduler.schedule(file_specs, sizes)
+        deferred_results = []
+        for file_spec in deferred:
+            if progress is not None:
+                progress.skip(file_spec)
+            deferred_results.append(
+                SyncResult(
+                    split_file_spec(file_spec)[0],
+                    SyncResult.DEFERRED,
+                    size=sizes.get(file_spec, 0),
+                    message="Deferred to off-peak hours",
+                )
+            )
+        if deferred:
+            logger.debug("Deferred %d files to off-peak hours." % len(deferred))
+        return file_specs, deferred_results
+
+    def check_opened(self, file_specs, size_records, progress=None):
+        """
+        Leaves the files opened in the workspace out of the sync, or finds the
+        ones which will need a resolve, according to the opened files check
+        of the engine. The opened files are read with a single server call.
+
+        :param file_specs: List of file specs.
+        :param size_records: Dictionary of fstat records keyed by file spec,
+                             only needed with an opened files check.
+        :param progress: Optional :class:`~progress.TransferProgress` the
+                         skipped files are removed from.
+        :returns: Tuple with the list of file specs to sync, a list of
+                  :class:`SyncResult` for the skipped files and the set of
+                  paths which will need a resolve once synced.
+        :raises RuntimeError: If the opened files couldn't be read.
+        """
+        if self._opened_check is None or not file_specs:
+            return file_specs, [], set()
+
+        opened = query_opened(self._p4)
+        (file_specs, skipped, to_resolve) = self._opened_check.check(
+            opened, file_specs, size_records
+        )
+        results = []
+        for (file_spec, message, needs_resolve) in skipped:
+            if progress is not None:
+                progress.skip(file_spec)
+            results.append(
+                SyncResult(
+                    split_file_spec(file_spec)[0],
+                    SyncResult.SKIPPED,
+                    message=message,
+                    needs_resolve=needs_resolve,
+                )
+            )
+        if skipped:
+            logger.debug("Skipped %d files opened in the workspace." % len(skipped))
+        return (
+            file_specs,
+            results,
+            set(split_file_spec(file_spec)[0] for file_spec in to_resolve),
+        )
+
+    def check_space(self, file_specs, size_records, progress=None):
+        """
+        Checks that the files fit on disk, according to the disk space check
+        of the engine.
+
+        :param file_specs: List of file specs, in the order they are synced in.
+        :param size_records: Dictionary of fstat records keyed by file spec,
+                             only needed with a disk space check.
+        :param progress: Optional :class:`~progress.TransferProgress` the
+                         files left out are removed from.
+        :returns: Tuple with the list of file specs to sync and a list of
+                  failed :class:`SyncResult` for the files left out.
+        """
+        if self._space_check is None:
+            return file_specs, []
+
+        (file_specs, left_out) = self._space_check.check(file_specs, size_records)
+        results = []
+        for (file_spec, message) in left_out:
+            if progress is not None:
+                progress.skip(file_spec)
+            results.append(
+                SyncResult(
+                    split_file_spec(file_spec)[0],
+                    SyncResult.FAILED,
+                    message=message,
+                    reason=errors.DISK_SPACE,
+                )
+            )
+        if left_out:
+            logger.warning(left_out[0][1])
+        return file_specs, results
+
+    def _flag_resolve(self, result, resolve_paths):
+        """
+        Flags the result of an opened file synced to a newer revision, which
+        now needs a resolve.
+
+        :param result: :class:`SyncResult`
+        :param resolve_paths: Set of the paths which need a resolve once synced.
+        """
+        if result.path in resolve_paths and result.status == SyncResult.SYNCED:
+            result.needs_resolve = True
+            result.message = "Opened in the workspace, resolve needed"
+
+    def _sync_batch(self, batch, options, handler, indicator):
+        """
+        Syncs a batch of file specs with a single server call.
+
+        A failure of the call itself, e.g. because the connection dropped, is
+        reported as a failure of every file of the batch rather than raised,
+        so that the files can be retried.
+
+        With a bandwidth limiter, the bytes of the batch which the progress
+        indicator didn't see go through the limiter once the batch is done,
+        so that the cap holds even when the server doesn't report progress.
+
+        :returns: List of :class:`SyncResult`, one per file.
+        """
+        limited_bytes = indicator.limited_bytes if indicator is not None else 0
+        results = self._run_sync_batch(batch, options, handler, indicator)
+        if self._bandwidth_limiter is not None:
+            if indicator is not None:
+                limited_bytes = indicator.limited_bytes - limited_bytes
+            else:
+                limited_bytes = 0
+            transferred_bytes = sum(
+                result.size
+                for result in results
+                if result.status == SyncResult.SYNCED
+                and result.action not in SyncStats.NO_TRANSFER_ACTIONS
+            )
+            self._bandwidth_limiter.consume(
+                transferred_bytes - limited_bytes, self._cancel_event
+            )
+        return results
+
+    def _run_sync_batch(self, batch, options, handler, indicator):
+        """
+        Runs the server call syncing a batch of file specs.
+
+        :returns: List of :class:`SyncResult`, one per file.
+        """
+        try:
+            (records, warnings, error_messages) = run_command(
+                self._p4,
+                "sync",
+                options + [to_server_spec(file_spec) for file_spec in batch],
+                handler=handler,
+                progress=indicator,
+            )
+        except Exception as e:
+            message = str(e)
+            reason = errors.classify_error(message)
+            if reason == errors.OTHER and not self._is_connected():
+                reason = errors.CONNECTION
+            logger.debug("Failed to sync a batch of %d files: %s" % (len(batch), e))
+            return [
+                SyncResult(
+                    split_file_spec(file_spec)[0],
+                    SyncResult.FAILED,
+                    message=message,
+                    reason=reason,
+                )
+                for file_spec in batch
+            ]
+        return self._map_results(batch, records, warnings, error_messages)
+
+    def _is_connected(self):
+        try:
+            return self._p4.connected()
+        except Exception:
+            return False
+
+    def _reconnect(self):
+        """
+        Reconnects the connection if it was dropped, before retrying files.
+        """
+        if self._is_connected():
+            return
+        try:
+            self._p4.connect()
+        except Exception as e:
+            # the retried files fail again and are reported as such
+            logger.debug("Failed to reconnect to Perforce: %s" % e)
+
+    def _map_results(self, batch, records, warnings, error_messages):
+        """
+        Maps the output of a batched command back onto the requested file specs.
+
+        :param batch: List of file specs which were sent to the server.
+        :param records: Tagged records returned by the server.
+        :param warnings: Warning messages returned by the server.
+        :param error_messages: Error messages returned by the server.
+        :returns: List of :class:`SyncResult`, one per file.
+        """
+        paths = [split_file_spec(file_spec)[0] for file_spec in batch]
+        records_by_path = group_records(paths, records)
+
+        results = []
+        for path in paths:
+            path_records = records_by_path[path]
+            if len(path_records) == 1 and not is_sequence_path(path):
+                record = path_records[0]
+                results.append(
+                    SyncResult(
+                        path,
+                        SyncResult.SYNCED,
+                        depot_file=record.get("depotFile"),
+                        client_file=record.get("clientFile"),
+                        rev=record.get("rev"),
+                        action=record.get("action"),
+                        size=int(record.get("fileSize") or 0),
+                    )
+                )
+                continue
+            if is_sequence_path(path):
+                # messages refer to the wildcard or to single files, files
+                # already up to date aren't failures
+                frame_errors = find_sequence_messages(
+                    path,
+                    list(error_messages)
+                    + [w for w in warnings if "up-to-date" not in w],
+                )
+            else:
+                frame_errors = []
+            if path_records and frame_errors:
+                # a sequence failing as a whole, so that it is retried
+                results.append(
+                    SyncResult(
+                        path,
+                        SyncResult.FAILED,
+                        size=sum(int(r.get("fileSize") or 0) for r in path_records),
+                        message="%d files synced, %d failed: %s"
+                        % (len(path_records), len(frame_errors), frame_errors[0]),
+                    )
+                )
+                continue
+            if path_records:
+                # a sequence, reported as a whole
+                results.append(
+                    SyncResult(
+                        path,
+                        SyncResult.SYNCED,
+                        size=sum(int(r.get("fileSize") or 0) for r in path_records),
+                        message="%d files" % len(path_records),
+                    )
+                )
+                continue
+
+            # messages refer to the path as it was sent to the server
+            server_path = to_server_path(path)
+            error = find_message(server_path, error_messages)
+            if not error and frame_errors:
+                error = frame_errors[0]
+            warning = find_message(server_path, warnings)
+            if error:
+                results.append(SyncResult(path, SyncResult.FAILED, message=error))
+            elif warning and "up-to-date" in warning:
+                results.append(
+                    SyncResult(path, SyncResult.UP_TO_DATE, message=warning)
+                )
+            elif not warning and self.is_cancelled():
+                # the command was cancelled before reaching this file
+                continue
+            else:
+                results.append(
+                    SyncResult(
+                        path,
+                        SyncResult.FAILED,
+                        message=warning or "No result returned by the server.",
+                    )
+                )
+
+        return results
@@ -0,0 +1,103 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Classification of the reasons a file failed to sync.
+
+Some failures are transient, like a dropped connection or a file briefly held
+open by another process, and are worth retrying. Others, like a file outside
+of the workspace view, fail the same way every time.
+"""
+
+# reasons a file can fail to sync
+CONNECTION = "connection"
+DISK_SPACE = "disk space"
+LOCKED = "locked"
+WRITABLE = "writable"
+NOT_MAPPED = "not mapped"
+PERMISSION = "permission"
+OTHER = "other"
+
+# reasons which may go away by themselves, worth retrying
+RETRYABLE_REASONS = (CONNECTION, LOCKED)
+
+# lower case fragments of server and client messages, checked in order
+_MESSAGE_FRAGMENTS = (
+    (
+        CONNECTION,
+        (
+            "tcp send failed",
+            "tcp receive failed",
+            "connect to server failed",
+            "partner exited unexpectedly",
+            "connection reset",
+            "connection refused",
+            "broken pipe",
+            "operation timed out",
+            "ssl receive failed",
+            "ssl send failed",
+        ),
+    ),
+    (
+        DISK_SPACE,
+        ("no space left on device", "not enough space on the disk", "disk full"),
+    ),
+    (WRITABLE, ("can't clobber writable file",)),
+    (LOCKED, ("being used by another process", "resource busy")),
+    (
+        NOT_MAPPED,
+        ("not in client view", "no such file", "not on client", "not in depot"),
+    ),
+    (
+        PERMISSION,
+        (
+            "no permission",
+            "protections table",
+            "perform password login",
+            # local files or folders the user can't write to, which no retry fixes
+            "permission denied",
+            "access is denied",
+        ),
+    ),
+)
+
+# display names of the reasons
+REASON_LABELS = {
+    CONNECTION: "Connection lost",
+    DISK_SPACE: "Not enough disk space",
+    LOCKED: "File in use",
+    WRITABLE: "Writable local file",
+    NOT_MAPPED: "Not in workspace view",
+    PERMISSION: "No permission",
+    OTHER: "Other error",
+}
+
+
+def classify_error(message):
+    """
+    Returns the reason a file failed to sync, from its error message.
+
+    :param message: Error or warning message reported for the file.
+    :returns: One of the reason constants of this module.
+    """
+    message = (message or "").lower()
+    for (reason, fragments) in _MESSAGE_FRAGMENTS:
+        for fragment in fragments:
+            if fragment in message:
+                return reason
+    return OTHER
+
+
+def is_retryable(reason):
+    """
+    :param reason: One of the reason constants of this module.
+    :returns: True if a failure for this reason may go away by itself.
+    """
+    return reason in RETRYABLE_REASONS
@@ -0,0 +1,328 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Local index of the have and head revisions of a workspace.
+
+Asking the server for the status of every file each time the loader needs to
+know what is out of date gets slow with large workspaces. The index keeps the
+last known status of every file in a SQLite database, and keeps the head
+revisions current by only asking the server for what was submitted since the
+last changelist it has seen, the watermark.
+
+Have revisions only change when the workspace is synced. Syncs made by the
+app are recorded as they happen, syncs made with other tools are caught up
+with when entries expire.
+"""
+
+import contextlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .commands import run_command, normalize_path
+from .engine import SyncResult
+from .paths import is_sequence_path
+from .snapshot import get_latest_changelist
+from .status import RevisionStatus, RevisionStatusService
+
+logger = logging.getLogger(__name__)
+
+# maximum number of parameters in a single SQLite statement, kept well
+# below the limit of older SQLite versions
+_MAX_PARAMETERS = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    workspace TEXT NOT NULL,
+    path TEXT NOT NULL,
+    depot_file TEXT NOT NULL,
+    have_rev INTEGER NOT NULL,
+    head_rev INTEGER NOT NULL,
+    head_action TEXT,
+    action TEXT,
+    updated REAL NOT NULL,
+    PRIMARY KEY (workspace, path)
+);
+CREATE INDEX IF NOT EXISTS files_depot_file ON files (workspace, depot_file);
+CREATE TABLE IF NOT EXISTS workspaces (
+    workspace TEXT PRIMARY KEY,
+    watermark INTEGER,
+    refreshed REAL NOT NULL
+);
+"""
+
+
+class HaveListIndex(object):
+    """
+    SQLite backed cache of the revision status of the files of workspaces.
+
+    :meth:`get_status` is a drop in replacement for
+    :meth:`~status.RevisionStatusService.get_status`: on a warm index it
+    answers without any server call.
+    """
+
+    # number of seconds an entry is trusted before it is queried again
+    DEFAULT_TTL = 3600
+
+    # minimum number of seconds between two checks for new changelists
+    DEFAULT_REFRESH_INTERVAL = 30
+
+    def __init__(self, db_path, ttl=None, refresh_interval=None):
+        """
+        :param db_path: Path of the SQLite database, created if needed.
+        :param ttl: Number of seconds an entry is trusted before the server
+                    is asked for the status of the file again.
+        :param refresh_interval: Minimum number of seconds between two checks
+                                 for changelists submitted since the watermark.
+        """
+        self._db_path = db_path
+        self._ttl = self.DEFAULT_TTL if ttl is None else ttl
+        self._refresh_interval = (
+            self.DEFAULT_REFRESH_INTERVAL
+            if refresh_interval is None
+            else refresh_interval
+        )
+        # SQLite connections can't be shared between threads, a connection
+        # is opened for every operation and the operations are serialized.
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def get_status(self, p4, paths):
+        """
+        Returns the revision status of the given paths, only querying the
+        server for the files which aren't indexed or whose entry has expired.
+
+        :param p4: Connected P4Python ``P4`` instance.
+        :param paths: List of local or depot paths.
+        :returns: Dictionary of :class:`~status.RevisionStatus` keyed by path.
+        """
+        if not paths:
+            return {}
+
+        try:
+            self.refresh(p4)
+        except RuntimeError as e:
+            # without knowing what was submitted, none of the entries can
+            # be trusted.
+            logger.debug("Failed to refresh the have list index: %s" % e)
+            return RevisionStatusService(p4).get_status(paths)
+
+        workspace = _get_workspace(p4)
+        now = time.time()
+        statuses = {}
+        missing = []
+        rows = self._read_rows(workspace, [normalize_path(path) for path in paths])
+        for path in paths:
+            row = rows.get(normalize_path(path))
+            if row is None or now - row[6] > self._ttl:
+                missing.append(path)
+            else:
+                statuses[path] = RevisionStatus(
+                    path,
+                    depot_file=row[1],
+                    have_rev=row[2],
+                    head_rev=row[3],
+                    head_action=row[4],
+                    action=row[5],
+                )
+
+        if missing:
+            queried = RevisionStatusService(p4).get_status(missing)
+            self._write_statuses(workspace, list(queried.values()), now)
+            statuses.update(queried)
+
+        logger.debug(
+            "Have list index: %d of %d files served locally."
+            % (len(paths) - len(missing), len(paths))
+        )
+        return statuses
+
+    def refresh(self, p4, force=False):
+        """
+        Brings the head revisions of the indexed files up to date with the
+        changelists submitted since the watermark.
+
+        This costs a single ``p4 changes -m1`` when nothing was submitted, and
+        an additional ``p4 files`` over the new changelists otherwise.
+
+        :param p4: Connected P4Python ``P4`` instance.
+        :param force: If True, the server is checked even if it was checked
+                      less than the refresh interval ago.
+        :returns: The new watermark, None if nothing was ever submitted.
+        :raises RuntimeError: If the server reported an error.
+        """
+        workspace = _get_workspace(p4)
+        (watermark, refreshed) = self._read_watermark(workspace)
+        if not force and time.time() - refreshed < self._refresh_interval:
+            return watermark
+
+        latest = get_latest_changelist(p4)
+        updates = []
+        if watermark is not None and latest is not None and latest > watermark:
+            (records, _, errors) = run_command(
+                p4,
+                "files",
+                ["//%s/...@%d,@%d" % (p4.client, watermark + 1, latest)],
+            )
+            if errors:
+                raise RuntimeError(errors[0].strip())
+            updates = [
+                (int(record["rev"]), record.get("action"), record["depotFile"])
+                for record in records
+                if record.get("depotFile") and record.get("rev")
+            ]
+
+        with self._database() as db:
+            db.executemany(
+                "UPDATE files SET head_rev = ?, head_action = ? "
+                "WHERE workspace = ? AND depot_file = ?",
+                [
+                    (rev, action, workspace, depot_file)
+                    for (rev, action, depot_file) in updates
+                ],
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO workspaces (workspace, watermark, refreshed) "
+                "VALUES (?, ?, ?)",
+                (workspace, latest, time.time()),
+            )
+        if updates:
+            logger.debug(
+                "Have list index: %d files changed in changelists %d to %d."
+                % (len(updates), watermark + 1, latest)
+            )
+        return latest
+
+    def record_sync(self, p4, results):
+        """
+        Records the have revisions of files synced in a workspace.
+
+        :param p4: P4Python ``P4`` instance the files were synced with.
+        :param results: List of :class:`~engine.SyncResult`
+        """
+        updates = []
+        for result in results:
+            if result.status != SyncResult.SYNCED or not result.depot_file:
+                continue
+            if result.action == "deleted" or not result.rev:
+                have_rev = 0
+            else:
+                have_rev = int(result.rev)
+            updates.append((have_rev, _get_workspace(p4), result.depot_file))
+
+        if updates:
+            with self._database() as db:
+                db.executemany(
+                    "UPDATE files SET have_rev = ? WHERE workspace = ? AND depot_file = ?",
+                    updates,
+                )
+
+    def rebuild(self, p4):
+        """
+        Drops everything indexed for a workspace and resets its watermark to
+        the latest changelist. Files are indexed again the next time their
+        status is requested.
+
+        :param p4: Connected P4Python ``P4`` instance.
+        :raises RuntimeError: If the server reported an error.
+        """
+        workspace = _get_workspace(p4)
+        with self._database() as db:
+            db.execute("DELETE FROM files WHERE workspace = ?", (workspace,))
+            db.execute("DELETE FROM workspaces WHERE workspace = ?", (workspace,))
+        self.refresh(p4, force=True)
+
+    def _read_watermark(self, workspace):
+        """
+        :returns: Tuple with the watermark of a workspace and the time it was
+                  last refreshed, (None, 0) if the workspace isn't indexed.
+        """
+        with self._database() as db:
+            row = db.execute(
+                "SELECT watermark, refreshed FROM workspaces WHERE workspace = ?",
+                (workspace,),
+            ).fetchone()
+        if row is None:
+            return (None, 0)
+        return (row[0], row[1])
+
+    def _read_rows(self, workspace, keys):
+        """
+        :returns: Dictionary of the indexed rows of a workspace keyed by path.
+        """
+        rows = {}
+        with self._database() as db:
+            for i in range(0, len(keys), _MAX_PARAMETERS):
+                chunk = keys[i : i + _MAX_PARAMETERS]
+                cursor = db.execute(
+                    "SELECT path, depot_file, have_rev, head_rev, head_action, action, "
+                    "updated FROM files WHERE workspace = ? AND path IN (%s)"
+                    % ",".join("?" * len(chunk)),
+                    [workspace] + chunk,
+                )
+                for row in cursor:
+                    rows[row[0]] = row
+        return rows
+
+    def _write_statuses(self, workspace, statuses, updated):
+        """
+        Indexes the status of files. Files unknown to the server aren't
+        indexed, as there is no depot path to track them with, and neither
+        are sequences, whose files can't be tracked with a single depot path.
+        """
+        with self._database() as db:
+            db.executemany(
+                "INSERT OR REPLACE INTO files (workspace, path, depot_file, have_rev, "
+                "head_rev, head_action, action, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        workspace,
+                        normalize_path(status.path),
+                        status.depot_file,
+                        status.have_rev,
+                        status.head_rev,
+                        status.head_action,
+                        status.action,
+                        updated,
+                    )
+                    for status in statuses
+                    if status.depot_file and not is_sequence_path(status.path)
+                ],
+            )
+
+    @contextlib.contextmanager
+    def _database(self):
+        """
+        Context manager opening the database, committing on success.
+        """
+        with self._lock:
+            if not self._initialized:
+                folder = os.path.dirname(self._db_path)
+                if folder and not os.path.isdir(folder):
+                    os.makedirs(folder)
+            db = sqlite3.connect(self._db_path)
+            try:
+                if not self._initialized:
+                    db.executescript(_SCHEMA)
+                    self._initialized = True
+                yield db
+                db.commit()
+            finally:
+                db.close()
+
+
+def _get_workspace(p4):
+    """
+    Returns the key the files of the workspace of a connection are indexed with.
+    """
+    return "%s@%s" % (p4.client, p4.port)
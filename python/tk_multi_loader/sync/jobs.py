@@ -0,0 +1,240 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import itertools
+import threading
+import time
+
+from .commands import split_file_spec, normalize_path
+
+
+class SyncJob(object):
+    """
+    A list of files to sync, queued with a priority.
+    """
+
+    # job states
+    (PENDING, RUNNING, DONE, CANCELLED, FAILED) = (
+        "pending",
+        "running",
+        "done",
+        "cancelled",
+        "failed",
+    )
+
+    # job priorities, lower values run first
+    PRIORITY_SELECTION = 0
+    PRIORITY_ENTITY = 10
+    PRIORITY_PROJECT = 20
+    PRIORITY_DEFERRED = 30
+
+    _ids = itertools.count(1)
+
+    def __init__(
+        self,
+        name,
+        file_specs,
+        priority=PRIORITY_ENTITY,
+        force=False,
+        start_after=None,
+        include_opened=False,
+    ):
+        """
+        :param name: Display name of the job, e.g. the synced entity.
+        :param file_specs: List of file specs to sync.
+        :param priority: One of the PRIORITY_* values.
+        :param force: If True, files are force synced.
+        :param start_after: Optional time, in seconds since the epoch, before
+                            which the job isn't started, e.g. the start of
+                            the off-peak hours.
+        :param include_opened: If True, files opened in the workspace are
+                               synced rather than skipped, scheduling a
+                               resolve where needed.
+        """
+        self.id = next(self._ids)
+        self.name = name
+        self.file_specs = list(file_specs)
+        self.priority = priority
+        self.force = force
+        self.start_after = start_after
+        self.include_opened = include_opened
+        self.state = self.PENDING
+        self.error = None
+        # set by the owner of the queue once the job runs
+        self.stats = None
+        self.progress = None
+
+    def __repr__(self):
+        return "<SyncJob %d '%s' %s, %d files>" % (
+            self.id,
+            self.name,
+            self.state,
+            len(self.file_specs),
+        )
+
+
+class SyncJobQueue(object):
+    """
+    Thread safe priority queue of :class:`SyncJob`, running one job at a time.
+
+    Jobs are ordered by priority, then by submission order. Jobs with a start
+    time only run once it has passed, and don't hold back the jobs queued
+    after them in the meantime. Files are only
+    ever queued once for a given revision: a file already waiting in a job of
+    the same or higher priority, or part of the running job, is dropped from
+    a new job, and a file waiting in a lower priority job is moved to the new
+    one.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = []
+        self._current = None
+
+    @property
+    def current_job(self):
+        """
+        The running job, None if the queue is idle.
+        """
+        return self._current
+
+    def pending_jobs(self):
+        """
+        :returns: List of the jobs waiting to run, in running order.
+        """
+        with self._lock:
+            return list(self._pending)
+
+    def is_busy(self):
+        """
+        :returns: True if a job is running or ready to run. Jobs waiting for
+                  their start time don't count.
+        """
+        with self._lock:
+            return bool(self._current or any(self._is_ready(p) for p in self._pending))
+
+    def next_start_time(self):
+        """
+        :returns: The earliest start time of the jobs waiting for it, None if
+                  there is no such job.
+        """
+        with self._lock:
+            start_times = [p.start_after for p in self._pending if not self._is_ready(p)]
+        return min(start_times) if start_times else None
+
+    def add(self, job):
+        """
+        Queues a job, removing the files which are already queued.
+
+        :param job: :class:`SyncJob` to queue.
+        :returns: The queued job, or None if all its files were already queued.
+        """
+        with self._lock:
+            running_keys = set()
+            if self._current and self._current.force == job.force:
+                running_keys = set(_spec_key(s) for s in self._current.file_specs)
+
+            # pending jobs are sorted, so each file maps to its most urgent job
+            queued_in = {}
+            for pending in self._pending:
+                if pending.force == job.force:
+                    for file_spec in pending.file_specs:
+                        queued_in.setdefault(_spec_key(file_spec), pending)
+
+            file_specs = []
+            job_keys = set()
+            taken_over = set()
+            for file_spec in job.file_specs:
+                key = _spec_key(file_spec)
+                if key in running_keys or key in job_keys:
+                    continue
+                pending = queued_in.get(key)
+                if pending and pending.priority <= job.priority:
+                    continue
+                if pending:
+                    # the new job is more urgent, take the file over
+                    taken_over.add(key)
+                file_specs.append(file_spec)
+                job_keys.add(key)
+
+            if taken_over:
+                for pending in self._pending:
+                    if pending.force == job.force:
+                        pending.file_specs = [
+                            s for s in pending.file_specs if _spec_key(s) not in taken_over
+                        ]
+
+            self._pending = [p for p in self._pending if p.file_specs]
+            if not file_specs:
+                return None
+
+            job.file_specs = file_specs
+            self._pending.append(job)
+            # sort is stable, so jobs of the same priority keep their order
+            self._pending.sort(key=lambda p: p.priority)
+            return job
+
+    def next_job(self):
+        """
+        Starts the next job, if the queue is not already running one.
+
+        :returns: The started :class:`SyncJob`, None if there is nothing to start.
+        """
+        with self._lock:
+            if self._current:
+                return None
+            for (index, pending) in enumerate(self._pending):
+                if self._is_ready(pending):
+                    self._current = self._pending.pop(index)
+                    self._current.state = SyncJob.RUNNING
+                    return self._current
+            return None
+
+    def finish(self, job, state=SyncJob.DONE, error=None):
+        """
+        Marks the running job as over.
+
+        :param job: The running :class:`SyncJob`.
+        :param state: Final state of the job.
+        :param error: Error message, if the job failed.
+        """
+        with self._lock:
+            job.state = state
+            job.error = error
+            if self._current is job:
+                self._current = None
+
+    def _is_ready(self, job):
+        """
+        :returns: True if a pending job can start.
+        """
+        return job.start_after is None or job.start_after <= time.time()
+
+    def cancel_pending(self):
+        """
+        Removes all the jobs waiting to run.
+
+        :returns: List of the cancelled jobs.
+        """
+        with self._lock:
+            cancelled = self._pending
+            self._pending = []
+        for job in cancelled:
+            job.state = SyncJob.CANCELLED
+        return cancelled
+
+
+def _spec_key(file_spec):
+    """
+    :returns: Key identifying the file and revision of a file spec, so that
+              syncing a file to different revisions is never deduplicated.
+    """
+    (path, revision) = split_file_spec(file_spec)
+    return (normalize_path(path), revision)
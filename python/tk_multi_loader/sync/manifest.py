@@ -0,0 +1,181 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Sync manifests.
+
+A manifest lists the depot path and the have revision of a set of files, so
+that the exact state of a workspace can be reproduced on another machine by
+syncing every file to its revision in a single batched sync. Files the
+workspace doesn't have are listed with revision 0 and are removed from the
+workspace the manifest is applied to.
+
+Manifests are written as JSON, or as CSV when the file name ends with
+``.csv``::
+
+    {"version":1,"files":[["//depot/shot/light.ma",12],["//depot/shot/key.exr",3]]}
+
+    depot_file,rev
+    //depot/shot/light.ma,12
+    //depot/shot/key.exr,3
+"""
+
+import csv
+import io
+import json
+import os
+import sys
+
+from .commands import run_chunked
+from .paths import to_server_path
+
+# version of the manifest format, written to JSON manifests
+MANIFEST_VERSION = 1
+
+# header row of CSV manifests
+CSV_HEADER = ("depot_file", "rev")
+
+# fields requested from fstat, keeping the server response small
+FSTAT_FIELDS = "depotFile,haveRev"
+
+# maximum number of paths sent to the server in a single fstat call
+DEFAULT_CHUNK_SIZE = 1000
+
+try:
+    # Python 2, where JSON strings are unicode
+    _STRING_TYPES = (str, unicode)
+except NameError:
+    _STRING_TYPES = (str,)
+
+
+def query_manifest(p4, paths, chunk_size=None):
+    """
+    Retrieves the depot path and have revision of every file matching the
+    given paths, using batched ``p4 fstat`` calls. Every file of a sequence
+    is listed.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param paths: List of local or depot paths.
+    :param chunk_size: Maximum number of paths per fstat call.
+    :returns: List of (depot path, have revision) tuples sorted by depot path,
+              the revision is 0 for files the workspace doesn't have.
+    """
+    if not paths:
+        return []
+
+    (records, _, _) = run_chunked(
+        p4,
+        "fstat",
+        ["-T", FSTAT_FIELDS],
+        [to_server_path(path) for path in paths],
+        chunk_size or DEFAULT_CHUNK_SIZE,
+    )
+    entries = {}
+    for record in records:
+        depot_file = record.get("depotFile")
+        if depot_file:
+            entries[depot_file] = int(record.get("haveRev") or 0)
+    return sorted(entries.items())
+
+
+def write_manifest(path, entries):
+    """
+    Writes a manifest file, as CSV if its name ends with ``.csv`` and as
+    JSON otherwise.
+
+    :param path: Path of the manifest file.
+    :param entries: List of (depot path, revision) tuples.
+    """
+    if _is_csv(path):
+        with _open_csv(path, "w") as fh:
+            writer = csv.writer(fh, lineterminator="\n")
+            writer.writerow(CSV_HEADER)
+            for (depot_file, rev) in entries:
+                writer.writerow((depot_file, rev))
+    else:
+        data = {
+            "version": MANIFEST_VERSION,
+            "files": [[depot_file, rev] for (depot_file, rev) in entries],
+        }
+        with open(path, "w") as fh:
+            json.dump(data, fh, separators=(",", ":"))
+
+
+def read_manifest(path):
+    """
+    Reads a manifest file written by :func:`write_manifest`.
+
+    :param path: Path of the manifest file.
+    :returns: List of (depot path, revision) tuples.
+    :raises IOError: If the file can't be read.
+    :raises ValueError: If the file isn't a valid manifest.
+    """
+    if _is_csv(path):
+        with _open_csv(path, "r") as fh:
+            rows = list(csv.reader(fh))
+        if not rows or tuple(rows[0]) != CSV_HEADER:
+            raise ValueError(
+                "%s isn't a manifest, its first row must be %s"
+                % (path, ",".join(CSV_HEADER))
+            )
+        rows = [row for row in rows[1:] if row]
+    else:
+        with open(path, "r") as fh:
+            data = json.load(fh)
+        if not isinstance(data, dict) or "files" not in data:
+            raise ValueError("%s isn't a manifest" % path)
+        if data.get("version", MANIFEST_VERSION) > MANIFEST_VERSION:
+            raise ValueError(
+                "%s was written by a newer version of the loader" % path
+            )
+        rows = data["files"]
+
+    entries = []
+    for row in rows:
+        try:
+            (depot_file, rev) = row
+            rev = int(rev)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid manifest entry in %s: %r" % (path, row))
+        if (
+            not isinstance(depot_file, _STRING_TYPES)
+            or not depot_file.startswith("//")
+            or rev < 0
+        ):
+            raise ValueError("Invalid manifest entry in %s: %r" % (path, row))
+        entries.append((depot_file, rev))
+    return entries
+
+
+def manifest_file_specs(entries):
+    """
+    Pins the files of a manifest to their revision.
+
+    :param entries: List of (depot path, revision) tuples.
+    :returns: List of file specs, e.g. ``["//depot/file.ma#12"]``, with
+              ``#none`` for the files the workspace must not have.
+    """
+    return [
+        "%s#%s" % (depot_file, rev if rev > 0 else "none")
+        for (depot_file, rev) in entries
+    ]
+
+
+def _is_csv(path):
+    return os.path.splitext(path)[1].lower() == ".csv"
+
+
+def _open_csv(path, mode):
+    """
+    Opens a CSV file the way the csv module of the running Python expects.
+    """
+    if sys.version_info[0] < 3:
+        return open(path, mode + "b")
+    return io.open(path, mode, newline="", encoding="utf-8")
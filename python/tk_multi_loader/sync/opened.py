@@ -0,0 +1,159 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Files opened in the workspace.
+
+Syncing a file someone has checked out either leaves it alone or schedules a
+resolve, neither of which they expect from a "get latest". The files opened
+in the workspace are read with a single ``p4 opened`` before a sync and are
+either left out of the sync or synced and flagged, and a resolve is only
+offered for the ones which were opened at an older revision than the one
+synced.
+"""
+
+import logging
+
+from .commands import run_chunked, run_command
+
+logger = logging.getLogger(__name__)
+
+# maximum number of paths sent to the server in a single resolve call
+RESOLVE_CHUNK = 1000
+
+
+def query_opened(p4):
+    """
+    Retrieves the files opened in the workspace with a single ``p4 opened``.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :returns: Dictionary of ``p4 opened`` records keyed by depot path, with
+              the ``action`` the file is opened for and the ``rev`` it was
+              opened at.
+    :raises RuntimeError: If the server reported an error.
+    """
+    (records, _, errors) = run_command(p4, "opened", [])
+    if errors:
+        raise RuntimeError(errors[0].strip())
+    return dict(
+        (record["depotFile"], record) for record in records if record.get("depotFile")
+    )
+
+
+def resolve_files(p4, paths, chunk_size=RESOLVE_CHUNK):
+    """
+    Resolves files which only changed on one side, in the workspace or in the
+    depot, with ``p4 resolve -as``. Files with conflicting changes are left
+    for a manual resolve.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param paths: List of local or depot paths.
+    :param chunk_size: Maximum number of paths per server call.
+    :returns: List of the paths which still need a manual resolve.
+    """
+    if not paths:
+        return []
+    run_chunked(p4, "resolve", ["-as"], list(paths), chunk_size)
+    (records, _, _) = run_chunked(p4, "resolve", ["-n"], list(paths), chunk_size)
+    return sorted(
+        set(record.get("clientFile") or record.get("fromFile") for record in records)
+        - set([None])
+    )
+
+
+class OpenedFilesCheck(object):
+    """
+    Decides what to do with the files of a sync which are opened in the workspace.
+    """
+
+    # what is done with the opened files
+    (SKIP, FLAG) = ("skip", "flag")
+
+    def __init__(self, policy=SKIP):
+        """
+        :param policy: SKIP to leave opened files out of the sync, FLAG to
+                       sync them, which schedules a resolve for the ones
+                       opened at an older revision.
+        """
+        if policy not in (self.SKIP, self.FLAG):
+            raise ValueError("Invalid opened files policy '%s'" % policy)
+        self.policy = policy
+
+    def check(self, opened, file_specs, size_records):
+        """
+        Finds the file specs of a sync referring to opened files.
+
+        :param opened: Dictionary of opened files, as returned by :func:`query_opened`.
+        :param file_specs: List of file specs.
+        :param size_records: Dictionary of fstat records keyed by file spec,
+                             as returned by :func:`~sizes.query_size_records`.
+        :returns: Tuple with the list of file specs to sync, a list of
+                  (file spec, message, needs resolve) tuples for the file
+                  specs left out of the sync and the set of synced file specs
+                  which will need a resolve.
+        """
+        if not opened:
+            return list(file_specs), [], set()
+
+        to_sync = []
+        skipped = []
+        to_resolve = set()
+        for file_spec in file_specs:
+            records = [
+                (record, opened[record["depotFile"]])
+                for record in size_records.get(file_spec) or []
+                if record.get("depotFile") in opened
+            ]
+            if not records:
+                to_sync.append(file_spec)
+                continue
+
+            # the head revision of a file spec with a revision is that revision
+            needs_resolve = any(
+                int(opened_record.get("rev") or 0) < int(record.get("headRev") or 0)
+                for (record, opened_record) in records
+            )
+            if self.policy == self.FLAG:
+                to_sync.append(file_spec)
+                if needs_resolve:
+                    to_resolve.add(file_spec)
+                continue
+
+            actions = sorted(set(o.get("action") or "edit" for (_, o) in records))
+            message = "Opened for %s in the workspace" % ", ".join(actions)
+            if needs_resolve:
+                message += ", newer revision available"
+            skipped.append((file_spec, message, needs_resolve))
+        return to_sync, skipped, to_resolve
+
+
+def create_opened_check(app, include_opened=False):
+    """
+    Creates the check of the files opened in the workspace from the
+    ``sync_opened_files`` setting of an app.
+
+    :param app: Object with a ``get_setting`` method, e.g. the loader app.
+                Bundles without the setting skip opened files.
+    :param include_opened: If True, opened files are synced and flagged
+                           whatever the setting.
+    :returns: :class:`OpenedFilesCheck`, None if disabled.
+    """
+    policy = app.get_setting("sync_opened_files", OpenedFilesCheck.SKIP)
+    if include_opened:
+        policy = OpenedFilesCheck.FLAG
+    if policy == "off":
+        return None
+    try:
+        return OpenedFilesCheck(policy)
+    except ValueError:
+        logger.warning(
+            "Unknown sync_opened_files '%s', skipping opened files." % policy
+        )
+        return OpenedFilesCheck()
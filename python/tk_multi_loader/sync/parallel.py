@@ -0,0 +1,311 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import logging
+import threading
+import time
+
+try:
+    import queue
+except ImportError:
+    # Python 2
+    import Queue as queue
+
+from .commands import split_file_spec
+from .engine import SyncEngine, SyncResult
+from .sizes import query_size_records, total_sizes
+
+logger = logging.getLogger(__name__)
+
+# connection settings carried over to worker connections
+_CONNECTION_ATTRIBUTES = (
+    "port",
+    "user",
+    "client",
+    "host",
+    "charset",
+    "ticket_file",
+    "password",
+)
+
+
+def clone_connection(p4):
+    """
+    Opens a new connection with the same settings as an existing one.
+
+    The new connection authenticates with the ticket of the existing
+    connection, so no additional login is required.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :returns: A new, connected, ``P4`` instance.
+    """
+    clone = p4.__class__()
+    for attribute in _CONNECTION_ATTRIBUTES:
+        value = getattr(p4, attribute, None)
+        if value:
+            setattr(clone, attribute, value)
+    clone.exception_level = p4.exception_level
+    clone.connect()
+    return clone
+
+
+class ParallelSyncEngine(SyncEngine):
+    """
+    Sync engine spreading the transfer of large files over a pool of worker
+    connections.
+
+    Files below the small file threshold are synced in batches over the main
+    connection, since their cost is dominated by round trips rather than by
+    the transfer itself. Larger files are distributed over the worker
+    connections so that every worker ends up with roughly the same number of
+    bytes to transfer.
+    """
+
+    # maximum number of seconds a worker waits for a connection from the pool
+    WORKER_CONNECTION_TIMEOUT = 10
+
+    # number of seconds between two checks for cancellation while waiting
+    CANCEL_CHECK_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        p4,
+        threads=4,
+        min_size=0,
+        connection_factory=None,
+        connection_pool=None,
+        **kwargs
+    ):
+        """
+        :param p4: Connected P4Python ``P4`` instance.
+        :param threads: Number of worker connections used for large files.
+        :param min_size: Files smaller than this number of bytes are synced
+                         over the main connection.
+        :param connection_factory: Callable returning a new connected ``P4``
+                                   instance for a worker. Defaults to cloning
+                                   the main connection.
+        :param connection_pool: Optional :class:`~pool.ConnectionPool` worker
+                                connections are borrowed from and given back
+                                to, rather than opened and closed for every sync.
+        :param kwargs: Additional arguments passed to :class:`SyncEngine`.
+        """
+        SyncEngine.__init__(self, p4, **kwargs)
+        self._threads = max(threads, 1)
+        self._min_size = min_size
+        self._connection_factory = connection_factory or (
+            lambda: clone_connection(p4)
+        )
+        self._connection_pool = connection_pool
+        # worker engines share our cancel event so that they all stop together,
+        # and files are only scheduled and checked once, before being distributed
+        self._engine_kwargs = dict(
+            kwargs,
+            cancel_event=self._cancel_event,
+            scheduler=None,
+            space_check=None,
+            opened_check=None,
+        )
+
+    def distribute(self, file_specs, sizes, threads=None):
+        """
+        Distributes file specs over the worker connections.
+
+        :param file_specs: List of file specs.
+        :param sizes: Dictionary of file sizes keyed by file spec.
+        :param threads: Number of worker connections, overriding the one of
+                        the engine. With no worker connection, all the files
+                        are synced over the main connection.
+        :returns: Tuple with the list of small file specs to sync over the main
+                  connection and a list of shares, one per worker.
+        """
+        threads = self._threads if threads is None else threads
+        small_specs = []
+        large_specs = []
+        for spec in file_specs:
+            if threads < 1 or sizes.get(spec, 0) < self._min_size:
+                small_specs.append(spec)
+            else:
+                large_specs.append(spec)
+
+        # largest files first, always onto the least loaded worker
+        shares = [[] for _ in range(min(threads, len(large_specs)))]
+        loads = [0] * len(shares)
+        for spec in sorted(large_specs, key=lambda s: sizes.get(s, 0), reverse=True):
+            index = loads.index(min(loads))
+            shares[index].append(spec)
+            loads[index] += sizes.get(spec, 0)
+
+        return small_specs, shares
+
+    def iter_sync(self, file_specs, force=False, progress=None):
+        """
+        Syncs the given file specs over the main and worker connections,
+        yielding results as soon as any of the connections reports them.
+
+        :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+        :param force: If True, files are force synced (``p4 sync -f``), rewriting
+                      files the workspace already has. Use this to repair a
+                      workspace, a regular sync only transfers what changed.
+        :param progress: Optional :class:`~progress.TransferProgress` updated
+                         with the bytes transferred by all the connections.
+        :returns: Generator of :class:`SyncResult`
+        """
+        if not file_specs:
+            return
+
+        file_specs = self.dedupe(file_specs)
+        size_records = query_size_records(self._p4, file_specs)
+        sizes = total_sizes(size_records)
+        if progress is not None and not progress.is_planned():
+            progress.plan(sizes)
+        (file_specs, deferred_results) = self.schedule(file_specs, sizes, progress)
+        for result in deferred_results:
+            yield result
+        (file_specs, skipped_results, resolve_paths) = self.check_opened(
+            file_specs, size_records, progress
+        )
+        for result in skipped_results:
+            yield result
+        (file_specs, left_out_results) = self.check_space(
+            file_specs, size_records, progress
+        )
+        for result in left_out_results:
+            yield result
+        threads = self._threads
+        if self._connection_pool:
+            # never wait for connections held elsewhere in the app
+            threads = min(threads, self._connection_pool.available())
+        (small_specs, shares) = self.distribute(file_specs, sizes, threads)
+
+        results = queue.Queue()
+        # shares of the workers which didn't get a connection
+        fallback_specs = []
+        workers = []
+        if small_specs:
+            workers.append((small_specs, False))
+        for share in shares:
+            workers.append((share, True))
+
+        for (share, use_worker_connection) in workers:
+            thread = threading.Thread(
+                target=self._sync_share,
+                args=(
+                    share,
+                    use_worker_connection,
+                    force,
+                    progress,
+                    results,
+                    fallback_specs,
+                ),
+            )
+            thread.daemon = True
+            thread.start()
+
+        # a None entry in the queue marks the end of a worker
+        pending = len(workers)
+        while pending:
+            result = results.get()
+            if result is None:
+                pending -= 1
+            else:
+                self._flag_resolve(result, resolve_paths)
+                yield result
+
+        if fallback_specs and not self.is_cancelled():
+            # the main connection is free again once all the workers are done
+            logger.debug(
+                "Syncing %d files without a worker connection over the main connection."
+                % len(fallback_specs)
+            )
+            engine = SyncEngine(self._p4, **self._engine_kwargs)
+            for result in engine.iter_sync(
+                fallback_specs, force=force, progress=progress
+            ):
+                self._flag_resolve(result, resolve_paths)
+                yield result
+
+    def _acquire_worker_connection(self):
+        """
+        Borrows a worker connection from the pool, giving up if none is
+        released in time or if the sync is cancelled in the meantime.
+
+        :returns: Connected ``P4`` instance, None if none is available.
+        """
+        deadline = time.time() + self.WORKER_CONNECTION_TIMEOUT
+        while not self.is_cancelled():
+            try:
+                return self._connection_pool.acquire(
+                    min(self.CANCEL_CHECK_INTERVAL, max(deadline - time.time(), 0))
+                )
+            except RuntimeError:
+                if time.time() >= deadline:
+                    break
+        return None
+
+    def _sync_share(
+        self,
+        file_specs,
+        use_worker_connection,
+        force,
+        progress,
+        results,
+        fallback_specs,
+    ):
+        """
+        Syncs a share of the files, pushing results onto the given queue.
+
+        :param file_specs: List of file specs to sync.
+        :param use_worker_connection: If True, a dedicated connection is opened
+                                      for the share, otherwise the main
+                                      connection is used.
+        :param force: If True, files are force synced.
+        :param progress: Optional :class:`~progress.TransferProgress` to update.
+        :param results: Queue receiving the :class:`SyncResult`
+        :param fallback_specs: List the share is added to if no worker
+                               connection is available from the pool, to be
+                               synced over the main connection later on.
+        """
+        # paths which haven't been reported yet, in case the connection dies
+        remaining = dict((split_file_spec(spec)[0], spec) for spec in file_specs)
+        connection = None
+        failed = False
+        try:
+            if use_worker_connection:
+                if self._connection_pool:
+                    connection = self._acquire_worker_connection()
+                    if connection is None:
+                        fallback_specs.extend(file_specs)
+                        return
+                else:
+                    connection = self._connection_factory()
+                p4 = connection
+            else:
+                p4 = self._p4
+
+            engine = SyncEngine(p4, **self._engine_kwargs)
+            for result in engine.iter_sync(file_specs, force=force, progress=progress):
+                results.put(result)
+                remaining.pop(result.path, None)
+        except Exception as e:
+            failed = True
+            for (path, spec) in remaining.items():
+                if progress is not None:
+                    progress.skip(spec)
+                results.put(SyncResult(path, SyncResult.FAILED, message=str(e)))
+        finally:
+            try:
+                if connection is not None:
+                    if self._connection_pool:
+                        self._connection_pool.release(connection, discard=failed)
+                    elif connection.connected():
+                        connection.disconnect()
+            finally:
+                # always mark the end of the worker, or the sync would hang
+                results.put(None)
@@ -0,0 +1,176 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Frame sequence and UDIM aware paths.
+
+Publishes of image sequences and UDIM textures store a single path with a
+frame or tile token, e.g. ``/render/shot.%04d.exr`` or ``/tex/col.<UDIM>.tx``.
+Such paths are sent to the server as a single Perforce wildcard covering all
+the files, e.g. ``/render/shot.*.exr``, so that a 2000 frame render is still
+a single argument and nothing needs to be globbed on disk.
+
+The server reports every file matched by the wildcard, and those records are
+grouped back under the path they were requested with.
+"""
+
+import os
+import re
+
+from .commands import split_file_spec, normalize_path
+
+# frame and tile tokens of the common DCCs: %04d, %d, ####, #, @@@@, $F4,
+# <UDIM>, <UVTILE> and %(UDIM)d. A single @ isn't a token, it would clash
+# with revision specifiers. The Houdini $F token is case sensitive and must
+# end the file name stem, e.g. shot.$F4.exr, so that a folder or file name
+# starting with $f isn't mistaken for a sequence. A printf token is only
+# found in the file name and is padded with zeros or at most 9 wide, so that
+# the escapes of depot paths, e.g. %40 in //depot/user%40domain/a.ma, aren't
+# mistaken for one.
+_SEQUENCE_TOKEN_REGEX = re.compile(
+    r"%(?:0\d+|\d)?d(?=[^/\\]*$)|%\((?:UDIM|udim)\)d|#+|@@+"
+    r"|\$F\d*(?=\.[^./\\]*$)|<(?:UDIM|udim)>|<(?:UVTILE|uvtile)>"
+)
+
+# characters with a special meaning for Perforce, escaped in literal parts
+# of wildcards. % goes first so that the other escapes aren't escaped again.
+_ESCAPES = (("%", "%25"), ("@", "%40"), ("#", "%23"), ("*", "%2A"))
+
+# regex snippet matching the frame or tile part of a file name
+_FRAME_REGEX = r"[^/\\]*"
+
+
+def is_sequence_path(path):
+    """
+    :param path: Local or depot path.
+    :returns: True if the path holds a frame or tile token.
+    """
+    return _SEQUENCE_TOKEN_REGEX.search(path) is not None
+
+
+def sequence_wildcard(path):
+    """
+    Converts a frame sequence or UDIM path into a Perforce wildcard.
+
+    :param path: Local or depot path, e.g. ``/render/shot.%04d.exr``
+    :returns: The wildcard, e.g. ``/render/shot.*.exr``, None if the path
+              doesn't hold any frame or tile token.
+    """
+    parts = _SEQUENCE_TOKEN_REGEX.split(path)
+    if len(parts) == 1:
+        return None
+    return "*".join(_escape(part) for part in parts)
+
+
+def to_server_path(path):
+    """
+    :param path: Local or depot path.
+    :returns: The path to send to the server, a wildcard for sequence paths
+              and the path itself otherwise.
+    """
+    return sequence_wildcard(path) or path
+
+
+def to_server_spec(file_spec):
+    """
+    :param file_spec: File spec, e.g. ``/render/shot.%04d.exr#head``
+    :returns: The file spec to send to the server, e.g. ``/render/shot.*.exr#head``
+    """
+    (path, revision) = split_file_spec(file_spec)
+    return to_server_path(path) + revision
+
+
+def group_records(paths, records):
+    """
+    Groups the tagged records returned by the server under the paths they
+    were requested with.
+
+    :param paths: List of requested local or depot paths, which can be
+                  sequence paths.
+    :param records: Tagged records with a ``clientFile`` or ``depotFile`` field.
+    :returns: Dictionary keyed by requested path, with the list of records
+              of the files matching the path. Plain paths get at most one
+              record, sequence paths get one per file of the sequence.
+    """
+    records_by_path = {}
+    for record in records:
+        for key in ("clientFile", "depotFile"):
+            if record.get(key):
+                records_by_path[normalize_path(record[key])] = record
+
+    grouped = {}
+    sequences = []
+    for path in paths:
+        grouped[path] = []
+        if is_sequence_path(path):
+            sequences.append((path, _sequence_regex(path)))
+        else:
+            record = records_by_path.get(normalize_path(path))
+            if record:
+                grouped[path].append(record)
+
+    if sequences:
+        for record in records:
+            keys = [
+                normalize_path(_unescape(record[key]))
+                for key in ("clientFile", "depotFile")
+                if record.get(key)
+            ]
+            for (path, regex) in sequences:
+                if any(regex.match(key) for key in keys):
+                    grouped[path].append(record)
+                    break
+    return grouped
+
+
+def find_sequence_messages(path, messages):
+    """
+    Returns the messages which refer to a sequence, either through the
+    wildcard it was sent to the server as or through any of its files.
+
+    :param path: Sequence path, e.g. ``/render/shot.%04d.exr``
+    :param messages: List of warning or error messages.
+    :returns: List of the matching messages, stripped.
+    """
+    server_path = to_server_path(path)
+    regex = _sequence_regex(path, anchored=False)
+    return [
+        message.strip()
+        for message in messages
+        if server_path in message
+        or regex.search(os.path.normcase(_unescape(message)))
+    ]
+
+
+def _sequence_regex(path, anchored=True):
+    """
+    Returns a regex matching the normalized paths of the files of a sequence.
+
+    :param anchored: If False, the regex finds the paths anywhere in a text.
+    """
+    # tokens are replaced before normalizing, which could change their case,
+    # with a placeholder normalizing leaves untouched.
+    normalized = normalize_path(_SEQUENCE_TOKEN_REGEX.sub("\0", path))
+    pattern = _FRAME_REGEX.join(re.escape(part) for part in normalized.split("\0"))
+    if anchored:
+        pattern = "^%s$" % pattern
+    return re.compile(pattern)
+
+
+def _escape(path):
+    for (character, escape) in _ESCAPES:
+        path = path.replace(character, escape)
+    return path
+
+
+def _unescape(path):
+    for (character, escape) in reversed(_ESCAPES):
+        path = path.replace(escape, character)
+    return path
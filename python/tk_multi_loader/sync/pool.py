@@ -0,0 +1,246 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import contextlib
+import logging
+import threading
+import time
+
+from .commands import run_command
+from .parallel import clone_connection
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool(object):
+    """
+    Pool of Perforce connections shared by everything syncing in the app.
+
+    Connections are kept open between uses, so that opening a dialog or
+    starting a sync doesn't pay for a new connection and login every time.
+    An idle connection is checked before being handed out again if it hasn't
+    been used for a while, and is transparently replaced if the check fails.
+
+    The first connection is opened with the given factory. Further
+    connections are cloned from an existing one, reusing its ticket, so that
+    they can be opened from any thread without prompting for a login.
+    """
+
+    # number of seconds a connection can stay idle without being checked
+    DEFAULT_CHECK_INTERVAL = 60
+
+    def __init__(self, factory, max_size=4, check_interval=None):
+        """
+        :param factory: Callable returning a new connected ``P4`` instance.
+        :param max_size: Maximum number of connections open at the same time.
+        :param check_interval: Number of seconds a connection can stay idle
+                               without being checked before it is used again.
+        """
+        self._factory = factory
+        self._max_size = max(max_size, 1)
+        self._check_interval = (
+            self.DEFAULT_CHECK_INTERVAL if check_interval is None else check_interval
+        )
+        self._condition = threading.Condition()
+        self._idle = []
+        # time each connection was last known to be healthy, keyed by id
+        self._checked = {}
+        self._size = 0
+        self._template = None
+
+    @property
+    def size(self):
+        """
+        Number of connections currently open, idle or in use.
+        """
+        return self._size
+
+    def available(self):
+        """
+        :returns: Number of connections which can be acquired right now,
+                  idle or not opened yet, without waiting for a release.
+        """
+        with self._condition:
+            return len(self._idle) + self._max_size - self._size
+
+    def acquire(self, timeout=None):
+        """
+        Gets a healthy connection from the pool, opening a new one if no
+        idle connection is available. If the pool is full, waits for a
+        connection to be released.
+
+        :param timeout: Maximum number of seconds to wait for a connection,
+                        None to wait forever.
+        :returns: Connected ``P4`` instance, to be given back with :meth:`release`.
+        :raises RuntimeError: If no connection was released before the timeout.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while not self._idle and self._size >= self._max_size:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise RuntimeError(
+                        "No Perforce connection available after %s seconds." % timeout
+                    )
+                self._condition.wait(remaining)
+
+            if self._idle:
+                p4 = self._idle.pop()
+                last_checked = self._checked.get(id(p4), 0)
+            else:
+                p4 = None
+                self._size += 1
+
+        if p4 is None:
+            return self._open()
+
+        if time.time() - last_checked < self._check_interval:
+            return p4
+        if self.is_healthy(p4):
+            self._checked[id(p4)] = time.time()
+            return p4
+
+        # the connection went stale while idle, replace it. Its ticket may
+        # have expired, so don't clone it or any of its siblings.
+        logger.debug("Replacing stale Perforce connection.")
+        self._template = None
+        self._close_connection(p4)
+        return self._open()
+
+    def release(self, p4, discard=False):
+        """
+        Gives a connection back to the pool.
+
+        :param p4: Connection obtained with :meth:`acquire`.
+        :param discard: If True, the connection is closed rather than kept,
+                        e.g. because an error left it in an unknown state.
+        """
+        if discard or not _is_connected(p4):
+            self._close_connection(p4)
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            return
+
+        with self._condition:
+            self._idle.append(p4)
+            self._condition.notify()
+
+    @contextlib.contextmanager
+    def connection(self, timeout=None):
+        """
+        Context manager acquiring a connection and releasing it on exit. The
+        connection is discarded if the block raises.
+
+        :param timeout: Maximum number of seconds to wait for a connection.
+        """
+        p4 = self.acquire(timeout)
+        try:
+            yield p4
+        except Exception:
+            self.release(p4, discard=True)
+            raise
+        else:
+            self.release(p4)
+
+    def is_healthy(self, p4):
+        """
+        Checks that a connection is still usable with a cheap server round trip.
+
+        :param p4: ``P4`` instance to check.
+        :returns: True if the connection is alive and its ticket is valid.
+        """
+        if not _is_connected(p4):
+            return False
+        try:
+            (_, _, errors) = run_command(p4, "login", ["-s"])
+        except Exception:
+            return False
+        return not errors
+
+    def warm_up(self, count=1):
+        """
+        Opens connections in a background thread, so that they are ready
+        when they are first needed.
+
+        :param count: Number of idle connections to have ready.
+        :returns: The started ``threading.Thread``.
+        """
+
+        def open_connections():
+            for _ in range(count):
+                with self._condition:
+                    if len(self._idle) >= count or self._size >= self._max_size:
+                        return
+                    self._size += 1
+                try:
+                    p4 = self._open()
+                except Exception as e:
+                    logger.debug("Failed to warm up a Perforce connection: %s" % e)
+                    return
+                self.release(p4)
+
+        thread = threading.Thread(target=open_connections)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def close(self):
+        """
+        Closes all the idle connections.
+        """
+        with self._condition:
+            idle = self._idle
+            self._idle = []
+            self._size -= len(idle)
+        for p4 in idle:
+            self._close_connection(p4)
+
+    def _open(self):
+        """
+        Opens a new connection. A slot must have been reserved in the pool
+        beforehand, it is freed if the connection can't be opened.
+        """
+        try:
+            p4 = None
+            if self._template is not None:
+                try:
+                    p4 = clone_connection(self._template)
+                except Exception as e:
+                    logger.debug("Failed to clone Perforce connection: %s" % e)
+            if p4 is None:
+                p4 = self._factory()
+                self._template = p4
+            self._checked[id(p4)] = time.time()
+            return p4
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+
+    def _close_connection(self, p4):
+        """
+        Disconnects a connection, ignoring errors from connections which are
+        already dead.
+        """
+        self._checked.pop(id(p4), None)
+        try:
+            if _is_connected(p4):
+                p4.disconnect()
+        except Exception:
+            pass
+
+
+def _is_connected(p4):
+    try:
+        return p4.connected()
+    except Exception:
+        return False
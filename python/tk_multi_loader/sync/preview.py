@@ -0,0 +1,137 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from .commands import run_chunked
+from .paths import to_server_spec
+
+# maximum number of file specs sent to the server in a single preview call
+PREVIEW_CHUNK = 1000
+
+
+class PreviewFile(object):
+    """
+    A file that a sync would transfer.
+    """
+
+    def __init__(self, depot_file, client_file, rev, action, size):
+        """
+        :param depot_file: Depot path of the file.
+        :param client_file: Local path of the file.
+        :param rev: Revision the file would be synced to.
+        :param action: Action the sync would perform (added, updated, deleted...)
+        :param size: Size in bytes of the revision.
+        """
+        self.depot_file = depot_file
+        self.client_file = client_file
+        self.rev = rev
+        self.action = action
+        self.size = size
+
+
+class SyncPreview(object):
+    """
+    Summary of what a sync would transfer, without transferring anything.
+    """
+
+    def __init__(self, files):
+        """
+        :param files: List of :class:`PreviewFile`
+        """
+        self.files = files
+        self.total_bytes = sum(f.size for f in files)
+
+    @property
+    def file_count(self):
+        """
+        Number of files the sync would touch.
+        """
+        return len(self.files)
+
+    def largest(self, count=5):
+        """
+        :param count: Number of files to return.
+        :returns: The largest files of the sync, largest first.
+        """
+        return sorted(self.files, key=lambda f: f.size, reverse=True)[:count]
+
+    def estimate_seconds(self, throughput):
+        """
+        Rough estimate of the duration of the sync.
+
+        :param throughput: Expected transfer rate, in bytes per second.
+        :returns: Estimated number of seconds.
+        """
+        if throughput <= 0:
+            return 0
+        return self.total_bytes / float(throughput)
+
+
+def preview_sync(p4, file_specs, force=False, chunk_size=PREVIEW_CHUNK):
+    """
+    Previews a sync with ``p4 sync -n`` and sizes the files it would transfer
+    with ``p4 sizes``, both batched over the whole list of file specs.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+    :param force: If True, preview a force sync.
+    :param chunk_size: Maximum number of file specs per server call.
+    :returns: :class:`SyncPreview`
+    """
+    options = ["-n", "-f"] if force else ["-n"]
+    (records, _, _) = run_chunked(
+        p4, "sync", options, [to_server_spec(s) for s in file_specs], chunk_size
+    )
+
+    # size the exact revisions the sync would bring down
+    revisions = [
+        "%s#%s" % (record["depotFile"], record["rev"])
+        for record in records
+        if record.get("depotFile") and record.get("rev")
+    ]
+    (size_records, _, _) = run_chunked(p4, "sizes", [], revisions, chunk_size)
+    sizes = {}
+    for size_record in size_records:
+        sizes[size_record.get("depotFile")] = int(size_record.get("fileSize") or 0)
+
+    files = []
+    for record in records:
+        if not record.get("depotFile"):
+            continue
+        size = 0
+        if record.get("action") != "deleted":
+            size = sizes.get(record["depotFile"], 0)
+        files.append(
+            PreviewFile(
+                record["depotFile"],
+                record.get("clientFile"),
+                record.get("rev"),
+                record.get("action"),
+                size,
+            )
+        )
+
+    return SyncPreview(files)
+
+
+def format_duration(seconds):
+    """
+    Formats a duration for display, e.g. "3 min 20 s".
+
+    :param seconds: Number of seconds.
+    :returns: Formatted string.
+    """
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return "%d s" % seconds
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return "%d min %d s" % (minutes, seconds)
+    hours, minutes = divmod(minutes, 60)
+    return "%d h %d min" % (hours, minutes)
@@ -0,0 +1,284 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Byte level progress of a sync.
+
+P4Python reports the progress of a command through two optional objects set
+on the connection: an output handler, called with every tagged record as soon
+as the server sends it, and a progress indicator, called while the bytes of a
+file are being transferred. Both are fed into a :class:`TransferProgress`,
+which can be polled from another thread at whatever rate suits the caller.
+"""
+
+import collections
+import sys
+import threading
+import time
+
+# sync actions which don't involve a file transfer
+_NO_TRANSFER_ACTIONS = ("deleted",)
+
+# units of the positions given to a progress indicator, as defined by the P4 API
+(UNITS_UNSPECIFIED, UNITS_PERCENT, UNITS_FILES, UNITS_KBYTES, UNITS_MBYTES) = range(5)
+
+# number of bytes in a unit, positions in other units aren't byte counts
+_UNIT_BYTES = {UNITS_UNSPECIFIED: 1, UNITS_KBYTES: 1024, UNITS_MBYTES: 1024 * 1024}
+
+
+class ProgressSnapshot(object):
+    """
+    State of a sync at a given time.
+    """
+
+    def __init__(self, bytes_done, total_bytes, files_done, total_files, rate):
+        """
+        :param bytes_done: Number of bytes transferred so far.
+        :param total_bytes: Number of bytes planned for the sync.
+        :param files_done: Number of files transferred so far.
+        :param total_files: Number of files planned for the sync.
+        :param rate: Current transfer rate, in bytes per second.
+        """
+        self.bytes_done = bytes_done
+        self.total_bytes = total_bytes
+        self.files_done = files_done
+        self.total_files = total_files
+        self.rate = rate
+
+    @property
+    def fraction(self):
+        """
+        Fraction of the planned bytes transferred so far, between 0 and 1.
+        """
+        if self.total_bytes <= 0:
+            return 0.0
+        return min(self.bytes_done / float(self.total_bytes), 1.0)
+
+    @property
+    def seconds_remaining(self):
+        """
+        Estimated number of seconds before the transfer completes, None if
+        the transfer rate isn't known yet.
+        """
+        if self.rate <= 0:
+            return None
+        return max(self.total_bytes - self.bytes_done, 0) / self.rate
+
+
+class TransferProgress(object):
+    """
+    Thread safe accumulator of the bytes transferred by a sync, possibly over
+    several connections at once.
+
+    The planned total is set from the file sizes before the sync starts and
+    shrinks as files turn out to be up to date or fail, so that the reported
+    progress always tracks what is actually left to transfer.
+    """
+
+    # number of seconds the current transfer rate is averaged over
+    RATE_WINDOW = 5.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sizes = None
+        self._total_bytes = 0
+        self._total_files = 0
+        self._completed_bytes = 0
+        self._completed_files = 0
+        # bytes transferred for the file currently in flight on each connection
+        self._partial = {}
+        self._samples = collections.deque()
+
+    def is_planned(self):
+        """
+        :returns: True if the planned sizes have been set.
+        """
+        return self._sizes is not None
+
+    def plan(self, sizes):
+        """
+        Sets the planned sizes of the sync.
+
+        :param sizes: Dictionary of file sizes keyed by file spec.
+        """
+        with self._lock:
+            self._sizes = dict(sizes)
+            self._total_bytes = sum(self._sizes.values())
+            self._total_files = len(self._sizes)
+
+    def skip(self, file_spec):
+        """
+        Removes a file which won't be transferred from the planned totals.
+
+        :param file_spec: File spec of the file, as given to :meth:`plan`.
+        """
+        with self._lock:
+            if self._sizes and file_spec in self._sizes:
+                self._total_bytes -= self._sizes.pop(file_spec)
+                self._total_files -= 1
+
+    def set_partial(self, key, position):
+        """
+        Records the bytes transferred so far for the file in flight on a connection.
+
+        :param key: Identifier of the connection.
+        :param position: Number of bytes of the file transferred so far.
+        """
+        with self._lock:
+            self._partial[key] = position
+            self._add_sample()
+
+    def file_completed(self, key, size):
+        """
+        Records a file which has been completely transferred.
+
+        :param key: Identifier of the connection.
+        :param size: Size in bytes of the file.
+        """
+        with self._lock:
+            self._partial.pop(key, None)
+            self._completed_bytes += size
+            self._completed_files += 1
+            self._add_sample()
+
+    def snapshot(self):
+        """
+        :returns: :class:`ProgressSnapshot` with the current state of the sync.
+        """
+        with self._lock:
+            self._add_sample()
+            bytes_done = self._bytes_done()
+            rate = 0.0
+            if len(self._samples) > 1:
+                (first_time, first_bytes) = self._samples[0]
+                (last_time, last_bytes) = self._samples[-1]
+                if last_time > first_time:
+                    rate = (last_bytes - first_bytes) / (last_time - first_time)
+            return ProgressSnapshot(
+                min(bytes_done, self._total_bytes),
+                self._total_bytes,
+                self._completed_files,
+                self._total_files,
+                rate,
+            )
+
+    def _bytes_done(self):
+        return self._completed_bytes + sum(self._partial.values())
+
+    def _add_sample(self):
+        """
+        Records the bytes done at the current time, dropping the samples
+        which fell out of the rate window. Must be called with the lock held.
+        """
+        now = time.time()
+        self._samples.append((now, self._bytes_done()))
+        while len(self._samples) > 2 and now - self._samples[0][0] > self.RATE_WINDOW:
+            self._samples.popleft()
+
+
+def create_output_handler(p4, progress, cancel_event=None):
+    """
+    Creates a P4Python output handler recording every file the server reports
+    as transferred, and cancelling the command between two files once the
+    given event is set.
+
+    :param p4: P4Python ``P4`` instance the handler is meant for.
+    :param progress: :class:`TransferProgress` to update.
+    :param cancel_event: Optional ``threading.Event`` cancelling the command.
+    :returns: Output handler instance, to be set as ``p4.handler``.
+    """
+    base_class = _get_p4_class(p4, "OutputHandler")
+    report = getattr(base_class, "REPORT", 0)
+    cancel = getattr(base_class, "CANCEL", 2)
+
+    class SyncOutputHandler(base_class):
+        def outputStat(self, stat):
+            if stat.get("depotFile"):
+                size = 0
+                if stat.get("action") not in _NO_TRANSFER_ACTIONS:
+                    size = int(stat.get("fileSize") or 0)
+                progress.file_completed(id(p4), size)
+            if cancel_event is not None and cancel_event.is_set():
+                return cancel
+            # keep the record in the command output
+            return report
+
+    return SyncOutputHandler()
+
+
+def create_progress_indicator(p4, progress, limiter=None, cancel_event=None):
+    """
+    Creates a P4Python progress indicator recording the bytes of the file
+    being transferred.
+
+    Positions are converted to bytes from the units given to
+    ``setDescription``. Positions in percents or in files are ignored, the
+    bytes of the file are then only accounted for once the output handler
+    reports it as transferred.
+
+    With a bandwidth limiter, the transfer is held back from the indicator
+    whenever it gets ahead of the allowed rate. The number of bytes which went
+    through the limiter is kept in the ``limited_bytes`` attribute of the
+    indicator.
+
+    :param p4: P4Python ``P4`` instance the indicator is meant for.
+    :param progress: :class:`TransferProgress` to update.
+    :param limiter: Optional :class:`~schedule.BandwidthLimiter`.
+    :param cancel_event: Optional ``threading.Event`` interrupting the waits
+                         of the limiter.
+    :returns: Progress indicator instance, to be set as ``p4.progress``.
+    """
+    base_class = _get_p4_class(p4, "Progress")
+
+    class SyncProgressIndicator(base_class):
+        limited_bytes = 0
+        _position = 0
+        _unit_bytes = 1
+
+        def init(self, type):
+            self._position = 0
+            self._unit_bytes = 1
+            progress.set_partial(id(p4), 0)
+
+        def setDescription(self, description, units):
+            self._unit_bytes = _UNIT_BYTES.get(units)
+
+        def setTotal(self, total):
+            pass
+
+        def update(self, position):
+            if self._unit_bytes is None:
+                return
+            position *= self._unit_bytes
+            progress.set_partial(id(p4), position)
+            if limiter is not None and position > self._position:
+                self.limited_bytes += position - self._position
+                limiter.consume(position - self._position, cancel_event)
+            self._position = position
+
+        def done(self, fail):
+            # the transferred bytes are accounted for by the output handler
+            self._position = 0
+            progress.set_partial(id(p4), 0)
+
+    return SyncProgressIndicator()
+
+
+def _get_p4_class(p4, name):
+    """
+    Returns a class of the P4Python module a connection comes from, so that
+    handlers can derive from it without this module importing P4Python.
+
+    :param p4: P4Python ``P4`` instance.
+    :param name: Name of the class, e.g. "OutputHandler".
+    :returns: The class, ``object`` if the module doesn't provide it.
+    """
+    module = sys.modules.get(type(p4).__module__)
+    return getattr(module, name, object)
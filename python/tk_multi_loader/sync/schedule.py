@@ -0,0 +1,225 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Scheduling of syncs over a shared site link.
+
+A :class:`BandwidthLimiter` caps the rate at which bytes are transferred,
+across all the connections of a sync. A :class:`SyncScheduler` decides from
+the planned file sizes which files are synced straight away, small files
+first, and which large files wait for the off-peak hours.
+"""
+
+import datetime
+import re
+import threading
+import time
+
+# a window of time of the day, e.g. "22:00-06:30" or "22-6"
+_WINDOW_REGEX = re.compile(r"^\s*(\d{1,2})(?::(\d{2}))?\s*-\s*(\d{1,2})(?::(\d{2}))?\s*$")
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+class TimeWindows(object):
+    """
+    Daily windows of time, in local time, which can span midnight.
+    """
+
+    def __init__(self, windows):
+        """
+        :param windows: List of tuples with the start and end of each window,
+                        in minutes since midnight. A window ending before it
+                        starts spans midnight.
+        """
+        self._windows = list(windows)
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Parses a comma separated list of windows, e.g. ``"20:00-07:00, 12-13"``
+
+        :param text: Windows to parse, empty for no window.
+        :returns: :class:`TimeWindows`
+        :raises ValueError: If a window is not formatted properly.
+        """
+        windows = []
+        for part in (text or "").split(","):
+            if not part.strip():
+                continue
+            match = _WINDOW_REGEX.match(part)
+            if not match:
+                raise ValueError(
+                    "Invalid time window '%s', expected e.g. '20:00-07:00'" % part.strip()
+                )
+            (start_hour, start_minute, end_hour, end_minute) = match.groups()
+            start = _to_minutes(start_hour, start_minute)
+            end = _to_minutes(end_hour, end_minute)
+            if start is None or end is None:
+                raise ValueError("Invalid time in time window '%s'" % part.strip())
+            windows.append((start, end))
+        return cls(windows)
+
+    def __bool__(self):
+        return bool(self._windows)
+
+    __nonzero__ = __bool__
+
+    def contains(self, now=None):
+        """
+        :param now: Optional ``datetime.datetime``, defaults to the current time.
+        :returns: True if the given time falls in one of the windows.
+        """
+        now = now or datetime.datetime.now()
+        minute = now.hour * 60 + now.minute
+        for (start, end) in self._windows:
+            if start == end:
+                # a window of a whole day
+                return True
+            if start < end and start <= minute < end:
+                return True
+            if start > end and (minute >= start or minute < end):
+                return True
+        return False
+
+    def seconds_until_open(self, now=None):
+        """
+        :param now: Optional ``datetime.datetime``, defaults to the current time.
+        :returns: Number of seconds before the next window opens, 0 if one is
+                  open already, None if there is no window.
+        """
+        if not self._windows:
+            return None
+        now = now or datetime.datetime.now()
+        if self.contains(now):
+            return 0
+        minute = now.hour * 60 + now.minute
+        minutes = min(
+            (start - minute) % _MINUTES_PER_DAY for (start, _) in self._windows
+        )
+        return max(minutes * 60 - now.second, 0)
+
+
+class BandwidthLimiter(object):
+    """
+    Thread safe token bucket capping the rate at which bytes are transferred.
+
+    Connections report the bytes they transfer and are held back whenever
+    they get ahead of the allowed rate. The bucket holds at most a second
+    worth of bytes, so that a connection which was idle can't burst over the
+    cap for long.
+    """
+
+    def __init__(self, max_rate):
+        """
+        :param max_rate: Maximum transfer rate, in bytes per second.
+        """
+        self._max_rate = float(max_rate)
+        self._lock = threading.Lock()
+        self._available = self._max_rate
+        self._last_time = time.time()
+
+    @property
+    def max_rate(self):
+        """
+        Maximum transfer rate, in bytes per second.
+        """
+        return self._max_rate
+
+    def consume(self, num_bytes, cancel_event=None):
+        """
+        Accounts for transferred bytes, blocking until the transfer is back
+        under the allowed rate.
+
+        :param num_bytes: Number of bytes transferred.
+        :param cancel_event: Optional ``threading.Event`` interrupting the wait.
+        """
+        if num_bytes <= 0:
+            return
+        with self._lock:
+            now = time.time()
+            self._available = min(
+                self._available + (now - self._last_time) * self._max_rate,
+                self._max_rate,
+            )
+            self._last_time = now
+            self._available -= num_bytes
+            delay = -self._available / self._max_rate
+        if delay > 0:
+            if cancel_event is not None:
+                cancel_event.wait(delay)
+            else:
+                time.sleep(delay)
+
+
+class SyncScheduler(object):
+    """
+    Decides in which order files are synced, and which ones wait for the
+    off-peak hours, from their planned sizes.
+    """
+
+    def __init__(self, off_peak_windows=None, defer_min_size=0, small_files_first=True):
+        """
+        :param off_peak_windows: Optional :class:`TimeWindows` large files are
+                                 deferred to.
+        :param defer_min_size: Size in bytes from which files are deferred to
+                               the off-peak windows, 0 to never defer.
+        :param small_files_first: If True, files are synced smallest first.
+        """
+        self._off_peak_windows = off_peak_windows or TimeWindows([])
+        self._defer_min_size = defer_min_size
+        self._small_files_first = small_files_first
+
+    @property
+    def off_peak_windows(self):
+        """
+        The :class:`TimeWindows` large files are deferred to.
+        """
+        return self._off_peak_windows
+
+    def schedule(self, file_specs, sizes, now=None):
+        """
+        Splits file specs into the ones to sync now and the deferred ones.
+
+        :param file_specs: List of file specs.
+        :param sizes: Dictionary of planned file sizes keyed by file spec.
+        :param now: Optional ``datetime.datetime``, defaults to the current time.
+        :returns: Tuple with the list of file specs to sync now, in the order
+                  to sync them in, and the list of deferred file specs.
+        """
+        file_specs = list(file_specs)
+        deferred = []
+        if (
+            self._defer_min_size > 0
+            and self._off_peak_windows
+            and not self._off_peak_windows.contains(now)
+        ):
+            deferred = [s for s in file_specs if sizes.get(s, 0) >= self._defer_min_size]
+            if deferred:
+                deferred_set = set(deferred)
+                file_specs = [s for s in file_specs if s not in deferred_set]
+
+        if self._small_files_first:
+            # sort is stable, files of the same size keep their order
+            file_specs.sort(key=lambda s: sizes.get(s, 0))
+        return file_specs, deferred
+
+
+def _to_minutes(hour, minute):
+    """
+    :returns: Number of minutes since midnight, None for an invalid time.
+    """
+    hour = int(hour)
+    minute = int(minute or 0)
+    if hour == 24 and minute == 0:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return hour * 60 + minute
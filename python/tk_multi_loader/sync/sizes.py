@@ -0,0 +1,87 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from .commands import run_chunked, split_file_spec
+from .paths import group_records, to_server_spec
+
+# maximum number of file specs sent to the server in a single size query
+SIZE_QUERY_CHUNK = 1000
+
+
+def query_sizes(p4, file_specs, chunk_size=SIZE_QUERY_CHUNK):
+    """
+    Retrieves the size of the requested revision of every file spec using
+    batched ``p4 fstat -Ol`` calls.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+    :param chunk_size: Maximum number of file specs per server call.
+    :returns: Dictionary keyed by file spec with the size in bytes of each file,
+              or of all the files of a sequence. Files unknown to the server
+              are reported with a size of 0.
+    """
+    return total_sizes(query_size_records(p4, file_specs, chunk_size))
+
+
+def query_size_records(p4, file_specs, chunk_size=SIZE_QUERY_CHUNK):
+    """
+    Same as :func:`query_sizes`, keeping the records of the files, which also
+    hold their local path.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param file_specs: List of file specs, e.g. ``["/path/file.ma#head"]``
+    :param chunk_size: Maximum number of file specs per server call.
+    :returns: Dictionary keyed by file spec with the list of fstat records of
+              the file, or of all the files of a sequence, with ``clientFile``,
+              ``depotFile``, ``fileSize`` and ``headRev`` fields. The head
+              revision of a file spec with a revision is that revision.
+    """
+    (records, _, _) = run_chunked(
+        p4,
+        "fstat",
+        ["-Ol", "-T", "clientFile,depotFile,fileSize,headRev"],
+        [to_server_spec(file_spec) for file_spec in file_specs],
+        chunk_size,
+    )
+
+    paths = [split_file_spec(file_spec)[0] for file_spec in file_specs]
+    records_by_path = group_records(paths, records)
+    return dict(
+        (file_spec, records_by_path[path])
+        for (file_spec, path) in zip(file_specs, paths)
+    )
+
+
+def total_sizes(size_records):
+    """
+    :param size_records: Dictionary of fstat records keyed by file spec, as
+                         returned by :func:`query_size_records`.
+    :returns: Dictionary keyed by file spec with the size in bytes of each
+              file, sequences are sized as a whole.
+    """
+    return dict(
+        (file_spec, sum(int(record.get("fileSize") or 0) for record in records))
+        for (file_spec, records) in size_records.items()
+    )
+
+
+def format_size(num_bytes):
+    """
+    Formats a number of bytes for display, e.g. "12.3 MB".
+
+    :param num_bytes: Number of bytes.
+    :returns: Formatted string.
+    """
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(size) < 1024.0:
+            return "%.1f %s" % (size, unit) if unit != "B" else "%d B" % size
+        size /= 1024.0
+    return "%.1f TB" % size
@@ -0,0 +1,56 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Snapshot syncs.
+
+Syncing many files to ``#head`` resolves the head revision of every batch
+when the batch reaches the server, so a submit landing in the middle of a
+sync leaves the workspace with a mix of old and new files. Syncing every
+file to the same ``@changelist`` instead gives a consistent snapshot of the
+depot, which can also be reproduced later by syncing to the same changelist.
+"""
+
+from .commands import run_command, split_file_spec
+
+
+def get_latest_changelist(p4, paths=None):
+    """
+    Returns the latest submitted changelist with a single ``p4 changes -m1``.
+
+    :param p4: Connected P4Python ``P4`` instance.
+    :param paths: Optional list of paths or depot patterns to restrict the
+                  query to, e.g. ``["//depot/project/..."]``. The latest
+                  changelist of the whole server is returned by default.
+    :returns: The changelist number, None if nothing was ever submitted.
+    :raises RuntimeError: If the server reported an error.
+    """
+    (records, _, errors) = run_command(
+        p4, "changes", ["-m1", "-s", "submitted"] + list(paths or [])
+    )
+    if errors:
+        raise RuntimeError(errors[0].strip())
+    changes = [int(record["change"]) for record in records if record.get("change")]
+    if not changes:
+        return None
+    return max(changes)
+
+
+def snapshot_file_specs(file_specs, changelist):
+    """
+    Pins a list of paths or file specs to a changelist.
+
+    :param file_specs: List of paths or file specs, e.g. ``["/path/file.ma#head"]``
+    :param changelist: Changelist number.
+    :returns: List of file specs, e.g. ``["/path/file.ma@1234"]``
+    """
+    return [
+        "%s@%d" % (split_file_spec(file_spec)[0], changelist) for file_spec in file_specs
+    ]
@@ -0,0 +1,226 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Disk space checks before syncs.
+
+A sync which fills the local drive dies halfway, leaving the workspace with a
+mix of old and new files. The space a sync needs on every volume is checked
+against the free space of the volume before anything is transferred, from the
+sizes the sync planned anyway. A file replacing a local file only needs the
+difference of their sizes.
+"""
+
+import logging
+import os
+
+from .sizes import format_size
+
+try:
+    from shutil import disk_usage
+except ImportError:
+    # Python 2
+    disk_usage = None
+
+logger = logging.getLogger(__name__)
+
+
+def get_free_space(path):
+    """
+    Returns the space available on the volume a file is, or would be, written to.
+
+    :param path: Local path of a file, which doesn't need to exist yet.
+    :returns: Number of free bytes, None if it can't be determined.
+    """
+    folder = _get_existing_folder(path)
+    if folder is None:
+        return None
+    return _get_folder_free_space(folder)
+
+
+def _get_folder_free_space(folder):
+    """
+    :param folder: Existing folder.
+    :returns: Number of free bytes on the volume of the folder, None if it
+              can't be determined.
+    """
+    try:
+        if disk_usage is not None:
+            return disk_usage(folder).free
+        stat = os.statvfs(folder)
+        return stat.f_bavail * stat.f_frsize
+    except (OSError, AttributeError):
+        # os.statvfs isn't available on Windows
+        return None
+
+
+class DiskSpaceCheck(object):
+    """
+    Checks that the files of a sync fit on the volumes they are synced to.
+    """
+
+    # what is done with a sync which doesn't fit
+    (REFUSE, TRIM) = ("refuse", "trim")
+
+    def __init__(self, policy=REFUSE, reserve=0):
+        """
+        :param policy: REFUSE to sync nothing at all if any volume is short
+                       of space, TRIM to sync the files which fit, in their
+                       sync order, and leave the others out.
+        :param reserve: Number of bytes to keep free on every volume.
+        """
+        if policy not in (self.REFUSE, self.TRIM):
+            raise ValueError("Invalid disk space policy '%s'" % policy)
+        self._policy = policy
+        self._reserve = reserve
+
+    def check(self, file_specs, size_records):
+        """
+        Checks that the files of a sync fit on their volumes.
+
+        :param file_specs: List of file specs, in the order they are synced in.
+        :param size_records: Dictionary of fstat records keyed by file spec,
+                             as returned by :func:`~sizes.query_size_records`.
+        :returns: Tuple with the list of file specs to sync and a list of
+                  (file spec, message) tuples for the ones left out.
+        """
+        # free space of every volume, keyed by device, and the folders
+        # already looked up, so that every folder is only looked up once
+        volumes = {}
+        folders = {}
+        needs = []
+        totals = {}
+        for file_spec in file_specs:
+            need = 0
+            volume = None
+            for record in size_records.get(file_spec) or []:
+                client_file = record.get("clientFile")
+                if not client_file:
+                    continue
+                if volume is None:
+                    volume = self._get_volume(client_file, folders, volumes)
+                size = int(record.get("fileSize") or 0)
+                try:
+                    need += max(size - os.path.getsize(client_file), 0)
+                except OSError:
+                    need += size
+            needs.append((file_spec, volume, need))
+            totals[volume] = totals.get(volume, 0) + need
+
+        short_volumes = [
+            volume
+            for volume in totals
+            if volume is not None
+            and totals[volume] > self._get_budget(volumes[volume])
+        ]
+        if not short_volumes:
+            return list(file_specs), []
+
+        messages = dict(
+            (
+                volume,
+                "Not enough disk space on %s: the sync needs %s, %s is available"
+                % (
+                    volumes[volume][0],
+                    format_size(totals[volume]),
+                    format_size(self._get_budget(volumes[volume])),
+                ),
+            )
+            for volume in short_volumes
+        )
+        if self._policy == self.REFUSE:
+            message = "Sync refused. " + " ".join(messages[v] for v in short_volumes)
+            return [], [(file_spec, message) for file_spec in file_specs]
+
+        to_sync = []
+        left_out = []
+        budgets = dict(
+            (volume, self._get_budget(volumes[volume])) for volume in short_volumes
+        )
+        for (file_spec, volume, need) in needs:
+            if volume not in budgets:
+                to_sync.append(file_spec)
+            elif need <= budgets[volume]:
+                budgets[volume] -= need
+                to_sync.append(file_spec)
+            else:
+                left_out.append((file_spec, messages[volume]))
+        return to_sync, left_out
+
+    def _get_volume(self, path, folders, volumes):
+        """
+        Returns the volume a file is synced to.
+
+        :param path: Local path of the file.
+        :param folders: Dictionary of the volumes of the folders looked up so far.
+        :param volumes: Dictionary of the volumes found so far, keyed by device,
+                        with the first folder found on the volume and its free
+                        space.
+        :returns: The device of the volume, None if its free space is unknown.
+        """
+        parent = os.path.dirname(path)
+        if parent not in folders:
+            folder = _get_existing_folder(path)
+            volume = None
+            if folder is not None:
+                volume = os.stat(folder).st_dev
+                if volume not in volumes:
+                    free_space = _get_folder_free_space(folder)
+                    if free_space is None:
+                        volume = None
+                    else:
+                        volumes[volume] = (folder, free_space)
+            folders[parent] = volume
+        return folders[parent]
+
+    def _get_budget(self, volume):
+        """
+        :param volume: Tuple with a folder of a volume and its free space.
+        :returns: Number of bytes a sync can write to the volume.
+        """
+        return max(volume[1] - self._reserve, 0)
+
+
+def create_space_check(app):
+    """
+    Creates the disk space check of syncs from the ``sync_disk_space_check``
+    and ``sync_disk_space_reserve`` settings of an app.
+
+    :param app: Object with a ``get_setting`` method, e.g. the loader app.
+                Bundles without the settings refuse syncs which don't fit.
+    :returns: :class:`DiskSpaceCheck`, None if disabled.
+    """
+    policy = app.get_setting("sync_disk_space_check", DiskSpaceCheck.REFUSE)
+    if policy == "off":
+        return None
+    try:
+        return DiskSpaceCheck(
+            policy, reserve=app.get_setting("sync_disk_space_reserve", 0)
+        )
+    except ValueError:
+        logger.warning(
+            "Unknown sync_disk_space_check '%s', syncing without checking disk space."
+            % policy
+        )
+        return None
+
+
+def _get_existing_folder(path):
+    """
+    :returns: The closest existing folder a file is, or would be, written to,
+              None if none of its parent folders exist.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    while not os.path.isdir(folder):
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            return None
+        folder = parent
+    return folder
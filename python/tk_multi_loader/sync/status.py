@@ -0,0 +1,116 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+from .commands import run_chunked
+from .paths import group_records, to_server_path
+
+
+class RevisionStatus(object):
+    """
+    Live revision information for a single file, as reported by the server.
+    """
+
+    def __init__(
+        self, path, depot_file=None, have_rev=0, head_rev=0, head_action=None, action=None
+    ):
+        """
+        :param path: The path the status was requested for.
+        :param depot_file: Depot path of the file, None if unknown to the server.
+        :param have_rev: Revision synced in the workspace, 0 if not synced.
+        :param head_rev: Latest revision submitted to the depot, 0 if unknown.
+        :param head_action: Action of the head revision (add, edit, delete...)
+        :param action: Action the file is opened for in the workspace, if any.
+        """
+        self.path = path
+        self.depot_file = depot_file
+        self.have_rev = have_rev
+        self.head_rev = head_rev
+        self.head_action = head_action
+        self.action = action
+
+    def __repr__(self):
+        return "<RevisionStatus %s #%d/#%d>" % (self.path, self.have_rev, self.head_rev)
+
+
+class RevisionStatusService(object):
+    """
+    Retrieves the have and head revisions of many files at once, using
+    batched ``p4 fstat`` calls rather than relying on revision data cached
+    alongside the ShotGrid publishes, which goes stale as soon as anyone
+    submits or syncs.
+    """
+
+    # fields requested from fstat, keeping the server response small
+    FSTAT_FIELDS = "clientFile,depotFile,haveRev,headRev,headAction,action"
+
+    # maximum number of paths sent to the server in a single fstat call
+    DEFAULT_CHUNK_SIZE = 1000
+
+    def __init__(self, p4, chunk_size=None):
+        """
+        :param p4: Connected P4Python ``P4`` instance.
+        :param chunk_size: Maximum number of paths per fstat call.
+        """
+        self._p4 = p4
+        self._chunk_size = chunk_size or self.DEFAULT_CHUNK_SIZE
+
+    def get_status(self, paths):
+        """
+        Retrieves the revision status of the given paths.
+
+        :param paths: List of local or depot paths.
+        :returns: Dictionary of :class:`RevisionStatus` keyed by path. Every
+                  requested path has an entry, files unknown to the server are
+                  reported with a have and head revision of 0. A sequence is
+                  reported with the status of one of its out of date files
+                  if it has any, so that it is out of date as a whole.
+        """
+        if not paths:
+            return {}
+
+        (records, _, _) = run_chunked(
+            self._p4,
+            "fstat",
+            ["-T", self.FSTAT_FIELDS],
+            [to_server_path(path) for path in paths],
+            self._chunk_size,
+        )
+
+        records_by_path = group_records(paths, records)
+
+        statuses = {}
+        for path in paths:
+            record = _pick_record(records_by_path[path])
+            if record:
+                statuses[path] = RevisionStatus(
+                    path,
+                    depot_file=record.get("depotFile"),
+                    have_rev=int(record.get("haveRev") or 0),
+                    head_rev=int(record.get("headRev") or 0),
+                    head_action=record.get("headAction"),
+                    action=record.get("action"),
+                )
+            else:
+                statuses[path] = RevisionStatus(path)
+        return statuses
+
+
+def _pick_record(records):
+    """
+    Picks the record standing for the status of a path, the first out of date
+    file of a sequence if it has any.
+
+    :param records: List of fstat records of the files matching a path.
+    :returns: The record, None if the list is empty.
+    """
+    for record in records:
+        if int(record.get("haveRev") or 0) < int(record.get("headRev") or 0):
+            return record
+    return records[0] if records else None
@@ -0,0 +1,79 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Helpers to watch files for newly submitted revisions.
+
+Rather than asking for the status of every watched file, a watcher asks for
+the latest changelist touching the folders the files are in, a single cheap
+``p4 changes -m1``, and only looks at the files again when it moves.
+"""
+
+import os
+
+
+def watch_patterns(paths):
+    """
+    Returns the folder patterns covering a list of files, with folders nested
+    in another covered folder left out.
+
+    :param paths: List of local or depot file paths.
+    :returns: Sorted list of patterns, e.g. ``["/project/assets/..."]``
+    """
+    folders = set()
+    for path in paths:
+        if path.startswith("//"):
+            folders.add(path.rsplit("/", 1)[0] + "/")
+        else:
+            folders.add(os.path.join(os.path.dirname(os.path.normpath(path)), ""))
+
+    covering_folders = []
+    # once sorted, the folders nested in a folder come right after it
+    for folder in sorted(folders):
+        if covering_folders and folder.startswith(covering_folders[-1]):
+            continue
+        covering_folders.append(folder)
+    return [folder + "..." for folder in covering_folders]
+
+
+class PollSchedule(object):
+    """
+    Interval between two polls, backing off exponentially while nothing
+    changes and going back to the shortest interval as soon as something does.
+    """
+
+    def __init__(self, interval, max_interval, factor=2):
+        """
+        :param interval: Shortest number of seconds between two polls.
+        :param max_interval: Longest number of seconds between two polls.
+        :param factor: Factor the interval grows by after an idle poll.
+        """
+        self._interval = interval
+        self._max_interval = max(max_interval, interval)
+        self._factor = factor
+        self._current = interval
+
+    def next_interval(self, changed):
+        """
+        Returns the number of seconds to wait before the next poll.
+
+        :param changed: True if the last poll found a change.
+        """
+        if changed:
+            self._current = self._interval
+        else:
+            self._current = min(self._current * self._factor, self._max_interval)
+        return self._current
+
+    def reset(self):
+        """
+        Goes back to the shortest interval, e.g. because the watched files changed.
+        """
+        self._current = self._interval
@@ -0,0 +1,341 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import time
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+from .sync import (
+    SyncEngine,
+    SyncResult,
+    SyncScheduler,
+    SyncStats,
+    ParallelSyncEngine,
+    SyncJob,
+    SyncJobQueue,
+    TimeWindows,
+    TransferProgress,
+    get_engine_settings,
+    split_file_spec,
+)
+from .sync_worker import SyncWorker
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class SyncQueue(QtCore.QObject):
+    """
+    App level queue of sync jobs.
+
+    The queue belongs to the app rather than to the loader dialog, so queued
+    and running syncs carry on when the dialog is closed and can be picked up
+    again when it is reopened. Jobs run one at a time on a background
+    :class:`SyncWorker`, in priority order.
+
+    Outside of the off-peak hours, the large files of entity and project
+    syncs are split off into a job which only starts once the off-peak hours
+    begin. Files picked one by one are always synced straight away.
+
+    :signal job_added(SyncJob): Emitted when a job has been queued.
+    :signal job_started(SyncJob): Emitted when a job starts running.
+    :signal results_available(SyncJob, list): Emitted with a list of
+        :class:`~tk_multi_loader.sync.SyncResult` as a job progresses.
+    :signal job_finished(SyncJob): Emitted when a job is done, failed or
+        has been cancelled.
+    """
+
+    job_added = QtCore.Signal(object)
+    job_started = QtCore.Signal(object)
+    results_available = QtCore.Signal(object, object)
+    job_finished = QtCore.Signal(object)
+
+    def __init__(self, app, connection_pool, parent=None):
+        """
+        :param app: The loader app.
+        :param connection_pool: :class:`~tk_multi_loader.sync.ConnectionPool`
+                                providing the connections jobs run on.
+        :param parent: The parent QObject.
+        """
+        QtCore.QObject.__init__(self, parent)
+        self._app = app
+        self._connection_pool = connection_pool
+        self._jobs = SyncJobQueue()
+        self._worker = None
+        # file specs of the running job deferred to the off-peak hours
+        self._deferred_specs = []
+        self._off_peak_windows = self._get_off_peak_windows()
+        # starts the jobs waiting for the off-peak hours
+        self._start_timer = QtCore.QTimer(self)
+        self._start_timer.setSingleShot(True)
+        self._start_timer.timeout.connect(self._start_next_job)
+
+    @property
+    def current_job(self):
+        """
+        The running :class:`~tk_multi_loader.sync.SyncJob`, None if the queue is idle.
+        """
+        return self._jobs.current_job
+
+    def pending_jobs(self):
+        """
+        :returns: List of the jobs waiting to run, in running order.
+        """
+        return self._jobs.pending_jobs()
+
+    def is_busy(self):
+        """
+        :returns: True if a job is running or ready to run. Jobs waiting for
+                  the off-peak hours don't count.
+        """
+        return self._jobs.is_busy()
+
+    def submit(
+        self,
+        name,
+        file_specs,
+        priority=SyncJob.PRIORITY_ENTITY,
+        force=False,
+        include_opened=False,
+    ):
+        """
+        Queues a sync job.
+
+        :param name: Display name of the job.
+        :param file_specs: List of file specs to sync.
+        :param priority: One of the ``SyncJob.PRIORITY_*`` values.
+        :param force: If True, files are force synced.
+        :param include_opened: If True, files opened in the workspace are
+                               synced rather than handled as set by the
+                               sync_opened_files setting.
+        :returns: The queued :class:`~tk_multi_loader.sync.SyncJob`, or None
+                  if all the files are already queued.
+        """
+        job = self._jobs.add(
+            SyncJob(
+                name,
+                file_specs,
+                priority=priority,
+                force=force,
+                include_opened=include_opened,
+            )
+        )
+        if job:
+            logger.debug("Queued %s" % job)
+            self.job_added.emit(job)
+            self._start_next_job()
+        return job
+
+    def cancel_all(self):
+        """
+        Cancels the jobs waiting to run and stops the running one between
+        two batches.
+        """
+        for job in self._jobs.cancel_pending():
+            self.job_finished.emit(job)
+        if self._worker:
+            self._worker.cancel()
+
+    def shut_down(self):
+        """
+        Cancels all the jobs and waits for the running one to stop.
+        """
+        self._start_timer.stop()
+        self.cancel_all()
+        if self._worker:
+            self._worker.wait()
+
+    def _start_next_job(self):
+        """
+        Starts the next queued job, unless a job is already running.
+        """
+        job = self._jobs.next_job()
+        if not job:
+            self._schedule_next_start()
+            return
+
+        self._deferred_specs = []
+        job.stats = SyncStats(len(job.file_specs))
+        job.progress = TransferProgress()
+        self._worker = SyncWorker(
+            self._connection_pool,
+            lambda p4, cancel_event, job=job: self._create_sync_engine(
+                job, p4, cancel_event
+            ),
+            job.file_specs,
+            force=job.force,
+            progress=job.progress,
+            parent=self,
+        )
+        self._worker.results_available.connect(
+            lambda results, job=job: self._on_results_available(job, results)
+        )
+        self._worker.sync_failed.connect(
+            lambda message, job=job: self._on_sync_failed(job, message)
+        )
+        self._worker.finished.connect(lambda job=job: self._on_worker_finished(job))
+        self.job_started.emit(job)
+        self._worker.start()
+
+    def _on_results_available(self, job, results):
+        """
+        Called with a batch of sync results from the background worker.
+        """
+        for result in results:
+            job.stats.add(result)
+            if result.status == SyncResult.DEFERRED:
+                self._deferred_specs.append(result.path)
+        have_list_index = self._app.have_list_index
+        if have_list_index:
+            try:
+                have_list_index.record_sync(self._worker.connection, results)
+            except Exception:
+                logger.exception(
+                    "Failed to record synced files in the have list index"
+                )
+        self.results_available.emit(job, results)
+
+    def _on_sync_failed(self, job, message):
+        """
+        Called when the background worker of a job stopped because of an error.
+        """
+        job.error = message
+
+    def _on_worker_finished(self, job):
+        """
+        Called once the background worker of a job has completed.
+        """
+        worker = self._worker
+        self._worker = None
+        if job.error:
+            state = SyncJob.FAILED
+        elif worker.is_cancelled():
+            state = SyncJob.CANCELLED
+        else:
+            state = SyncJob.DONE
+        if worker.connection is not None:
+            self._connection_pool.release(
+                worker.connection, discard=state == SyncJob.FAILED
+            )
+        self._jobs.finish(job, state, job.error)
+        self.job_finished.emit(job)
+        if state == SyncJob.DONE:
+            self._submit_deferred_job(job)
+        self._start_next_job()
+
+    def _submit_deferred_job(self, job):
+        """
+        Queues the files of a job deferred to the off-peak hours as a new job,
+        starting with the off-peak hours.
+
+        :param job: The finished :class:`~tk_multi_loader.sync.SyncJob`
+        """
+        if not self._deferred_specs:
+            return
+        deferred_paths = set(self._deferred_specs)
+        self._deferred_specs = []
+        file_specs = [
+            s for s in job.file_specs if split_file_spec(s)[0] in deferred_paths
+        ]
+        delay = self._off_peak_windows.seconds_until_open() or 0
+        deferred_job = self._jobs.add(
+            SyncJob(
+                "{} (off-peak)".format(job.name),
+                file_specs,
+                priority=SyncJob.PRIORITY_DEFERRED,
+                force=job.force,
+                start_after=time.time() + delay,
+                include_opened=job.include_opened,
+            )
+        )
+        if deferred_job:
+            logger.debug("Queued %s" % deferred_job)
+            self.job_added.emit(deferred_job)
+
+    def _schedule_next_start(self):
+        """
+        Wakes the queue up when the first job waiting for its start time can start.
+        """
+        start_time = self._jobs.next_start_time()
+        if start_time is None:
+            self._start_timer.stop()
+            return
+        # QTimer intervals are 32 bit milliseconds, a day fits
+        delay = min(max(start_time - time.time(), 0), 24 * 60 * 60)
+        self._start_timer.start(int(delay * 1000) + 1000)
+
+    def _get_off_peak_windows(self):
+        """
+        :returns: The :class:`~tk_multi_loader.sync.TimeWindows` of the off-peak hours.
+        """
+        try:
+            return TimeWindows.parse(self._app.get_setting("sync_off_peak_hours"))
+        except ValueError as e:
+            logger.warning("Ignoring the sync_off_peak_hours setting: %s" % e)
+            return TimeWindows([])
+
+    def _create_scheduler(self, job):
+        """
+        Creates the scheduler of a job, from the scheduling settings.
+
+        :param job: The :class:`~tk_multi_loader.sync.SyncJob` to run.
+        """
+        defer_min_size = 0
+        if job.priority != SyncJob.PRIORITY_SELECTION:
+            # files picked one by one are needed right now
+            defer_min_size = self._app.get_setting("sync_off_peak_min_size")
+        small_files_first = self._app.get_setting("sync_small_files_first")
+        if not small_files_first and not (defer_min_size and self._off_peak_windows):
+            return None
+        return SyncScheduler(
+            off_peak_windows=self._off_peak_windows,
+            defer_min_size=defer_min_size,
+            small_files_first=small_files_first,
+        )
+
+    def _create_sync_engine(self, job, p4, cancel_event):
+        """
+        Creates the sync engine matching the parallel transfer and scheduling
+        settings. Called from the thread of the worker running the job.
+
+        :param job: The :class:`~tk_multi_loader.sync.SyncJob` to run.
+        :param p4: Connection borrowed for the job.
+        :param cancel_event: ``threading.Event`` cancelling the job.
+        """
+        parallel_mode = self._app.get_setting("sync_parallel_mode")
+        threads = self._app.get_setting("sync_parallel_threads")
+        min_size = self._app.get_setting("sync_parallel_min_size")
+        engine_kwargs = get_engine_settings(
+            self._app, include_opened=job.include_opened
+        )
+        engine_kwargs["scheduler"] = self._create_scheduler(job)
+        engine_kwargs["cancel_event"] = cancel_event
+
+        if parallel_mode == "server":
+            return SyncEngine(
+                p4,
+                parallel_threads=threads,
+                parallel_min_size=min_size,
+                **engine_kwargs
+            )
+        elif parallel_mode == "connections":
+            return ParallelSyncEngine(
+                p4,
+                threads=threads,
+                min_size=min_size,
+                connection_pool=self._connection_pool,
+                **engine_kwargs
+            )
+        elif parallel_mode != "off":
+            logger.warning(
+                "Unknown sync_parallel_mode '%s', syncing without parallel transfers."
+                % parallel_mode
+            )
+        return SyncEngine(p4, **engine_kwargs)
@@ -0,0 +1,141 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+import threading
+import time
+
+import sgtk
+from sgtk.platform.qt import QtCore
+
+from . import constants
+
+logger = sgtk.platform.get_logger(__name__)
+
+
+class SyncWorker(QtCore.QThread):
+    """
+    Runs a sync engine on a dedicated thread so that the host application
+    stays responsive while files are being transferred. The connection the
+    engine runs on is borrowed from the pool by the thread as well, so that
+    waiting for a busy pool doesn't block the UI either.
+
+    Results are not sent to the UI one file at a time but accumulated and
+    emitted in batches, at most every REPORT_INTERVAL seconds.
+
+    :signal results_available(list): Emitted with a list of
+        :class:`~tk_multi_loader.sync.SyncResult` as the sync progresses.
+    :signal sync_failed(str): Emitted with an error message if the sync
+        stopped because of an unexpected error.
+    """
+
+    results_available = QtCore.Signal(object)
+    sync_failed = QtCore.Signal(str)
+
+    # minimum delay, in seconds, between two batches of results
+    REPORT_INTERVAL = 0.25
+
+    # number of seconds between two checks for a cancel while waiting for
+    # a connection
+    CANCEL_CHECK_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        connection_pool,
+        engine_factory,
+        file_specs,
+        force=False,
+        progress=None,
+        parent=None,
+    ):
+        """
+        :param connection_pool: :class:`~tk_multi_loader.sync.ConnectionPool`
+                                to borrow the connection of the sync from.
+        :param engine_factory: Callable creating the
+                               :class:`~tk_multi_loader.sync.SyncEngine` to
+                               run, called with the borrowed connection and
+                               the ``threading.Event`` cancelling the sync.
+        :param file_specs: List of file specs to sync.
+        :param force: If True, files are force synced.
+        :param progress: Optional :class:`~tk_multi_loader.sync.TransferProgress`
+                         updated with the bytes transferred, which can be polled
+                         from the UI thread.
+        :param parent: The parent QObject.
+        """
+        QtCore.QThread.__init__(self, parent)
+        self._connection_pool = connection_pool
+        self._engine_factory = engine_factory
+        self._file_specs = file_specs
+        self._force = force
+        self._progress = progress
+        self._cancel_event = threading.Event()
+        # connection borrowed by the thread, to be released by the owner of
+        # the worker once the thread has finished.
+        self.connection = None
+
+    def cancel(self):
+        """
+        Asks the sync to stop between two batches.
+        """
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        """
+        :returns: True if the sync has been cancelled.
+        """
+        return self._cancel_event.is_set()
+
+    def run(self):
+        """
+        Thread entry point.
+        """
+        pending = []
+        last_report = time.time()
+        try:
+            self.connection = self._acquire_connection()
+            if self.connection is None:
+                if not self.is_cancelled():
+                    self.sync_failed.emit(
+                        "No Perforce connection available after %d seconds."
+                        % constants.PERFORCE_CONNECTION_TIMEOUT
+                    )
+                return
+            engine = self._engine_factory(self.connection, self._cancel_event)
+            for result in engine.iter_sync(
+                self._file_specs, force=self._force, progress=self._progress
+            ):
+                pending.append(result)
+                if time.time() - last_report >= self.REPORT_INTERVAL:
+                    self.results_available.emit(pending)
+                    pending = []
+                    last_report = time.time()
+        except Exception as e:
+            logger.exception("Sync failed")
+            self.sync_failed.emit(str(e))
+        finally:
+            if pending:
+                self.results_available.emit(pending)
+
+    def _acquire_connection(self):
+        """
+        Borrows a connection from the pool, giving up if none is released in
+        time or if the sync is cancelled in the meantime.
+
+        :returns: Connected ``P4`` instance, None if none is available.
+        """
+        deadline = time.time() + constants.PERFORCE_CONNECTION_TIMEOUT
+        while not self.is_cancelled():
+            try:
+                return self._connection_pool.acquire(
+                    min(self.CANCEL_CHECK_INTERVAL, max(deadline - time.time(), 0))
+                )
+            except RuntimeError:
+                if time.time() >= deadline:
+                    break
+        return None
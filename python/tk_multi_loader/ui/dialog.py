@@ -272,8 +272,14 @@ class Ui_Dialog(object):
         # sp_retain.setRetainSizeWhenHidden(True)
         # self.progress.setSizePolicy(sp_retain)
 
+        self.cancel_sync = QtGui.QToolButton(Dialog)
+        self.cancel_sync.setMinimumSize(QtCore.QSize(60, 26))
+        self.cancel_sync.setObjectName("cancel_sync")
+        self.cancel_sync.setVisible(False)
+
         self.horizontalLayout_4.addWidget(self.get_latest_revision)
         self.horizontalLayout_4.addWidget(self.progress)
+        self.horizontalLayout_4.addWidget(self.cancel_sync)
         spacerItem1 = QtGui.QSpacerItem(128, 20, QtGui.QSizePolicy.Expanding, QtGui.QSizePolicy.Minimum)
         self.horizontalLayout_4.addItem(spacerItem1)
         self.scale_label = QtGui.QLabel(Dialog)
@@ -418,6 +424,8 @@ class Ui_Dialog(object):
         self.check_all.setText(QtGui.QApplication.translate("Dialog", "Select All", None, QtGui.QApplication.UnicodeUTF8))
         self.check_none.setText(QtGui.QApplication.translate("Dialog", "Select None", None, QtGui.QApplication.UnicodeUTF8))
         self.get_latest_revision.setText(QtGui.QApplication.translate("Dialog", "Get Latest Revision", None, QtGui.QApplication.UnicodeUTF8))
+        self.cancel_sync.setToolTip(QtGui.QApplication.translate("Dialog", "Stop the running sync once the files currently being transferred are done.", None, QtGui.QApplication.UnicodeUTF8))
+        self.cancel_sync.setText(QtGui.QApplication.translate("Dialog", "Cancel", None, QtGui.QApplication.UnicodeUTF8))
         self.cog_button.setToolTip(QtGui.QApplication.translate("Dialog", "Tools and Settings", None, QtGui.QApplication.UnicodeUTF8))
         self.cog_button.setAccessibleName(QtGui.QApplication.translate("Dialog", "cog_button", None, QtGui.QApplication.UnicodeUTF8))
         self.entity_breadcrumbs.setToolTip(QtGui.QApplication.translate("Dialog", "This <i>breadcrumbs listing</i> shows your currently selected ShotGrid location.", None, QtGui.QApplication.UnicodeUTF8))
@@ -11,6 +11,15 @@
 import sgtk
 from sgtk.platform.qt import QtCore, QtGui
 
+# the publish helpers live in a module without Qt, so that headless syncs
+# can use them too.
+from .publishes import (  # noqa: F401
+    filter_publishes,
+    find_latest_publishes,
+    get_latest_publishes,
+    get_publish_revision,
+)
+
 
 class ResizeEventFilter(QtCore.QObject):
     """
@@ -246,47 +255,6 @@ def create_overlayed_publish_thumbnail(image):
     return base_image
 
 
-def filter_publishes(app, sg_data_list):
-    """
-    Filters a list of shotgun published files based on the filter_publishes
-    hook.
-
-    :param app:           app that has the hook.
-    :param sg_data_list:  list of shotgun dictionaries, as returned by the
-                          find() call.
-    :returns:             list of filtered shotgun dictionaries, same form as
-                          the input.
-    """
-    try:
-        # Constructing a wrapper dictionary so that it's future proof to
-        # support returning additional information from the hook
-        hook_publish_list = [{"sg_publish": sg_data} for sg_data in sg_data_list]
-
-        hook_publish_list = app.execute_hook(
-            "filter_publishes_hook", publishes=hook_publish_list
-        )
-        if not isinstance(hook_publish_list, list):
-            app.log_error(
-                "hook_filter_publishes returned an unexpected result type \
-                '%s' - ignoring!"
-                % type(hook_publish_list).__name__
-            )
-            hook_publish_list = []
-
-        # split back out publishes:
-        sg_data_list = []
-        for item in hook_publish_list:
-            sg_data = item.get("sg_publish")
-            if sg_data:
-                sg_data_list.append(sg_data)
-
-    except:
-        app.log_exception("Failed to execute 'filter_publishes_hook'!")
-        sg_data_list = []
-
-    return sg_data_list
-
-
 def resolve_filters(filters):
     """
     When passed a list of filters, it will resolve strings found in the filters using the context.
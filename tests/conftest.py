@@ -0,0 +1,82 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Fixtures of the sync tests.
+
+The sync package doesn't depend on sgtk or Qt, so it is imported on its own
+and tested against the offline Perforce stand-in of the benchmarks.
+"""
+
+import os
+import sys
+
+import pytest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(_ROOT, "python", "tk_multi_loader"))
+sys.path.insert(0, os.path.join(_ROOT, "benchmarks"))
+
+import fake_p4  # noqa: E402
+
+
+class FailingServer(fake_p4.FakeServer):
+    """
+    Fake server failing the sync of some files a given number of times.
+    """
+
+    def __init__(self, **kwargs):
+        fake_p4.FakeServer.__init__(self, **kwargs)
+        # number of times the sync of a local path still has to fail, and
+        # the error it fails with
+        self.failures = {}
+
+    def fail(self, client_file, message="rename failed: resource busy", times=1):
+        self.failures[client_file] = (message, times)
+
+    def _run_sync(self, connection, options, paths):
+        have_revs = dict(
+            (fake_file.client_file, fake_file.have_rev)
+            for arg in paths
+            for fake_file in self._resolve(arg)[0]
+        )
+        (records, warnings, errors) = fake_p4.FakeServer._run_sync(
+            self, connection, options, paths
+        )
+        synced = []
+        for record in records:
+            client_file = record["clientFile"]
+            (message, times) = self.failures.get(client_file, (None, 0))
+            if not times:
+                synced.append(record)
+                continue
+            self.failures[client_file] = (message, times - 1)
+            self.files[record["depotFile"]].have_rev = have_revs[client_file]
+            errors.append("%s - %s" % (client_file, message))
+        return synced, warnings, errors
+
+
+@pytest.fixture
+def server():
+    """
+    Fake server with a few files which all need syncing.
+    """
+    server = FailingServer()
+    for index in range(20):
+        server.add_file("assets/file%02d.ma" % index, [(index + 1, 100 + index)])
+    return server
+
+
+@pytest.fixture
+def p4(server):
+    """
+    Connection to the fake server.
+    """
+    return fake_p4.FakeP4().connect()
@@ -0,0 +1,112 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Tests of the batching of syncs and of the mapping of their output back onto
+the requested files.
+"""
+
+from sync import SyncEngine, SyncResult, errors
+
+CLIENT = "/ws/assets/"
+
+
+def _specs(count, revision="#head"):
+    return ["%sfile%02d.ma%s" % (CLIENT, index, revision) for index in range(count)]
+
+
+def test_plan_bounds_batches_by_files_and_bytes(p4):
+    engine = SyncEngine(p4, max_batch_files=3)
+    assert [len(batch) for batch in engine.plan(_specs(7))] == [3, 3, 1]
+
+    file_specs = _specs(4)
+    engine = SyncEngine(p4, max_batch_bytes=len(file_specs[0]) * 2 + 2)
+    assert engine.plan(file_specs) == [file_specs[:2], file_specs[2:]]
+
+
+def test_one_server_call_per_batch(server, p4):
+    server.reset_counters()
+    results = SyncEngine(p4, max_batch_files=5).sync(_specs(12))
+    assert server.calls["sync"] == 3
+    assert len(results) == 12
+    assert all(result.status == SyncResult.SYNCED for result in results)
+
+
+def test_synced_result(p4):
+    (result,) = SyncEngine(p4).sync([CLIENT + "file03.ma#head"])
+    assert result.path == CLIENT + "file03.ma"
+    assert result.status == SyncResult.SYNCED
+    assert result.depot_file == "//depot/assets/file03.ma"
+    assert result.rev == "1"
+    assert result.action == "added"
+    assert result.size == 103
+    assert result.attempts == 1
+
+
+def test_up_to_date_and_missing_files(p4):
+    SyncEngine(p4).sync([CLIENT + "file00.ma#head"])
+    results = SyncEngine(p4).sync(
+        [CLIENT + "file00.ma#head", CLIENT + "missing.ma#head", CLIENT + "file01.ma"]
+    )
+    statuses = dict((result.path, result.status) for result in results)
+    assert statuses == {
+        CLIENT + "file00.ma": SyncResult.UP_TO_DATE,
+        CLIENT + "missing.ma": SyncResult.FAILED,
+        CLIENT + "file01.ma": SyncResult.SYNCED,
+    }
+    (missing,) = [r for r in results if r.status == SyncResult.FAILED]
+    assert missing.reason == errors.NOT_MAPPED
+
+
+def test_failed_file_in_a_batch(server, p4):
+    server.fail(CLIENT + "file01.ma", "can't clobber writable file")
+    results = SyncEngine(p4).sync(_specs(3))
+    failed = [result for result in results if result.status == SyncResult.FAILED]
+    assert [result.path for result in failed] == [CLIENT + "file01.ma"]
+    assert failed[0].reason == errors.WRITABLE
+    assert len([r for r in results if r.status == SyncResult.SYNCED]) == 2
+
+
+def test_duplicate_paths_keep_the_last_file_spec(server, p4):
+    server.add_file("assets/multi.ma", [(30, 10), (31, 20), (32, 30)])
+    results = SyncEngine(p4).sync(
+        [CLIENT + "multi.ma#head", CLIENT + "file00.ma#head", CLIENT + "multi.ma#2"]
+    )
+    assert [(result.path, result.rev) for result in results] == [
+        (CLIENT + "multi.ma", "2"),
+        (CLIENT + "file00.ma", "1"),
+    ]
+
+
+def _add_sequence(server, frames=(1001, 1002, 1003)):
+    for frame in frames:
+        server.add_file("render/shot.%04d.exr" % frame, [(40 + frame, 1000)])
+    return "/ws/render/shot.%04d.exr"
+
+
+def test_sequence_reported_as_a_whole(server, p4):
+    path = _add_sequence(server)
+    (result,) = SyncEngine(p4).sync([path + "#head"])
+    assert result.path == path
+    assert result.status == SyncResult.SYNCED
+    assert result.size == 3000
+    assert result.message == "3 files"
+
+    (result,) = SyncEngine(p4).sync([path + "#head"])
+    assert result.status == SyncResult.UP_TO_DATE
+
+
+def test_sequence_with_a_failed_frame(server, p4):
+    path = _add_sequence(server)
+    server.fail("/ws/render/shot.1002.exr", "can't clobber writable file")
+    (result,) = SyncEngine(p4).sync([path + "#head"])
+    assert result.status == SyncResult.FAILED
+    assert result.reason == errors.WRITABLE
+    assert "2 files synced, 1 failed" in result.message
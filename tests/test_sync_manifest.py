@@ -0,0 +1,96 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Tests of the writing, reading and applying of sync manifests.
+"""
+
+import json
+
+import pytest
+
+from sync import (
+    SyncEngine,
+    manifest_file_specs,
+    query_manifest,
+    read_manifest,
+    write_manifest,
+)
+
+ENTRIES = [("//depot/shot/key.exr", 3), ("//depot/shot/light.ma", 12)]
+
+
+@pytest.mark.parametrize("name", ["manifest.json", "manifest.csv"])
+def test_round_trip(tmpdir, name):
+    path = str(tmpdir.join(name))
+    write_manifest(path, ENTRIES)
+    assert read_manifest(path) == ENTRIES
+
+
+def test_csv_header(tmpdir):
+    path = str(tmpdir.join("manifest.csv"))
+    write_manifest(path, ENTRIES)
+    with open(path) as fh:
+        assert fh.readline().strip() == "depot_file,rev"
+
+
+def _write_json(tmpdir, data):
+    path = str(tmpdir.join("manifest.json"))
+    with open(path, "w") as fh:
+        json.dump(data, fh)
+    return path
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [],
+        {"version": 1},
+        {"version": 99, "files": []},
+        {"files": [["//depot/a.ma"]]},
+        {"files": [["//depot/a.ma", "x"]]},
+        {"files": [["//depot/a.ma", -1]]},
+        {"files": [["/local/a.ma", 1]]},
+        {"files": [[123, 4]]},
+        {"files": [[None, 4]]},
+    ],
+)
+def test_invalid_json_manifests(tmpdir, data):
+    with pytest.raises(ValueError):
+        read_manifest(_write_json(tmpdir, data))
+
+
+def test_invalid_csv_header(tmpdir):
+    path = str(tmpdir.join("manifest.csv"))
+    with open(path, "w") as fh:
+        fh.write("path,revision\n//depot/a.ma,1\n")
+    with pytest.raises(ValueError):
+        read_manifest(path)
+
+
+def test_file_specs():
+    assert manifest_file_specs([("//depot/a.ma", 4), ("//depot/b.ma", 0)]) == [
+        "//depot/a.ma#4",
+        "//depot/b.ma#none",
+    ]
+
+
+def test_query_and_apply(server, p4):
+    server.add_file("shot/light.ma", [(30, 10), (31, 20)], have_rev=1)
+    SyncEngine(p4).sync(["/ws/assets/file00.ma#head"])
+    entries = query_manifest(p4, ["/ws/shot/light.ma", "/ws/assets/file0..."])
+    assert ("//depot/shot/light.ma", 1) in entries
+    assert ("//depot/assets/file00.ma", 1) in entries
+    assert ("//depot/assets/file01.ma", 0) in entries
+
+    SyncEngine(p4).sync(["/ws/shot/light.ma#head"])
+    results = SyncEngine(p4).sync(manifest_file_specs(entries))
+    assert server.files["//depot/shot/light.ma"].have_rev == 1
+    assert len(results) == len(entries)
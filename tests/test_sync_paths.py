@@ -0,0 +1,64 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Tests of the frame tokens of sequence paths.
+"""
+
+import pytest
+
+from sync import is_sequence_path
+from sync.paths import find_sequence_messages, to_server_path
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/r/shot.%04d.exr",
+        "/r/shot_%d.exr",
+        "/r/shot.####.exr",
+        "/r/shot.@@@@.exr",
+        "/r/shot.$F4.exr",
+        "/t/color.<UDIM>.tx",
+        "/t/color.<uvtile>.tx",
+        "/t/color.%(UDIM)d.tx",
+    ],
+)
+def test_sequence_paths(path):
+    assert is_sequence_path(path)
+    assert to_server_path(path).count("*") == 1
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "/r/shot.1001.exr",
+        "/w/$file/a.ma",
+        "/w/shot.$f4.exr",
+        "/r/%04d/a.exr",
+        "//depot/user%40domain/a.ma",
+        "//depot/a%23d/b.ma",
+        "//depot/file%25done.ma",
+    ],
+)
+def test_single_file_paths(path):
+    assert not is_sequence_path(path)
+
+
+def test_find_sequence_messages():
+    messages = [
+        "/r/shot.1003.exr - rename failed\n",
+        "/r/other.1003.exr - rename failed",
+        "/r/shot.*.exr - no such file(s).",
+    ]
+    assert find_sequence_messages("/r/shot.%04d.exr", messages) == [
+        "/r/shot.1003.exr - rename failed",
+        "/r/shot.*.exr - no such file(s).",
+    ]
@@ -0,0 +1,84 @@
+# Copyright (c) 2021 Shotgun Software Inc.
+#
+# CONFIDENTIAL AND PROPRIETARY
+#
+# This work is provided "AS IS" and subject to the Shotgun Pipeline Toolkit
+# Source Code License included in this distribution package. See LICENSE.
+# By accessing, using, copying or modifying this work you indicate your
+# agreement to the Shotgun Pipeline Toolkit Source Code License. All rights
+# not expressly granted therein are reserved by Shotgun Software Inc.
+
+"""
+Tests of the retries of the files which failed transiently.
+"""
+
+from sync import SyncEngine, SyncResult, errors
+
+CLIENT = "/ws/assets/"
+
+
+def _specs(count):
+    return ["%sfile%02d.ma#head" % (CLIENT, index) for index in range(count)]
+
+
+def _engine(p4, **kwargs):
+    return SyncEngine(p4, retry_delay=0, **kwargs)
+
+
+def test_transient_failure_is_retried(server, p4):
+    server.fail(CLIENT + "file02.ma")
+    results = _engine(p4).sync(_specs(4))
+    (result,) = [r for r in results if r.path == CLIENT + "file02.ma"]
+    assert result.status == SyncResult.SYNCED
+    assert result.attempts == 2
+    assert all(r.attempts == 1 for r in results if r is not result)
+
+
+def test_retries_use_smaller_batches(server, p4):
+    for index in range(3):
+        server.fail("%sfile%02d.ma" % (CLIENT, index))
+    server.reset_counters()
+    results = _engine(p4, max_batch_files=8).sync(_specs(16))
+    # 2 batches of 8, then the 3 failed files in batches of 8 // 4 = 2
+    assert server.calls["sync"] == 4
+    assert len(results) == 16
+    assert all(result.status == SyncResult.SYNCED for result in results)
+
+
+def test_batches_never_shrink_below_one_file(server, p4):
+    server.fail(CLIENT + "file00.ma", times=3)
+    server.fail(CLIENT + "file01.ma", times=3)
+    server.reset_counters()
+    results = _engine(p4, max_batch_files=4, max_retries=3).sync(_specs(2))
+    # 1 batch of 2, then batches of 1 on every retry
+    assert server.calls["sync"] == 1 + 3 * 2
+    assert [result.attempts for result in results] == [4, 4]
+    assert all(result.status == SyncResult.SYNCED for result in results)
+
+
+def test_gives_up_after_max_retries(server, p4):
+    server.fail(CLIENT + "file00.ma", times=10)
+    (result,) = _engine(p4, max_retries=2).sync(_specs(1))
+    assert result.status == SyncResult.FAILED
+    assert result.reason == errors.LOCKED
+    assert result.attempts == 3
+
+
+def test_permanent_failure_is_not_retried(server, p4):
+    server.fail(CLIENT + "file00.ma", "open for write: Permission denied")
+    server.reset_counters()
+    (result,) = _engine(p4).sync(_specs(1))
+    assert result.status == SyncResult.FAILED
+    assert result.reason == errors.PERMISSION
+    assert result.attempts == 1
+    assert server.calls["sync"] == 1
+
+
+def test_classify_error():
+    assert errors.classify_error("TCP receive failed.") == errors.CONNECTION
+    assert errors.classify_error("rename: resource busy") == errors.LOCKED
+    assert errors.classify_error("Access is denied.") == errors.PERMISSION
+    assert errors.classify_error("file(s) not in client view.") == errors.NOT_MAPPED
+    assert errors.classify_error("something else") == errors.OTHER
+    assert errors.is_retryable(errors.CONNECTION)
+    assert not errors.is_retryable(errors.NOT_MAPPED)